@@ -2,197 +2,88 @@
 # -*- coding: utf-8 -*-
 
 from pathlib import Path
-import re, unicodedata, os, json, shutil
+import os, re, sys, hashlib, argparse, shutil, time, zipfile
+from concurrent.futures import ProcessPoolExecutor
 from datetime import date
-from urllib.parse import quote
+from urllib.parse import quote, unquote
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+from apuntes_lib import (catalogo, emparejar, plantillas, dependencias, perfil, almacen, texto_completo,
+                         vista_previa, optimizar, catalogo_apuntes, migracion, nombres, manifiesto)
+from apuntes_lib.arbol import Arbol
+from apuntes_lib.escritura import escribir_si_cambia
+from apuntes_lib.texto import slugify
 
 # ===== CONFIG =====
 PDF_DIR = Path("resources/pdfs")               # PDFs nuevos
-READY_DIR = Path("resources/apuntes_Listos")   # PDFs procesados (destino)
+READY_DIR = Path("resources/apuntes_Listos")   # PDFs procesados (nombre original → symlink al almacén)
+STORE_DIR = almacen.STORE_DIR                   # PDFs por contenido: <sha256>.pdf (sin duplicados)
 APUNTES_BASE = Path("apuntes")                 # raíz malla
-SITE_BASE_PDF_READY = "/resources/apuntes_Listos"  # URL pública PDFs movidos
-STATE_FILE = Path(".apuntes_first_render.json")    # 1ra fecha de render
+SITE_BASE_PDF_READY = "/resources/apuntes_Listos"  # URL pública por nombre (páginas antiguas; hoy symlinks)
+MANIFEST_FILE = manifiesto.DB_FILE                 # manifiesto de build en SQLite (hash, meta, salida, 1ra fecha)
 PREFERRED_CSS_NAME = "Styles_A.css"                # CSS dentro de /apuntes
 MIGRAR_CARPETAS_A_SLUG = True                      # renombrar carpetas con slug (recomendado)
+WATCH_DEBOUNCE_S = 2.0                             # --watch: segundos sin cambios antes de procesar
+WATCH_POLL_S = 1.0                                 # --watch: intervalo de sondeo / revisión de tamaños
+PROFILE_FILE = Path(".apuntes_perfil.json")        # --profile: reporte JSON de tiempos/contadores
+INDEXAR_TEXTO_COMPLETO = True                      # índice de búsqueda en resources/busqueda/
+OPTIMIZAR_PDFS = False                             # gs/qpdf antes de guardar (también con --optimizar)
 # ===================
 
-# ---------- Utilidades ----------
-def strip_accents(s): 
-    return "".join(c for c in unicodedata.normalize("NFD", s) if unicodedata.category(c) != "Mn")
-
-def norm_key(s):
-    return re.sub(r"[^a-z0-9]+", "", strip_accents(s).lower())
-
-def slugify(s):
-    s2 = strip_accents(s).lower()
-    s2 = re.sub(r"[^a-z0-9]+", "-", s2).strip("-")
-    return s2 or "curso"
-
-def smart_title(s):
-    return re.sub(r"\s+", " ", s.replace("_", " ").strip()).title()
-
-def yaml_escape(s): 
-    return '"' + s.replace('"', '\\"') + '"'
-
 # ---------- Autores / APA ----------
-def split_authors(raw):
-    txt = raw.strip().replace("&", " y ")
-    parts = re.split(r"\s+y\s+|,\s*", txt)
-    return [p for p in parts if p.strip()]
-
-def looks_like_name_token(tok): 
-    return bool(re.fullmatch(r"[A-Z][a-z'´’-]+", strip_accents(tok).strip()))
-
-def strip_connectors(tokens):
-    outs = []
-    for t in tokens:
-        tt = t.strip().lower()
-        if tt in {"y","and","&"}: 
-            continue
-        outs.append(t)
-    return outs
-
-def name_to_apa(author):
-    a = author.replace("_"," ").strip()
-    parts = [t for t in re.split(r"\s+", a) if t]
-    if len(parts) == 1: 
-        return parts[0]
-    def looks_last(x): 
-        return bool(re.match(r"^[A-ZÁÉÍÓÚÑ][a-záéíóúñ'-]+$", x))
-    if looks_last(parts[0]): 
-        last, names = parts[0], parts[1:]
-    else: 
-        last, names = parts[-1], parts[:-1]
-    initials = [(n.strip("-")[0].upper() + ".") for n in names if n.strip("-")]
-    return f"{last}, {' '.join(initials)}".strip()
-
 def join_authors_apa(lst):
     if not lst: return ""
     if len(lst)==1: return lst[0]
     if len(lst)==2: return f"{lst[0]} & {lst[1]}"
     return ", ".join(lst[:-1]) + f", & {lst[-1]}"
 
-def to_yaml_authors(lst): 
-    return ", ".join([f"\"{a}\"" for a in lst])
+# SIN el nombre del archivo al final
+CITA_TMPL = plantillas.compilar(
+    "{autores!h} ({anio!h}). <em>{curso_hum!h}: {tema_hum!h}</em> [PDF]. "
+    "Repositorio de Apuntes de Sociología, U. de Chile."
+)
 
 def make_citation_apa_html(autores_apa, anio, curso_hum, tema_hum):
-    autores = join_authors_apa(autores_apa)
-    titulo = f"{curso_hum}: {tema_hum}"
-    # SIN el nombre del archivo al final
-    return f"{autores} ({anio}). <em>{titulo}</em> [PDF]. Repositorio de Apuntes de Sociología, U. de Chile."
+    return CITA_TMPL.render(dict(autores=join_authors_apa(autores_apa), anio=anio,
+                                 curso_hum=curso_hum, tema_hum=tema_hum))
 
 # ---------- Parseo de nombre ----------
 def parse_filename(pdf_path: Path):
     # A) Curso_AAAA_Tema_Autor(es).pdf
     # B) Curso_AAAA_Tema_Apellido_Nombre[_Apellido_Nombre...].pdf
-    stem = pdf_path.stem
-    parts = stem.split("_")
-    if len(parts) < 3: 
-        raise ValueError(f"Nombre no cumple patrón mínimo: {pdf_path.name}")
-
-    curso = parts[0]
-
-    # año
-    year_idx = None
-    for i, p in enumerate(parts[1:], start=1):
-        if re.fullmatch(r"\d{4}", p):
-            year_idx = i
-            break
-    if year_idx is None: 
-        raise ValueError(f"No se encontró año AAAA en: {pdf_path.name}")
-    anio = parts[year_idx]
-
-    tail = strip_connectors(parts[year_idx + 1 :])
-
-    autores_list_display = []
-    autores_apa = []
-
-    # Detectar pares Apellido_Nombre desde el final
-    i = len(tail) - 1
-    pairs = []
-    while i - 1 >= 0 and looks_like_name_token(tail[i]) and looks_like_name_token(tail[i - 1]):
-        last = tail[i - 1]; first = tail[i]
-        pairs.append((last, first)); i -= 2
-    pairs.reverse()
-
-    if pairs:
-        tema_tokens = tail[: i + 1]
-        tema = " ".join(tema_tokens).strip() or curso
-        autores_list_display = [f"{ap} {no}" for (ap, no) in pairs]
-        autores_apa = [name_to_apa(f"{ap}_{no}") for (ap, no) in pairs]
-    else:
-        if len(parts) <= year_idx + 1:
-            tema = curso; raw_authors_field = ""
-        else:
-            pre_tema = parts[1:year_idx]
-            post_tema = parts[year_idx + 1 : -1]
-            tema = " ".join(pre_tema + post_tema).strip() or curso
-            raw_authors_field = parts[-1]
-        autores_raw = split_authors(raw_authors_field) if raw_authors_field else []
-        autores_list_display = [a.replace("_", " ") for a in autores_raw]
-        autores_apa = [name_to_apa(a) for a in autores_raw]
-
-    return {
-        "curso_raw": curso,
-        "curso_hum": smart_title(curso),
-        "anio": anio,
-        "tema_hum": smart_title(tema),
-        "autores_raw": autores_list_display,
-        "autores_apa": autores_apa,
-        "stem": stem
-    }
+    # gramática y máquina de estados en apuntes_lib/nombres.py (NombreInvalido si no calza)
+    return nombres.parse(pdf_path.name)
 
 # ---------- Indexar malla ----------
-def index_course_dirs(base: Path):
-    index = {}
-    for anio_dir in base.glob("anio-*"):
-        for sem_dir in anio_dir.glob("sem-*"):
-            for course_dir in sem_dir.iterdir():
-                if course_dir.is_dir():
-                    k = norm_key(course_dir.name)
-                    index.setdefault(k, []).append(course_dir)
-    return index
+def index_course_dirs(base: Path, cat: dict | None = None):
+    # catálogo compartido en disco (o ya en memoria); solo se reconstruye si cambió la malla.
+    # El índice resuelve match exacto por norm_key y, si no, aproximado (abreviaturas/typos).
+    return emparejar.IndiceCursos(cat or catalogo.cargar(base))
 
 # ---------- Migrar carpetas de curso a slugs (opcional) ----------
-def migrar_curso_dirs_a_slug(base: Path):
+def migrar_curso_dirs_a_slug(base: Path, arbol: Arbol | None = None):
+    """Plan completo + renombres O(1) con diario (ver apuntes_lib/migracion.py)."""
     if not base.exists(): 
         return
-    cambios = 0
-    for anio in sorted(base.glob("anio-*")):
-        for sem in sorted(anio.glob("sem-*")):
-            for curso_dir in list(sem.iterdir()):
-                if not curso_dir.is_dir():
-                    continue
-                human = curso_dir.name
-                slug = slugify(human)
-                if human == slug:
-                    continue
-                target = sem / slug
-                if target.exists():
-                    # si ya existe, solo escribe title.txt si falta y mueve archivos no existentes
-                    if not (target / "title.txt").exists():
-                        (target / "title.txt").write_text(human, encoding="utf-8")
-                    for p in curso_dir.iterdir():
-                        destp = target / p.name
-                        if not destp.exists():
-                            shutil.move(str(p), str(destp))
-                    try:
-                        curso_dir.rmdir()
-                    except OSError:
-                        pass
-                    cambios += 1
-                    continue
-                target.mkdir(parents=True, exist_ok=True)
-                for p in curso_dir.iterdir():
-                    shutil.move(str(p), str(target / p.name))
-                (target / "title.txt").write_text(human, encoding="utf-8")
-                try:
-                    curso_dir.rmdir()
-                except OSError:
-                    pass
-                cambios += 1
+    if migracion.DIARIO_FILE.exists():
+        # la corrida anterior se cortó a mitad de la migración: se termina primero
+        plan, _ = migracion.leer_diario()
+        print(f"↻ Retomando la migración a slugs que quedó a medias ({migracion.DIARIO_FILE}).")
+        choques = migracion.reanudar()
+    else:
+        plan = migracion.planificar(base, cat=arbol.catalogo() if arbol else None)
+        if not plan["pasos"]:
+            return
+        for destino, origenes in plan["colisiones"]:
+            print(f"⚠️ Colisión de slug en {destino}: {', '.join(origenes)} (se fusionan archivo por archivo)")
+        choques = migracion.aplicar(plan)
+    cambios = sum(p["tipo"] in ("renombrar", "fusionar") for p in (plan or {}).get("pasos", []))
+    if arbol:
+        arbol.invalidar()
     if cambios:
         print(f"✓ Migradas {cambios} carpetas de curso a slugs (se guardó title.txt con el nombre humano).")
+    for p in choques:
+        print(f"⚠️ No se movió {p}: ya existe en la carpeta destino (revísalo a mano).")
 
 # ---------- CSS: ruta relativa desde la carpeta del curso ----------
 def css_rel_from_course(destino: Path) -> str | None:
@@ -211,20 +102,23 @@ def css_rel_from_course(destino: Path) -> str | None:
     up = Path(*([".."] * len(rel_parts))) if rel_parts else Path(".")
     return (up / PREFERRED_CSS_NAME).as_posix()
 
+CSS_BLOCK_TMPL = plantillas.compilar('format:\n  html:\n    css: "{css_ref!y}"\n    code-fold: false')
+CSS_BLOCK_SIN_CSS = "format:\n  html:\n    code-fold: false"
+
 def build_css_block(css_ref: str | None) -> str:
     if css_ref:
-        return "format:\n  html:\n    css: \"" + css_ref + "\"\n    code-fold: false"
-    return "format:\n  html:\n    code-fold: false"
+        return CSS_BLOCK_TMPL.render({"css_ref": css_ref})
+    return CSS_BLOCK_SIN_CSS
 
 # ---------- Plantilla QMD ----------
 QMD_TMPL_BASE = r'''---
-title: {titulo_yaml}
+title: "{pdf_name!y}"
 page-layout: article
 toc: false
-categories: ["{curso_hum}", "{anio}"]
-description: "{curso_hum} — {tema_hum}. PDF aportado por {autores_hum}."
+categories: ["{curso_hum!y}", "{anio!y}"]
+description: "{curso_hum!y} — {tema_hum!y}. PDF aportado por {autores_hum!y}."
 date: {first_render_date}
-author: [{autores_yaml}]
+author: [{autores_apa!l}]
 {css_block}
 ---
 
@@ -243,128 +137,809 @@ author: [{autores_yaml}]
 
 **Curso:** {curso_hum}  
 **Año:** {anio}  
-**Archivo PDF:** [{pdf_name}]({pdf_url})
+**Archivo PDF:** [{pdf_name}]({pdf_url}){{download="{pdf_name!y}"}}
 
 ---
 
 ### Vista del documento
 
-<iframe src="{pdf_url}" width="100%" height="720" style="border:1px solid var(--borde); border-radius:12px;"></iframe>
+~~~{{=html}}
+<div class="visor-pdf" data-pdf="{pdf_url!h}" data-titulo="{pdf_name!h}">
+  <button type="button" class="visor-pdf-abrir">{miniatura_html}
+    <span class="visor-pdf-accion">Ver PDF{detalle!h}</span>
+  </button>
+</div>
+~~~
 
 :::
 '''
+QMD_TMPL = plantillas.compilar(QMD_TMPL_BASE)
+# miniatura de la 1ra página (el iframe se crea recién al click, ver _quarto.yml)
+MINIATURA_TMPL = plantillas.compilar(
+    '\n    <img src="{src!h}" alt="Primera página de {pdf_name!h}" width="{ancho}" loading="lazy" decoding="async">'
+)
+
+# ---------- Manifiesto de build ----------
+# Por cada PDF (clave = nombre de archivo) guarda:
+#   first_render_date, sha256 del PDF, meta parseada, ruta del .qmd,
+#   URL del PDF y sha256 del .qmd renderizado.
+# Si bytes, meta y plantilla no cambian, el .qmd no se vuelve a escribir.
+# Vive en SQLite (apuntes_lib/manifiesto.py): cada corrida hace upsert solo de
+# lo que cambió, así corridas simultáneas no se pisan.
+
+file_sha256 = almacen.sha256_archivo
+
+def text_sha256(s: str) -> str:
+    return hashlib.sha256(s.encode("utf-8")).hexdigest()
+
+def load_state() -> dict:
+    """
+    Devuelve las entradas del manifiesto {nombre_pdf: {...}}.
+    Trae de .apuntes_first_render.json (versionado) las fechas que la base local
+    no tenga, para conservar los `date:` ya publicados.
+    """
+    con = manifiesto.abrir(MANIFEST_FILE)
+    try:
+        return manifiesto.cargar(con)
+    finally:
+        con.close()
 
-# ---------- Estado ----------
-def load_state():
-    if STATE_FILE.exists():
-        try: 
-            return json.loads(STATE_FILE.read_text(encoding="utf-8"))
-        except Exception: 
-            return {}
-    return {}
-
-def save_state(state: dict):
-    STATE_FILE.write_text(json.dumps(state, ensure_ascii=False, indent=2), encoding="utf-8")
-
-# ---------- Safe format ----------
-class Safe(dict):
-    def __missing__(self, k): 
-        return '{' + k + '}'
-
-# ---------- Main ----------
-def main():
-    if not PDF_DIR.exists():
-        print(f"No existe {PDF_DIR}."); return
-    if not APUNTES_BASE.exists():
-        print("No encuentro 'apuntes/'. ¿Ya creaste la malla?"); return
+def save_state(cambios: dict, fusionar: bool = False, exportar: bool = False) -> dict:
+    """
+    Guarda solo las entradas de `cambios` (una transacción; las demás filas, quizá
+    de otra corrida en paralelo, no se tocan). Devuelve el manifiesto completo ya al día.
+    Con exportar=True (fin de un lote) pone al día las fechas versionadas.
+    """
+    con = manifiesto.abrir(MANIFEST_FILE)
+    try:
+        (manifiesto.fusionar if fusionar else manifiesto.guardar)(con, cambios)
+        if exportar:
+            manifiesto.exportar_fechas(con)
+        return manifiesto.cargar(con)
+    finally:
+        con.close()
+
+def sha_blob(entry: dict) -> str | None:
+    """sha del blob publicado: el del PDF subido, salvo que se haya optimizado."""
+    return entry.get("blob_sha256") or entry.get("sha256")
+
+def sha_publicado(sha: str) -> str | None:
+    """Alias del manifiesto: el blob que ya publica el contenido subido `sha` (si existe)."""
+    con = manifiesto.abrir_lectura(MANIFEST_FILE)
+    if con is None:
+        return None
+    try:
+        destino = manifiesto.alias(con, sha)
+    finally:
+        con.close()
+    return destino if destino and almacen.ruta_blob(destino, STORE_DIR).exists() else None
+
+def registrar_alias(sha: str, blob_sha: str):
+    """Deja el alias apenas se publica el blob: el siguiente duplicado del lote ya no se optimiza."""
+    if sha != blob_sha:
+        con = manifiesto.abrir(MANIFEST_FILE)
+        try:
+            manifiesto.guardar_alias(con, sha, blob_sha)
+        finally:
+            con.close()
+
+def entry_is_fresh(entry: dict, pdf_sha: str, qmd_sha: str, out_path: Path) -> bool:
+    """True si el .qmd publicado ya corresponde a estos bytes + meta + plantilla."""
+    return (
+        entry.get("sha256") == pdf_sha
+        and entry.get("qmd_sha256") == qmd_sha
+        and entry.get("qmd") == out_path.as_posix()
+        and out_path.exists()
+    )
+
+# ---------- Render de una página ----------
+def render_qmd(meta: dict, fname: str, pdf_url: str, css_block: str, first_render_date: str,
+               vista: dict | None = None) -> str:
+    vista = vista or {}
+    miniatura_html = ""
+    if vista.get("miniatura"):
+        miniatura_html = MINIATURA_TMPL.render(dict(src=vista["miniatura"], pdf_name=fname,
+                                                    ancho=vista_previa.ANCHO_PX))
+    args = dict(
+        curso_hum=meta["curso_hum"],
+        anio=meta["anio"],
+        tema_hum=meta["tema_hum"],
+        autores_hum=", ".join(meta["autores_raw"]),
+        autores_apa=meta["autores_apa"],
+        cita_html=make_citation_apa_html(meta["autores_apa"], meta["anio"], meta["curso_hum"], meta["tema_hum"]),
+        pdf_name=fname,
+        pdf_url=pdf_url,
+        css_block=css_block,
+        first_render_date=first_render_date,
+        miniatura_html=miniatura_html,
+        detalle=vista_previa.detalle(vista),
+    )
+    return QMD_TMPL.render(args)
+
+# ---------- Trabajo por PDF ----------
+# planificar_pdf corre en el proceso principal (parseo + destino + fecha, barato);
+# procesar_pdf es el trabajo pesado (hash, render, mover, escribir) y puede correr
+# en un pool de procesos. Solo recibe/devuelve dicts simples (picklables) y no
+# imprime: el proceso principal ordena los resultados y fusiona el manifiesto.
+def planificar_pdf(pdf: Path, course_index, state: dict) -> dict:
+    analisis = nombres.analizar(pdf.name, estricto=True)
+    meta = analisis["meta"]
+
+    # ubicar carpeta destino: clave normalizada del curso o match aproximado confiable
+    match = course_index.resolver(meta["curso_raw"])
+    if match["dir"] is None:
+        destino = APUNTES_BASE / "_pendiente" / slugify(meta["curso_hum"])
+        destino.mkdir(parents=True, exist_ok=True)
+        # title.txt con nombre humano del curso para que el index lo use
+        escribir_si_cambia(destino / "title.txt", meta["curso_hum"])
+    else:
+        destino = match["dir"]
 
-    # Migración de carpetas a slugs (una sola vez)
-    if MIGRAR_CARPETAS_A_SLUG:
-        migrar_curso_dirs_a_slug(APUNTES_BASE)
+    entry = state.get(pdf.name, {})
+    return {
+        "match": {k: match[k] for k in ("modo", "score", "titulo")},
+        "candidatos": [(t, str(d), sc) for t, d, sc in match["candidatos"]],
+        "pdf": str(pdf),
+        "meta": meta,
+        "avisos_nombre": analisis["avisos"],
+        "destino": str(destino),
+        "entry": entry,
+        # fecha primera vez
+        "first_render_date": entry.get("first_render_date") or date.today().isoformat(),
+    }
 
-    READY_DIR.mkdir(parents=True, exist_ok=True)
+def procesar_pdf(tarea: dict) -> dict:
+    pdf = Path(tarea["pdf"]); destino = Path(tarea["destino"])
+    meta, entry = tarea["meta"], tarea["entry"]
+    first_render_date = tarea["first_render_date"]
+    fname = tarea.get("fname") or pdf.name
+    # importado de un ZIP: `pdf` ya es el blob y los sha se calcularon al copiarlo
+    en_almacen = "sha256" in tarea
+    avisos = []
+    pf = perfil.crear(tarea.get("perfil", False))  # tiempos de este archivo (vuelven al proceso principal)
+
+    out_path = destino / (slugify(Path(fname).stem) + ".qmd")
+    ready_pdf_path = READY_DIR / fname
+    with pf.etapa("hash"):
+        pdf_sha = tarea["sha256"] if en_almacen else file_sha256(pdf)
+        # pdf_sha identifica lo subido (manifiesto); blob_sha lo publicado (almacén)
+        blob_sha = tarea["sha_blob"] if en_almacen else (sha_publicado(pdf_sha) or pdf_sha)
+
+    # optimizar antes de entrar al almacén, y solo si este contenido aún no está publicado;
+    # el blob se nombra por el sha de los bytes optimizados
+    bytes_ahorrados = tarea.get("bytes_ahorrados", 0)
+    optimizado = tarea.get("optimizado", False) or (entry.get("optimizado", False) and sha_blob(entry) == blob_sha)
+    if tarea.get("optimizar") and not en_almacen and not almacen.ruta_blob(blob_sha, STORE_DIR).exists():
+        with pf.etapa("optimizar"):
+            optimizado = True
+            try:
+                antes, despues, pasos = optimizar.optimizar(pdf)
+                bytes_ahorrados = antes - despues
+                if pasos:
+                    blob_sha = file_sha256(pdf)
+                    avisos.append(f"🗜  {fname}: {antes / 1024:.0f} KB → {despues / 1024:.0f} KB ({'+'.join(pasos)})")
+            except Exception as e:
+                avisos.append(f"⚠️ No se pudo optimizar {fname}: {e}. Se publica tal cual.")
+
+    with pf.etapa("vista_previa"):
+        # miniatura + páginas + tamaño, cacheado por sha (solo la 1ra vez cuesta)
+        vista = vista_previa.info(pdf, blob_sha)
+
+    with pf.etapa("render"):
+        # CSS relativo desde la carpeta del curso
+        css_block = build_css_block(css_rel_from_course(destino))
+
+        # URL del blob: un PDF idéntico con otro nombre reutiliza el mismo archivo publicado
+        pdf_url = almacen.url_blob(blob_sha)
+        qmd = render_qmd(meta, fname, pdf_url, css_block, first_render_date, vista)
+        qmd_sha = text_sha256(qmd)
+
+    # mismo PDF, misma meta, misma plantilla: no se toca nada publicado
+    if entry_is_fresh(entry, pdf_sha, qmd_sha, out_path) and ready_pdf_path.exists():
+        if not en_almacen:
+            pdf.unlink()
+        return {"fname": fname, "estado": "sin_cambios", "escrito": False, "out_path": str(out_path),
+                "avisos": avisos, "bytes_movidos": 0, "bytes_ahorrados": 0, "tiempos": pf.tiempos()}
+
+    # mover PDF al almacén (rename O(1)) y dejar el nombre original en "Listos" como symlink
+    bytes_movidos = 0; duplicado = False
+    try:
+        with pf.etapa("mover"):
+            if en_almacen:
+                size, (blob, nuevo, avisos_mov) = tarea["bytes"], (pdf, tarea["nuevo"], [])
+            else:
+                size = pdf.stat().st_size
+                blob, nuevo, avisos_mov = almacen.ingresar(pdf, blob_sha, STORE_DIR)
+                registrar_alias(pdf_sha, blob_sha)
+            almacen.enlazar(ready_pdf_path, blob)
+            avisos += avisos_mov
+            bytes_movidos = size if nuevo else 0
+            duplicado = not nuevo
+            if duplicado:
+                bytes_ahorrados = 0  # otro worker ya guardó este contenido
+    except Exception as e:
+        if en_almacen or not pdf.exists():
+            # ya está en el almacén (el blob se publica igual); solo falló el symlink por nombre
+            avisos.append(f"⚠️ No se pudo enlazar {fname} en {READY_DIR}: {e}.")
+        else:
+            avisos.append(f"⚠️ No se pudo mover {fname} a {READY_DIR}: {e}. Uso ruta original.")
+            pdf_url = f"/{PDF_DIR.as_posix()}/{quote(fname)}"
+            qmd = render_qmd(meta, fname, pdf_url, css_block, first_render_date, vista)
+            qmd_sha = text_sha256(qmd)
+    movido = en_almacen or not pdf.exists()
 
-    course_index = index_course_dirs(APUNTES_BASE)
-    state = load_state(); state_dirty = False
+    # si el .qmd ya tiene exactamente estos bytes no se toca (mtime intacto → Quarto no re-renderiza)
+    with pf.etapa("escribir"):
+        escrito = escribir_si_cambia(out_path, qmd)
+    return {
+        "fname": fname,
+        "estado": "generado",
+        "escrito": escrito,
+        "out_path": str(out_path),
+        "ready_pdf_path": str(ready_pdf_path),
+        "avisos": avisos,
+        "bytes_movidos": bytes_movidos,
+        "bytes_ahorrados": bytes_ahorrados,
+        "duplicado": duplicado,
+        "movido": movido,
+        "tiempos": pf.tiempos(),
+        "entry": {
+            "first_render_date": first_render_date,
+            "sha256": pdf_sha,
+            **({"blob_sha256": blob_sha} if blob_sha != pdf_sha else {}),
+            **({"optimizado": True} if optimizado else {}),
+            "meta": meta,
+            "qmd": out_path.as_posix(),
+            "pdf_url": pdf_url,
+            "blob": pdf_url.startswith(almacen.SITE_BASE_STORE),
+            "qmd_sha256": qmd_sha,
+        },
+    }
 
-    pdfs = sorted(PDF_DIR.glob("*.pdf"))
-    if not pdfs:
-        print("No se encontraron PDFs en", PDF_DIR); return
+def procesar_lote(tareas: list, jobs: int = 1) -> list:
+    """Ejecuta procesar_pdf sobre las tareas; el resultado respeta el orden de entrada."""
+    if jobs <= 1 or len(tareas) <= 1:
+        return [procesar_pdf(t) for t in tareas]
+    with ProcessPoolExecutor(max_workers=jobs) as ex:
+        return list(ex.map(procesar_pdf, tareas, chunksize=max(1, len(tareas) // (jobs * 4))))
 
-    generados = pendientes = 0
+# ---------- Lote ----------
+def ejecutar_lote(pdfs: list, course_index, jobs: int = 1, perf=perfil.NULO, optimizar_pdfs: bool = False,
+                  cat: dict | None = None, ingresar=None) -> dict:
+    """
+    Planifica, procesa e imprime un lote de PDFs; guarda el manifiesto. Devuelve contadores.
+    `ingresar(tarea)` corre después de planificar cada uno (importar_zips: copia el miembro al almacén).
+    """
+    with perf.etapa("cargar_manifiesto"):
+        state = load_state()
+    cambios = {}
+    cont = {"generados": 0, "sin_cambios": 0, "pendientes": 0, "evitadas": 0, "duplicados": 0, "bytes_ahorrados": 0,
+            "fallidos": [], "ambiguos": [], "nombres_dudosos": [], "cambiados": []}
 
+    tareas = []
     for pdf in pdfs:
         try:
-            meta = parse_filename(pdf)
+            with perf.etapa("planificar"):
+                tarea = planificar_pdf(pdf, course_index, state)
+            tarea["perfil"] = perf.activo
+            tarea["optimizar"] = optimizar_pdfs
+            if ingresar:
+                with perf.etapa("ingresar"):
+                    ingresar(tarea)
         except Exception as e:
-            print(f"Saltando {pdf.name} -> {e}"); pendientes += 1; continue
-
-        # ubicar carpeta destino por clave normalizada del curso
-        destinos = course_index.get(norm_key(meta["curso_raw"]), [])
-        if not destinos:
-            destino = APUNTES_BASE / "_pendiente" / slugify(meta["curso_hum"])
-            destino.mkdir(parents=True, exist_ok=True)
-            # title.txt con nombre humano del curso para que el index lo use
-            (destino / "title.txt").write_text(meta["curso_hum"], encoding="utf-8")
+            print(f"Saltando {pdf.name} -> {e}"); cont["pendientes"] += 1; cont["fallidos"].append(pdf.name)
+            continue
+        m = tarea["match"]
+        if m["modo"] == "aproximado":
+            print(f"~ Curso \"{tarea['meta']['curso_raw']}\" → {m['titulo']} (confianza {m['score']:.2f})")
+        elif m["modo"] == "ambiguo":
+            cont["ambiguos"].append((pdf.name, tarea["meta"]["curso_raw"], tarea["candidatos"]))
+        if tarea["avisos_nombre"]:
+            cont["nombres_dudosos"].append((pdf.name, tarea["meta"], tarea["avisos_nombre"]))
+        tareas.append(tarea)
+
+    # resultados en el mismo orden que `pdfs`: salida y manifiesto deterministas
+    t0 = time.perf_counter()
+    resultados = procesar_lote(tareas, jobs)
+    perf.sumar("procesar_lote (pared)", time.perf_counter() - t0)
+    for res in resultados:
+        for aviso in res["avisos"]:
+            print(aviso)
+        perf.archivo(res["fname"], res["tiempos"])
+        perf.contar("bytes_movidos", res["bytes_movidos"])
+        perf.contar("bytes_ahorrados", res["bytes_ahorrados"])
+        cont["bytes_ahorrados"] += res["bytes_ahorrados"]
+        perf.contar("qmd_escritos" if res["escrito"] else "qmd_sin_escribir")
+        if res["escrito"]:
+            cont["cambiados"].append(res["out_path"])
         else:
-            destino = destinos[0]
+            cont["evitadas"] += 1
+        if res["estado"] == "sin_cambios":
+            cont["sin_cambios"] += 1
+            print(f"= Sin cambios: {res['out_path']}")
+            continue
+        cambios[res["fname"]] = res["entry"]
+        if not res["movido"]:
+            # el PDF sigue en PDF_DIR: --watch no lo reintenta hasta que cambie
+            cont["fallidos"].append(res["fname"])
+        if res["duplicado"]:
+            cont["duplicados"] += 1
+        cont["generados"] += 1
+        print(f"✓ Generado: {res['out_path']}  (PDF → {res['ready_pdf_path']})")
 
-        fname = pdf.name
+    if cambios:
+        with perf.etapa("guardar_manifiesto"):
+            state = save_state(cambios, exportar=True)
+            # mapa nombre → sha256 del almacén (sirve de mapa de redirección)
+            almacen.guardar_mapa({f: sha_blob(e) for f, e in state.items() if e.get("blob")}, STORE_DIR)
+
+    # catálogo SQLite + listados precalculados (los .yml que cambian también cuentan como cambiados)
+    cont["cambiados"] += actualizar_listados(
+        {r["fname"]: r["entry"] for r in resultados if r["estado"] == "generado"}, perf, cat)
+
+    if cont["ambiguos"]:
+        print("\n⚠️ Cursos ambiguos (enviados a _pendiente; agrega un alias.txt al curso correcto):")
+        for fname, curso_raw, candidatos in cont["ambiguos"]:
+            opciones = " | ".join(f"{t} ({sc:.2f})" for t, _, sc in candidatos)
+            print(f"   {fname}: \"{curso_raw}\" → {opciones}")
+    if cont["nombres_dudosos"]:
+        print("\n⚠️ Nombres que se pueden leer de más de una forma (revisa tema y autores; "
+              "reporte completo: python3 scripts/apuntes.py nombres):")
+        for fname, meta, avisos in cont["nombres_dudosos"]:
+            print(f"   {fname}: tema \"{meta['tema_hum']}\" | autores {meta['autores_raw']} — {'; '.join(avisos)}")
+    return cont
+
+# ---------- Importar desde ZIP ----------
+def nombre_miembro(info: zipfile.ZipInfo) -> str:
+    """Nombre sin carpetas; repara las tildes de ZIPs sin la marca UTF-8 (Windows, exportes de Drive)."""
+    nombre = info.filename
+    if not info.flag_bits & 0x800:
+        try:
+            nombre = nombre.encode("cp437").decode("utf-8")
+        except (UnicodeEncodeError, UnicodeDecodeError):
+            pass
+    return nombre.replace("\\", "/").rsplit("/", 1)[-1]
+
+def miembros_pdf(zf: zipfile.ZipFile) -> dict:
+    """{nombre.pdf: ZipInfo} de los PDFs del archivo (sin carpetas, __MACOSX/ ni ocultos)."""
+    out = {}
+    for info in zf.infolist():
+        nombre = nombre_miembro(info)
+        if info.is_dir() or info.filename.startswith("__MACOSX/") or nombre.startswith(".") \
+                or nombre[-4:].lower() != ".pdf":
+            continue
+        nombre = nombre[:-4] + ".pdf"
+        if nombre in out:
+            print(f"⚠️ {nombre} aparece dos veces en el ZIP; se usa el primero.")
+            continue
+        out[nombre] = info
+    return out
 
-        # fecha primera vez
-        if fname in state:
-            first_render_date = state[fname]
+def importar_zips(zips: list, course_index, jobs: int = 1, perf=perfil.NULO, optimizar_pdfs: bool = False,
+                  cat: dict | None = None) -> dict:
+    """
+    PDFs de uno o más ZIP sin descomprimirlos a disco: cada miembro se valida por
+    nombre (planificar_pdf → parse_filename) y recién entonces se lee, en una
+    pasada, directo al almacén (almacen.ingresar_flujo). Después sigue el camino
+    normal de ejecutar_lote (symlink en READY_DIR, .qmd, manifiesto, listados).
+    """
+    total = None
+    for z in zips:
+        try:
+            zf = zipfile.ZipFile(z)
+        except (OSError, zipfile.BadZipFile) as e:
+            print(f"⚠️ No se pudo abrir {z}: {e}"); continue
+        with zf:
+            miembros = miembros_pdf(zf)
+            print(f"📦 {z}: {len(miembros)} PDFs")
+
+            def ingresar(tarea):
+                nombre, ahorro = Path(tarea["pdf"]).name, {}
+
+                def preparar(tmp) -> bool:
+                    ahorro["intentado"] = True
+                    try:
+                        antes, despues, pasos = optimizar.optimizar(tmp)
+                        ahorro["bytes"] = antes - despues
+                        return bool(pasos)
+                    except Exception as e:
+                        print(f"⚠️ No se pudo optimizar {nombre}: {e}. Se publica tal cual.")
+                        return False
+
+                with zf.open(miembros[nombre]) as f:
+                    blob, sha, sha_b, nuevo, n = almacen.ingresar_flujo(
+                        f, STORE_DIR, preparar if optimizar_pdfs else None, publicado=sha_publicado)
+                registrar_alias(sha, sha_b)
+                tarea.update(pdf=str(blob), fname=nombre, sha256=sha, sha_blob=sha_b, nuevo=nuevo, bytes=n,
+                             bytes_ahorrados=ahorro.get("bytes", 0), optimizado=ahorro.get("intentado", False))
+
+            cont = ejecutar_lote([Path(n) for n in miembros], course_index, jobs, perf, optimizar_pdfs, cat, ingresar)
+        if total is None:
+            total = cont
+        else:
+            for k, v in cont.items():
+                total[k] += v
+    return total
+
+# ---------- Optimizar lo que ya está en el almacén ----------
+def optimizar_almacen(perf=perfil.NULO) -> dict:
+    """
+    --optimizar-almacen (opt-in): pasa gs/qpdf por los blobs ya publicados que
+    aún no se optimizaron. Lo que resulte más chico entra como blob nuevo, con su
+    propio sha; las entradas que usaban el viejo pasan a apuntar ahí (symlink,
+    .qmd, manifiesto con alias) y el viejo se borra si ya nadie lo usa.
+    Devuelve {"blobs", "bytes_ahorrados", "cambiados"}.
+    """
+    state = load_state()
+    por_blob = {}
+    for fname, e in state.items():
+        if e.get("blob") and not e.get("optimizado"):
+            por_blob.setdefault(sha_blob(e), []).append(fname)
+    res = {"blobs": 0, "bytes_ahorrados": 0, "cambiados": []}
+    for sha, fnames in sorted(por_blob.items()):
+        viejo = almacen.ruta_blob(sha, STORE_DIR)
+        if not viejo.is_file():
+            continue
+        tmp = STORE_DIR / f".optimizando-{sha}.pdf"
+        try:
+            shutil.copyfile(viejo, tmp)
+            with perf.etapa("optimizar"):
+                antes, despues, pasos = optimizar.optimizar(tmp)
+            nuevo_sha = file_sha256(tmp) if pasos else sha
+            if nuevo_sha != sha:
+                blob, _, _ = almacen.ingresar(tmp, nuevo_sha, STORE_DIR)
+        except Exception as e:
+            print(f"⚠️ No se pudo optimizar {viejo.name}: {e}"); continue
+        finally:
+            if tmp.exists():
+                tmp.unlink()
+
+        cambios = {}
+        for fname in fnames:
+            e = cambios[fname] = {**state[fname], "optimizado": True}
+            if nuevo_sha == sha:
+                continue
+            e["blob_sha256"] = nuevo_sha
+            almacen.enlazar(READY_DIR / fname, blob)
+            out_path = Path(e.get("qmd") or "")
+            if e.get("meta") and str(e.get("pdf_url", "")).startswith(almacen.SITE_BASE_STORE) and out_path.is_file():
+                e["pdf_url"] = almacen.url_blob(nuevo_sha)
+                qmd = render_qmd(e["meta"], fname, e["pdf_url"], build_css_block(css_rel_from_course(out_path.parent)),
+                                 e.get("first_render_date") or date.today().isoformat(), vista_previa.info(blob, nuevo_sha))
+                e["qmd_sha256"] = text_sha256(qmd)
+                if escribir_si_cambia(out_path, qmd):
+                    res["cambiados"].append(out_path.as_posix())
+        state = save_state(cambios)
+        if nuevo_sha != sha:
+            res["blobs"] += 1; res["bytes_ahorrados"] += antes - despues
+            if all(sha_blob(x) != sha for x in state.values()):
+                viejo.unlink()
+    if res["blobs"]:
+        almacen.guardar_mapa({f: sha_blob(e) for f, e in state.items() if e.get("blob")}, STORE_DIR)
+    return res
+
+# ---------- Completar entradas migradas ----------
+RE_ENLACE_LISTOS = re.compile(re.escape(SITE_BASE_PDF_READY) + r'/([^)"\s]+\.pdf)')
+
+def qmds_por_pdf(base: Path) -> dict:
+    """{nombre_pdf: .qmd} según el enlace a apuntes_Listos de cada página (las antiguas usan otro slug)."""
+    mapa = {}
+    for qmd in sorted(base.rglob("*.qmd")):
+        for m in RE_ENLACE_LISTOS.finditer(qmd.read_text(encoding="utf-8", errors="replace")):
+            mapa.setdefault(unquote(m.group(1)), qmd)
+    return mapa
+
+def completar_migrados(state: dict, course_index) -> dict:
+    """
+    meta + ruta del .qmd ya publicado para las entradas del almacén que no los
+    tienen (PDFs de antes del manifiesto, migrados con --migrar-store). Sin eso
+    el índice de búsqueda no las ve. Devuelve solo los cambios.
+    """
+    cambios = {}
+    enlazados = None  # se arma solo si hace falta (lee todas las páginas una vez)
+    for fname, e in state.items():
+        if not e.get("blob") or (e.get("meta") and e.get("qmd")):
+            continue
+        analisis = nombres.analizar(fname)
+        if analisis["estado"] == "rechazado":
+            continue
+        meta = analisis["meta"]
+        nombre_qmd = slugify(Path(fname).stem) + ".qmd"
+        match = course_index.resolver(meta["curso_raw"])
+        dirs = ([match["dir"]] if match["dir"] else []) + [APUNTES_BASE / "_pendiente" / slugify(meta["curso_hum"])]
+        qmd = next((d / nombre_qmd for d in dirs if (d / nombre_qmd).is_file()), None)
+        if qmd is None:
+            enlazados = qmds_por_pdf(APUNTES_BASE) if enlazados is None else enlazados
+            qmd = enlazados.get(fname)
+        if qmd:
+            cambios[fname] = {"meta": meta, "qmd": qmd.as_posix()}
+    return cambios
+
+# ---------- Catálogo SQLite y listados ----------
+def actualizar_listados(entradas: dict | None = None, perf=perfil.NULO, cat: dict | None = None) -> list:
+    """Pone al día el catálogo de apuntes y reescribe los listados que cambiaron."""
+    with perf.etapa("catalogo_sqlite"):
+        con = catalogo_apuntes.abrir()
+        try:
+            catalogo_apuntes.sincronizar(con, APUNTES_BASE, cat)
+            for fname, e in (entradas or {}).items():
+                catalogo_apuntes.registrar(con, e["qmd"], e["meta"], fname, e["sha256"])
+            con.commit()
+            return catalogo_apuntes.escribir_listados(con, APUNTES_BASE)
+        finally:
+            con.close()
+
+# ---------- Búsqueda de texto completo ----------
+def indexar_texto(jobs: int = 1, perf=perfil.NULO):
+    """Extrae el texto de los PDFs nuevos (caché por sha) y rearma los shards que cambiaron."""
+    if not INDEXAR_TEXTO_COMPLETO:
+        return
+    state = load_state()
+    pendientes = []
+    for fname, e in state.items():
+        if not e.get("sha256") or not e.get("qmd") or not e.get("meta"):
+            continue
+        pdf = almacen.ruta_blob(sha_blob(e), STORE_DIR) if e.get("blob") else READY_DIR / fname
+        if pdf.exists():
+            pendientes.append((pdf, sha_blob(e)))
+    if texto_completo.backend() is None:
+        if not all(texto_completo.ruta_cache(sha).exists() for _, sha in pendientes):
+            print("ℹ️ Sin pypdf ni pdftotext: el índice de búsqueda no incluye los PDFs nuevos.")
+    else:
+        with perf.etapa("extraer_texto"):
+            n = texto_completo.asegurar_textos(pendientes, jobs)
+        perf.contar("textos_extraidos", n)
+
+    docs = []
+    for fname, e in sorted(state.items()):
+        if e.get("qmd") and e.get("meta") and texto_completo.ruta_cache(sha_blob(e) or "").exists():
+            m = e["meta"]
+            docs.append({"fname": fname, "sha": sha_blob(e), "qmd": e["qmd"],
+                         "titulo": f"{m['curso_hum']} — {m['tema_hum']}", "curso": m["curso_hum"], "anio": m["anio"]})
+    with perf.etapa("indice_busqueda"):
+        res = texto_completo.construir_indice(docs)
+    if res["shards_escritos"]:
+        print(f"🔎 Índice de búsqueda: {res['docs']} PDFs en {res['shards']} shards "
+              f"({res['shards_escritos']} reescritos)")
+
+# ---------- Modo --watch ----------
+def snapshot_pdfs() -> dict:
+    """{nombre: (tamaño, mtime_ns)} de los PDFs visibles en PDF_DIR."""
+    snap = {}
+    with os.scandir(PDF_DIR) as it:
+        for e in it:
+            if e.name.startswith(".") or not e.name.endswith(".pdf") or not e.is_file():
+                continue
+            try:
+                st = e.stat()
+            except FileNotFoundError:
+                continue
+            snap[e.name] = (st.st_size, st.st_mtime_ns)
+    return snap
+
+class FuenteEventos:
+    """
+    Espera novedades en PDF_DIR. Usa inotify (paquete opcional `inotify_simple`)
+    y si no está disponible cae a sondeo con sleep.
+    """
+    def __init__(self, carpeta: Path):
+        self.ino = None
+        try:
+            from inotify_simple import INotify, flags
+            self.ino = INotify()
+            self.ino.add_watch(str(carpeta), flags.CREATE | flags.MODIFY | flags.CLOSE_WRITE
+                               | flags.MOVED_TO | flags.DELETE | flags.MOVED_FROM)
+        except Exception:
+            self.ino = None
+
+    @property
+    def modo(self) -> str:
+        return "inotify" if self.ino else "sondeo"
+
+    def esperar(self, timeout_s: float):
+        if self.ino:
+            self.ino.read(timeout=int(timeout_s * 1000))
         else:
-            first_render_date = date.today().isoformat()
-            state[fname] = first_render_date; state_dirty = True
+            time.sleep(timeout_s)
 
-        out_path = destino / (slugify(pdf.stem) + ".qmd")
+def vigilar(jobs: int = 1, args=None, perf=perfil.NULO):
+    """
+    Bucle largo: cada ráfaga de PDFs nuevos/cambiados se procesa cuando todos
+    llevan WATCH_DEBOUNCE_S sin cambiar de tamaño ni mtime (copias a medio escribir
+    no se mueven). Los que fallan no se reintentan hasta que cambien.
+    """
+    fuente = FuenteEventos(PDF_DIR)
+    print(f"👀 Vigilando {PDF_DIR} ({fuente.modo}). Ctrl+C para salir.")
+    vistos = {}     # nombre -> (firma, desde cuándo está estable)
+    fallidos = {}   # nombre -> firma con la que falló
+    primera = True  # lo que ya estaba en PDF_DIR al arrancar también se procesa
+    try:
+        while True:
+            if not primera:
+                # con inotify, sin pendientes se duerme hasta el próximo evento
+                fuente.esperar(WATCH_POLL_S if (vistos or not fuente.ino) else 60.0)
+            primera = False
+            snap = snapshot_pdfs(); ahora = time.monotonic()
+            for name in list(vistos):
+                if name not in snap:
+                    del vistos[name]
+            for name in list(fallidos):
+                if snap.get(name) != fallidos[name]:
+                    del fallidos[name]
+            for name, firma in snap.items():
+                if name in fallidos:
+                    continue
+                prev = vistos.get(name)
+                if prev is None or prev[0] != firma:
+                    vistos[name] = (firma, ahora)
+            if not vistos or any(ahora - t < WATCH_DEBOUNCE_S for _, t in vistos.values()):
+                continue
+
+            lote = [PDF_DIR / name for name in sorted(vistos)]
+            firmas = {name: f for name, (f, _) in vistos.items()}
+            vistos.clear()
+            with perf.etapa("indice_cursos"):
+                course_index = index_course_dirs(APUNTES_BASE)
+            cont = ejecutar_lote(lote, course_index, jobs, perf, args is not None and args.optimizar)
+            for name in cont["fallidos"]:
+                fallidos[name] = firmas[name]
+            print(f"— Lote: Generados {cont['generados']} | Sin cambios {cont['sin_cambios']} | Omitidos {cont['pendientes']}")
+            indexar_texto(jobs, perf)
+            if args is not None:
+                publicar_afectadas(cont["cambiados"], args, perf)
+            cerrar_perfil(perf, args)
+    except KeyboardInterrupt:
+        print("\nFin de la vigilancia.")
+
+# ---------- Páginas afectadas ----------
+def publicar_afectadas(cambiados: list, args, perf=perfil.NULO):
+    """Lista (y opcionalmente renderiza) solo las páginas que dependen de lo que cambió."""
+    if not cambiados:
+        return
+    with perf.etapa("grafo_dependencias"):
+        afectadas = dependencias.Grafo(Path("."), APUNTES_BASE).afectadas(cambiados)
+    print(f"\nPáginas afectadas ({len(afectadas)}):")
+    for p in afectadas:
+        print(f"   {p}")
+    if args.afectadas:
+        Path(args.afectadas).write_text("".join(p + "\n" for p in afectadas), encoding="utf-8")
+    if args.quarto_render:
+        with perf.etapa("quarto_render"):
+            dependencias.quarto_render(afectadas)
+
+def cerrar_perfil(perf, args):
+    if not perf.activo:
+        return
+    destino = Path(args.profile_out) if args and args.profile_out else PROFILE_FILE
+    perf.guardar(destino)
+    print("\n⏱  Perfil por etapa:")
+    print(perf.tabla())
+    print(f"   (detalle por archivo en {destino})")
 
-        # CSS relativo desde la carpeta del curso
-        css_ref = css_rel_from_course(destino)
-        css_block = build_css_block(css_ref)
+# ---------- Main ----------
+def configurar(ap: argparse.ArgumentParser):
+    ap.add_argument("-j", "--jobs", type=int, default=1,
+                    help="Procesos en paralelo para el trabajo por PDF (0 = todos los núcleos).")
+    ap.add_argument("--watch", action="store_true",
+                    help="Queda vigilando resources/pdfs y procesa los PDFs a medida que llegan.")
+    ap.add_argument("--afectadas", metavar="ARCHIVO",
+                    help="Escribe ahí la lista de páginas a re-renderizar (una por línea).")
+    ap.add_argument("--quarto-render", action="store_true",
+                    help="Corre `quarto render` solo sobre las páginas afectadas.")
+    ap.add_argument("--migrar-store", action="store_true",
+                    help="Convierte los PDFs ya publicados en apuntes_Listos a blob + symlink (una vez).")
+    ap.add_argument("--zip", nargs="+", metavar="ARCHIVO",
+                    help="Importa los PDFs de estos ZIP directo al almacén, sin descomprimirlos (no usa resources/pdfs).")
+    ap.add_argument("--listados", action="store_true",
+                    help="Solo rehace el catálogo SQLite y los listados precalculados (sin procesar PDFs).")
+    ap.add_argument("--optimizar", action="store_true", default=OPTIMIZAR_PDFS,
+                    help="Optimiza cada PDF nuevo (gs: imágenes a ~150 dpi; qpdf: linealiza y compacta).")
+    ap.add_argument("--optimizar-almacen", action="store_true",
+                    help="Optimiza también los PDFs que ya estaban en el almacén (una vez por blob).")
+    ap.add_argument("--profile", action="store_true",
+                    help=f"Mide tiempos y contadores por etapa y por archivo (también con {perfil.ENV_VAR}=1).")
+    ap.add_argument("--profile-out", metavar="ARCHIVO",
+                    help=f"Dónde guardar el reporte JSON de --profile (por defecto {PROFILE_FILE}).")
+
+def parse_args(argv=None):
+    ap = argparse.ArgumentParser(
+        description="Genera un .qmd por cada PDF de resources/pdfs y mueve el PDF a apuntes_Listos."
+    )
+    configurar(ap)
+    return ap.parse_args(argv)
+
+def ejecutar(args, arbol: Arbol | None = None):
+    """
+    Con `arbol` (scripts/apuntes.py build) usa el catálogo ya cargado y suma a
+    las páginas afectadas lo que escribieron las etapas anteriores.
+    """
+    arbol = arbol or Arbol(APUNTES_BASE)
+    arbol.volcar()  # el catálogo SQLite lee los index.qmd del disco
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    perf = perfil.crear(args.profile)
+    if args.optimizar and not optimizar.herramientas():
+        print("ℹ️ --optimizar: no encontré gs ni qpdf; los PDFs se publican tal cual.")
+        args.optimizar = False
+
+    if not APUNTES_BASE.exists():
+        print("No encuentro 'apuntes/'. ¿Ya creaste la malla?"); return
 
-        autores_hum = ", ".join(meta["autores_raw"])
-        autores_yaml = to_yaml_authors(meta["autores_apa"])
-        cita_html = make_citation_apa_html(meta["autores_apa"], meta["anio"], meta["curso_hum"], meta["tema_hum"])
+    # Migración de carpetas a slugs (una sola vez)
+    if MIGRAR_CARPETAS_A_SLUG:
+        with perf.etapa("migracion_slugs"):
+            migrar_curso_dirs_a_slug(APUNTES_BASE, arbol)
 
-        # mover PDF a "Listos" y construir URL pública (codificada)
-        READY_DIR.mkdir(parents=True, exist_ok=True)
-        ready_pdf_path = READY_DIR / fname
-        try:
-            if ready_pdf_path.exists():
-                ready_pdf_path.unlink()
-            shutil.move(str(pdf), str(ready_pdf_path))
-            pdf_url = f"{SITE_BASE_PDF_READY}/{quote(fname)}"
-        except Exception as e:
-            print(f"⚠️ No se pudo mover {fname} a {READY_DIR}: {e}. Uso ruta original.")
-            pdf_url = f"/{PDF_DIR.as_posix()}/{quote(fname)}"
+    READY_DIR.mkdir(parents=True, exist_ok=True)
 
-        args = dict(
-            titulo_yaml=yaml_escape(fname),
-            curso_hum=meta["curso_hum"],
-            anio=meta["anio"],
-            tema_hum=meta["tema_hum"],
-            autores_hum=autores_hum,
-            autores_yaml=autores_yaml,
-            cita_html=cita_html,
-            pdf_name=fname,
-            pdf_url=pdf_url,
-            css_block=css_block,
-            first_render_date=first_render_date,
-        )
-
-        qmd = QMD_TMPL_BASE.format_map(Safe(args))
-        out_path.write_text(qmd, encoding="utf-8")
-        generados += 1
-        print(f"✓ Generado: {out_path}  (PDF → {ready_pdf_path})")
-
-    if state_dirty:
-        save_state(state)
-
-    print(f"\nListo ✅  Generados: {generados} | Pendientes/omitidos: {pendientes}")
+    if args.migrar_store:
+        migrados = almacen.migrar_directorio(READY_DIR, file_sha256, STORE_DIR)
+        if migrados:
+            state = save_state({fname: {"sha256": sha, "blob": True} for fname, sha in migrados.items()}, fusionar=True)
+            almacen.guardar_mapa({f: sha_blob(e) for f, e in state.items() if e.get("blob")}, STORE_DIR)
+        # meta + .qmd de lo ya publicado (también de migraciones anteriores): el índice de búsqueda los necesita
+        completados = completar_migrados(load_state(), index_course_dirs(APUNTES_BASE, arbol.catalogo()))
+        if completados:
+            save_state(completados, fusionar=True)
+        print(f"✓ Migrados al almacén: {len(migrados)} PDFs "
+              f"({len(set(migrados.values()))} contenidos distintos, {len(completados)} con su .qmd).")
+
+    if args.optimizar_almacen:
+        if not optimizar.herramientas():
+            print("ℹ️ --optimizar-almacen: no encontré gs ni qpdf; el almacén queda igual.")
+        else:
+            r = optimizar_almacen(perf)
+            arbol.escritos += r["cambiados"]  # también cuentan como páginas afectadas
+            print(f"🗜  Almacén: {r['blobs']} PDFs más livianos ({r['bytes_ahorrados'] / (1024 * 1024):.1f} MB menos), "
+                  f"{len(r['cambiados'])} .qmd reescritos.")
+
+    if args.listados:
+        cambiados = actualizar_listados(perf=perf, cat=arbol.catalogo())
+        print(f"✓ Catálogo de apuntes al día ({len(cambiados)} listados reescritos).")
+        indexar_texto(jobs, perf)
+        publicar_afectadas(arbol.escritos + cambiados, args, perf)
+        cerrar_perfil(perf, args); return
+
+    if args.watch:
+        PDF_DIR.mkdir(parents=True, exist_ok=True)
+        vigilar(jobs, args, perf); return
+
+    # resources/pdfs no está versionado: en un checkout limpio puede no existir
+    pdfs = [] if args.zip or not PDF_DIR.exists() else sorted(PDF_DIR.glob("*.pdf"))
+    if not pdfs and not args.zip:
+        print("No se encontraron PDFs en", PDF_DIR if PDF_DIR.exists() else f"{PDF_DIR} (no existe)")
+        # los listados .yml son la única fuente de index.qmd, cursos.qmd y los cursos:
+        # se ponen al día igual (solo se reescriben los que cambiaron); el índice de búsqueda también
+        indexar_texto(jobs, perf)
+        publicar_afectadas(arbol.escritos + actualizar_listados(perf=perf, cat=arbol.catalogo()), args, perf)
+        cerrar_perfil(perf, args); return
+
+    with perf.etapa("indice_cursos"):
+        course_index = index_course_dirs(APUNTES_BASE, arbol.catalogo())
+    if args.zip:
+        cont = importar_zips(args.zip, course_index, jobs, perf, args.optimizar, arbol.catalogo())
+        if cont is None:
+            cerrar_perfil(perf, args); return
+    else:
+        cont = ejecutar_lote(pdfs, course_index, jobs, perf, args.optimizar, arbol.catalogo())
+
+    print(f"\nListo ✅  Generados: {cont['generados']} | Sin cambios: {cont['sin_cambios']} | Pendientes/omitidos: {cont['pendientes']}")
+    print(f"   Escrituras de .qmd evitadas (contenido idéntico): {cont['evitadas']}")
+    if cont["duplicados"]:
+        print(f"   PDFs duplicados (mismo contenido, otro nombre): {cont['duplicados']} → sin bytes extra en el almacén")
+    if cont["bytes_ahorrados"]:
+        print(f"   Optimización: {cont['bytes_ahorrados'] / (1024 * 1024):.1f} MB menos en el almacén")
     if (APUNTES_BASE / "_pendiente").exists():
         print("ℹ️ Algunos apuntes fueron a /apuntes/_pendiente/ por falta de match con curso.")
 
+    indexar_texto(jobs, perf)
+    publicar_afectadas(arbol.escritos + cont["cambiados"], args, perf)
+    cerrar_perfil(perf, args)
+
+def main(argv=None):
+    try:
+        ejecutar(parse_args(argv))
+    except manifiesto.EstadoCorrupto as e:
+        print(f"⛔ {e}"); sys.exit(1)
+
 if __name__ == "__main__":
     main()
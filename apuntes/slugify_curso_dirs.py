@@ -1,51 +1,64 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
+"""
+Renombra las carpetas de curso a slugs (guarda el nombre humano en title.txt).
+
+Primero arma el plan completo (renombres O(1), fusiones solo si el slug ya
+existe), después lo aplica con diario: si se corta, se puede --reanudar o
+--deshacer. Ver apuntes_lib/migracion.py.
+
+  python3 apuntes/slugify_curso_dirs.py [--plan | --reanudar | --deshacer]
+"""
 from pathlib import Path
-import re, unicodedata, shutil
+import argparse, sys
 
-BASE = Path("apuntes")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+from apuntes_lib import migracion
+from apuntes_lib.arbol import Arbol
 
-def strip_accents(s):
-    return "".join(c for c in unicodedata.normalize("NFD", s) if unicodedata.category(c) != "Mn")
+BASE = Path("apuntes")
 
-def slugify(s):
-    s2 = strip_accents(s).lower()
-    s2 = re.sub(r"[^a-z0-9]+", "-", s2).strip("-")
-    return s2 or "curso"
+def configurar(ap: argparse.ArgumentParser):
+    g = ap.add_mutually_exclusive_group()
+    g.add_argument("--plan", action="store_true", help="Solo muestra el plan, no toca nada.")
+    g.add_argument("--reanudar", action="store_true", help="Termina una migración que quedó a medias.")
+    g.add_argument("--deshacer", action="store_true", help="Revierte una migración que quedó a medias.")
 
-def main():
+def ejecutar(args, arbol: Arbol | None = None):
+    arbol = arbol or Arbol(BASE)
     if not BASE.exists():
         print("No encuentro /apuntes"); return
-    ren = 0
-    for anio in sorted(BASE.glob("anio-*")):
-        for sem in sorted(anio.glob("sem-*")):
-            for curso_dir in list(sem.iterdir()):
-                if not curso_dir.is_dir():
-                    continue
-                human = curso_dir.name
-                slug = slugify(human)
-                if human == slug:
-                    # ya está en slug
-                    # aseguremos que tenga title.txt con el nombre humano (por si no existe)
-                    tt = curso_dir / "title.txt"
-                    if not tt.exists():
-                        tt.write_text(human, encoding="utf-8")
-                    continue
-                target = sem / slug
-                target.mkdir(parents=True, exist_ok=True)
-                # mover contenido
-                for p in curso_dir.iterdir():
-                    shutil.move(str(p), str(target / p.name))
-                # guardar nombre bonito
-                (target / "title.txt").write_text(human, encoding="utf-8")
-                # borrar carpeta antigua (si queda vacía)
-                try:
-                    curso_dir.rmdir()
-                except OSError:
-                    pass
-                print(f"✓ {human}  →  {target.name}")
-                ren += 1
-    print(f"\nListo. Carpetas renombradas: {ren}")
+
+    pendiente = migracion.DIARIO_FILE.exists()
+    if args.deshacer or args.reanudar:
+        if not pendiente:
+            print("No hay una migración a medias."); return
+        if args.deshacer:
+            print(f"↩ Revertidas {migracion.deshacer()} acciones."); arbol.invalidar(); return
+        choques = migracion.reanudar()
+        arbol.invalidar()
+        print("✓ Migración terminada.")
+    else:
+        if pendiente:
+            print(f"⚠️ Hay una migración a medias ({migracion.DIARIO_FILE}): usa --reanudar o --deshacer."); return
+        plan = migracion.planificar(BASE, asegurar_title=True, cat=arbol.catalogo())
+        for destino, origenes in plan["colisiones"]:
+            print(f"⚠️ Colisión de slug en {destino}: {', '.join(origenes)}")
+        for paso in plan["pasos"]:
+            print(("[plan] " if args.plan else "✓ ") + migracion.describir(paso))
+        if args.plan or not plan["pasos"]:
+            print(f"\n{'Plan' if args.plan else 'Listo'}: {len(plan['pasos'])} pasos."); return
+        choques = migracion.aplicar(plan)
+        arbol.invalidar()
+        print(f"\nListo. Carpetas renombradas: {sum(p['tipo'] == 'renombrar' for p in plan['pasos'])} "
+              f"| fusionadas: {sum(p['tipo'] == 'fusionar' for p in plan['pasos'])}")
+    for p in choques:
+        print(f"⚠️ No se movió {p}: ya existe en la carpeta destino (revísalo a mano).")
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Migra las carpetas de curso de /apuntes a slugs.")
+    configurar(ap)
+    ejecutar(ap.parse_args(argv))
 
 if __name__ == "__main__":
     main()
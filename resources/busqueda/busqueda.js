@@ -0,0 +1,62 @@
+// Búsqueda de texto completo en los PDFs (índice generado por genera_qmd_desde_pdfs.py).
+// Baja indice.json, descarta con el filtro de Bloom los shards que no pueden tener
+// todos los términos y solo pide esos shards (cacheados en memoria).
+(function () {
+  const BASE = "/resources/busqueda/";
+  const TOKEN_MAX = 30;
+  const STOP = new Set(("que los las del por una con para como mas pero sus este esta esto estos estas entre sobre " +
+    "son ser fue han hay sin tambien donde cuando muy desde todo todos todas ese esa eso les " +
+    "nos era sino porque cual cuales otro otra otros otras mismo misma ello ellos ellas hasta").split(" "));
+  let indice = null;
+  const shards = new Map();
+  const bits = new Map();
+
+  function tokens(q) {
+    const s = q.normalize("NFD").replace(/[̀-ͯ]/g, "").toLowerCase();
+    return [...new Set((s.match(/[a-z0-9]{3,}/g) || []).filter(t => t.length <= TOKEN_MAX && !STOP.has(t)))];
+  }
+  function fnv(s, h) {
+    for (let i = 0; i < s.length; i++) { h ^= s.charCodeAt(i); h = Math.imul(h, 0x01000193) >>> 0; }
+    return h >>> 0;
+  }
+  function quizas(sh, t) {
+    if (!bits.has(sh.key)) bits.set(sh.key, Uint8Array.from(atob(sh.bloom), c => c.charCodeAt(0)));
+    const b = bits.get(sh.key), h1 = fnv(t, 0x811c9dc5), h2 = (fnv(t, 0x050c5d1f) | 1) >>> 0;
+    for (let i = 0; i < indice.k; i++) {
+      const p = Number((BigInt(h1) + BigInt(i) * BigInt(h2)) % BigInt(sh.m));
+      if (!(b[p >> 3] & (1 << (p & 7)))) return false;
+    }
+    return true;
+  }
+  async function shard(sh) {
+    if (!shards.has(sh.key)) shards.set(sh.key, fetch(BASE + sh.url).then(r => r.json()));
+    return shards.get(sh.key);
+  }
+
+  // filtro: prefijo de shard opcional, p. ej. "anio-2" o "anio-2/sem-03"
+  async function buscar(q, filtro) {
+    const ts = tokens(q);
+    if (!ts.length) return [];
+    if (!indice) indice = await (await fetch(BASE + "indice.json")).json();
+    const candidatos = indice.shards.filter(sh =>
+      (!filtro || sh.key.startsWith(filtro)) && ts.every(t => quizas(sh, t)));
+    const res = [];
+    for (const data of await Promise.all(candidatos.map(shard))) {
+      const puntaje = new Map();
+      let vivos = null;
+      for (const t of ts) {
+        const post = data.terms[t];
+        if (!post) { vivos = new Set(); break; }
+        const aca = new Set();
+        for (let i = 0; i < post.length; i += 2) {
+          aca.add(post[i]); puntaje.set(post[i], (puntaje.get(post[i]) || 0) + post[i + 1]);
+        }
+        vivos = vivos ? new Set([...vivos].filter(d => aca.has(d))) : aca;
+      }
+      for (const d of vivos) res.push({ ...data.docs[d], puntaje: puntaje.get(d) });
+    }
+    return res.sort((a, b) => b.puntaje - a.puntaje);
+  }
+
+  window.buscarEnPDFs = buscar;
+})();
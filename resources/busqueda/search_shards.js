@@ -0,0 +1,42 @@
+// Cargador para el buscador de Quarto: cuando pide search.json, arma la
+// respuesta con core.json + titulos.json + el texto completo del semestre (o
+// año) de la página actual, desde docs/search/ (lo genera partir_search_json.py).
+// Si algo falla, deja pasar la petición original a search.json.
+(function () {
+  const fetchOriginal = window.fetch.bind(window);
+
+  function restaurar(d) {
+    if (d.objectID === undefined) d.objectID = d.href;
+    if (d.section === undefined) d.section = "";
+    if (d.text === undefined) d.text = "";
+    return d;
+  }
+  async function json(url) {
+    const r = await fetchOriginal(url);
+    if (r.status !== 200) throw new Error(url + ": " + r.status);
+    return r.json();
+  }
+
+  async function armar(base) {
+    const m = window.location.pathname.match(/apuntes\/(anio-\d+)(?:\/(sem-\d+))?/);
+    const indice = await json(base + "indice.json");
+    const prefijo = m ? (m[2] ? `${m[1]}-${m[2]}` : `${m[1]}-`) : null;
+    const elegidos = prefijo ? indice.shards.filter(s => s.key.startsWith(prefijo)) : [];
+    const partes = await Promise.all(
+      [base + "core.json", base + "titulos.json", ...elegidos.map(s => base + s.url)].map(json));
+    const [core, titulos, ...completos] = partes;
+    const conTexto = new Set();
+    for (const docs of completos) for (const d of docs) conTexto.add(d.href.split("#")[0]);
+    const docs = core.concat(titulos.filter(d => !conTexto.has(d.href)), ...completos);
+    return docs.map(restaurar);
+  }
+
+  window.fetch = function (recurso, opciones) {
+    const url = typeof recurso === "string" ? recurso : (recurso && recurso.url) || "";
+    if (!/(^|\/)search\.json$/.test(url)) return fetchOriginal(recurso, opciones);
+    const base = new URL("search/", new URL(url, window.location.href)).href;
+    return armar(base)
+      .then(docs => new Response(JSON.stringify(docs), { status: 200, headers: { "Content-Type": "application/json" } }))
+      .catch(() => fetchOriginal(recurso, opciones));
+  };
+})();
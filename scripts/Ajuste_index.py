@@ -2,120 +2,91 @@
 # -*- coding: utf-8 -*-
 
 from pathlib import Path
-import re
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 import argparse
-import shutil
+import os
+
+from apuntes_lib import catalogo, qmd, respaldos
+from apuntes_lib.arbol import Arbol
 
 BASE = Path("apuntes")
 NEW_DESC = 'Síntesis, resúmenes y apuntes del ramo.'  # ← la nueva descripción
 
-def backup_file(path: Path) -> Path:
-    bak = path.with_suffix(path.suffix + ".bak")
-    if not bak.exists():
-        shutil.copy2(path, bak)
-        return bak
-    i = 1
-    while True:
-        cand = path.with_suffix(path.suffix + f".bak.{i}")
-        if not cand.exists():
-            shutil.copy2(path, cand)
-            return cand
-        i += 1
-
-def replace_description(frontmatter: str) -> str:
-    """
-    Reemplaza (o inserta si no existiera) description: "<...>" dentro del YAML.
-    Solo actúa sobre el texto de frontmatter recibido (entre los ---).
-    """
-    # Si ya hay description: ... (en una línea)
-    if re.search(r'(?m)^description:\s*(?:"[^"]*"|[^\n]+)\s*$', frontmatter):
-        return re.sub(
-            r'(?m)^(description:\s*)(?:"[^"]*"|[^\n]+)\s*$',
-            rf'\1"{NEW_DESC}"',
-            frontmatter
-        )
-    # Si no hay, lo insertamos tras 'title:' (si existe) o al inicio
-    if re.search(r'(?m)^title:\s*', frontmatter):
-        return re.sub(
-            r'(?m)^(title:\s*[^\n]*\n)',
-            rf'\1description: "{NEW_DESC}"\n',
-            frontmatter,
-            count=1
-        )
-    else:
-        # lo ponemos al principio
-        return f'description: "{NEW_DESC}"\n' + frontmatter
-
-def remove_sobre_este_curso(body: str) -> str:
-    """
-    Elimina el bloque que inicia en '## Sobre este curso' hasta el siguiente encabezado
-    (## o ###), o el bloque de listado, o el final del archivo.
-    Es tolerante con espacios y variaciones leves.
-    """
-    patrón = (
-        r'(?ms)'                                   # multi-línea + dotall
-        r'^\s*##\s*Sobre\s+este\s+curso\s*\n'      # el título
-        r'(?:.*?\n)*?'                              # contenido del bloque (no codicioso)
-        r'(?='
-        r'^\s*#{2,}\s'                              # siguiente encabezado (## o ###)
-        r'|^\s*:::\s*\{#apuntes-curso\}'            # o el bloque de listing
-        r'|\Z'                                      # o final de archivo
-        r')'
-    )
-    return re.sub(patrón, '', body)
-
-def process_file(path: Path, apply: bool, no_backup: bool) -> bool:
-    text = path.read_text(encoding="utf-8")
-
-    # separar front matter YAML y el resto del documento
-    m = re.match(r'(?ms)^---\n(.*?)\n---\n(.*)$', text)
-    if not m:
-        # archivo sin front matter: solo eliminamos el bloque si existiera
-        new_body = remove_sobre_este_curso(text)
-        changed = (new_body != text)
-        if changed and apply:
-            if not no_backup: backup_file(path)
-            path.write_text(new_body, encoding="utf-8")
-        return changed
-
-    fm, body = m.group(1), m.group(2)
-    new_fm = replace_description(fm)
-    new_body = remove_sobre_este_curso(body)
-
-    new_text = f"---\n{new_fm}\n---\n{new_body}"
-    changed = (new_text != text)
-
-    if changed and apply:
-        if not no_backup: backup_file(path)
-        path.write_text(new_text, encoding="utf-8")
-
-    return changed
-
-def main():
-    ap = argparse.ArgumentParser(
-        description="Ajusta description y elimina bloque '## Sobre este curso' en todos los index.qmd."
-    )
+# Ediciones declarativas (editor de una pasada en apuntes_lib/qmd.py):
+#  - description: "<NEW_DESC>" (reemplaza o inserta tras title:)
+#  - elimina '## Sobre este curso' hasta el siguiente encabezado, el listing o el final
+OPERACIONES = [
+    qmd.poner_clave("description", f'"{NEW_DESC}"', despues_de="title"),
+    qmd.borrar_seccion(r"^sobre\s+este\s+curso$", hasta_div="apuntes-curso", nivel=2),
+]
+
+def process_file(path: Path, apply: bool, no_backup: bool):
+    """Devuelve (cambió, sha256 del respaldo o None). El índice de la instantánea lo arma main()."""
+    sha = []
+    respaldo = None if no_backup else (lambda p: sha.append(respaldos.guardar_objeto(p)))
+    changed = qmd.editar_archivo(path, OPERACIONES, escribir=apply, respaldo=respaldo)
+    return changed, (sha[0] if sha else None)
+
+def ajustar_en_arbol(arbol: Arbol, path: Path, apply: bool, no_backup: bool):
+    """Igual que process_file pero sobre el árbol en memoria (build): lee y deja pendiente ahí."""
+    texto = arbol.leer(path)
+    nuevo = qmd.aplicar(texto, OPERACIONES)
+    if nuevo is texto:
+        return False, None
+    sha = respaldos.guardar_objeto(path) if apply and not no_backup and path.exists() else None
+    if apply:
+        arbol.escribir(path, nuevo)
+    return True, sha
+
+def configurar(ap: argparse.ArgumentParser):
     ap.add_argument("--dry-run", action="store_true", help="Muestra cambios, no escribe.")
-    ap.add_argument("--no-backup", action="store_true", help="No crear .bak antes de sobrescribir.")
-    args = ap.parse_args()
+    ap.add_argument("--no-backup", action="store_true", help="No respaldar antes de sobrescribir (ver scripts/respaldos.py).")
+    ap.add_argument("-j", "--jobs", type=int, default=1, help="Procesos en paralelo (0 = todos los núcleos).")
 
+def ejecutar(args, arbol: Arbol | None = None):
+    """Con `arbol` (build) edita en memoria, en serie; si no, en disco con -j procesos."""
     if not BASE.exists():
         print("No encuentro 'apuntes/'. Ejecútalo desde la raíz del repo.")
         return
 
-    files = list(BASE.glob("anio-*/sem-*/**/index.qmd"))
+    # index.qmd de cada curso según el catálogo compartido (sin recorrer el árbol)
+    cursos = arbol.cursos() if arbol else catalogo.cursos(catalogo.cargar(BASE))
+    files = [f for f in (Path(c["dir"]) / "index.qmd" for c in cursos) if (arbol.existe(f) if arbol else f.exists())]
     if not files:
         print("No se encontraron index.qmd.")
         return
 
+    files = sorted(files)
+    tarea = partial(process_file, apply=not args.dry_run, no_backup=args.no_backup)
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    if arbol:
+        resultados = [ajustar_en_arbol(arbol, f, not args.dry_run, args.no_backup) for f in files]
+    elif jobs > 1 and len(files) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as ex:
+            resultados = list(ex.map(tarea, files, chunksize=32))
+    else:
+        resultados = [tarea(f) for f in files]
+
     changed = 0
-    for f in sorted(files):
-        did = process_file(f, apply=not args.dry_run, no_backup=args.no_backup)
+    snap = respaldos.Instantanea("Ajuste_index")
+    for f, (did, sha) in zip(files, resultados):
+        if sha:
+            snap.agregar(f, sha)
         if did:
             changed += 1
             print(("Modificado " if not args.dry_run else "[dry-run] Modificaría ") + str(f))
+    if snap.cerrar():
+        print(f"💾 Respaldo: instantánea {snap.id} (python3 scripts/respaldos.py restaurar {snap.id})")
 
     print(f"\nListo. {('Modificados' if not args.dry_run else 'Marcaría para modificar')}: {changed} / {len(files)}")
 
+def main(argv=None):
+    ap = argparse.ArgumentParser(
+        description="Ajusta description y elimina bloque '## Sobre este curso' en todos los index.qmd."
+    )
+    configurar(ap)
+    ejecutar(ap.parse_args(argv))
+
 if __name__ == "__main__":
     main()
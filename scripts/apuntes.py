@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Punto de entrada único para los scripts de apuntes (desde la raíz del repo):
+
+    python3 scripts/apuntes.py build [-j N] [--afectadas ARCHIVO] [--quarto-render]
+    python3 scripts/apuntes.py <comando> [opciones del script]
+    python3 scripts/apuntes.py <comando> -h
+
+Cada comando importa su script recién al usarse (arranque rápido: `-h` no carga
+nada). `build` corre en un solo proceso, y sobre un mismo árbol en memoria
+(apuntes_lib/arbol.py), lo que antes eran cinco procesos del deploy:
+
+    estructura → slugs → indices → ajustar → generar
+
+El catálogo de cursos se carga una vez, los index.qmd se arman y retocan en
+memoria y cada archivo se escribe a lo más una vez.
+"""
+
+from pathlib import Path
+import argparse, importlib, sys, time
+
+REPO = Path(__file__).resolve().parent.parent
+
+# comando -> (carpeta del script, módulo, descripción)
+COMANDOS = {
+    "estructura": ("scripts", "crear_estructura", "Crea las carpetas anio-X/sem-YY/<ramo> de la malla."),
+    "slugs":      ("apuntes", "slugify_curso_dirs", "Migra las carpetas de curso a slugs (con diario)."),
+    "indices":    ("scripts", "crear_index_por_curso", "Crea o sobrescribe el index.qmd de cada curso."),
+    "ajustar":    ("scripts", "Ajuste_index", "Ajusta description y secciones de los index.qmd."),
+    "generar":    ("apuntes", "genera_qmd_desde_pdfs", "Genera los .qmd desde resources/pdfs."),
+    "subidas":    ("scripts", "servidor_subidas", "Servidor local de aportes (PUT de PDFs → generador)."),
+    "nombres":    ("scripts", "validar_nombres", "Valida nombres de PDF y reporta rechazados/ambiguos."),
+    "variantes":  ("scripts", "variantes_imagenes", "Variantes WebP/JPEG de las imágenes."),
+    "respaldos":  ("scripts", "respaldos", "Lista y restaura instantáneas de respaldo."),
+    "search":     ("scripts", "partir_search_json", "Parte docs/search.json en shards (post-render)."),
+    "enlaces":    ("scripts", "materializar_enlaces", "Symlinks de docs/ → hard links al blob (post-render)."),
+}
+ETAPAS_BUILD = ["estructura", "slugs", "indices", "ajustar", "generar"]
+
+def cargar(comando: str):
+    carpeta, modulo, _ = COMANDOS[comando]
+    ruta = str(REPO / carpeta)
+    if ruta not in sys.path:
+        sys.path.insert(0, ruta)
+    return importlib.import_module(modulo)
+
+def opciones(comando: str, argv: list):
+    """Namespace con los defaults del script (más `argv`), sin pasar por su main()."""
+    mod = cargar(comando)
+    ap = argparse.ArgumentParser(prog=f"apuntes.py {comando}")
+    mod.configurar(ap)
+    return mod, ap.parse_args(argv)
+
+def build(argv: list):
+    ap = argparse.ArgumentParser(prog="apuntes.py build",
+                                 description="Todas las etapas del deploy en un proceso: " + " → ".join(ETAPAS_BUILD))
+    ap.add_argument("-j", "--jobs", type=int, default=1, help="Procesos para el trabajo por PDF (0 = todos).")
+    ap.add_argument("--afectadas", metavar="ARCHIVO", help="Escribe ahí las páginas a re-renderizar.")
+    ap.add_argument("--quarto-render", action="store_true", help="Renderiza solo las páginas afectadas.")
+    ap.add_argument("--optimizar", action="store_true", help="Optimiza los PDFs nuevos (gs/qpdf).")
+    ap.add_argument("--profile", action="store_true", help="Perfil por etapa del generador.")
+    args = ap.parse_args(argv)
+
+    from apuntes_lib.arbol import Arbol
+    arbol = Arbol(Path("apuntes"))
+    extra = {"generar": ["-j", str(args.jobs)] + (["--afectadas", args.afectadas] if args.afectadas else [])
+             + (["--quarto-render"] if args.quarto_render else []) + (["--optimizar"] if args.optimizar else [])
+             + (["--profile"] if args.profile else [])}
+    tiempos = []
+    for etapa in ETAPAS_BUILD:
+        print(f"\n━━ {etapa} ━━")
+        t0 = time.perf_counter()
+        mod, ns = opciones(etapa, extra.get(etapa, []))
+        mod.ejecutar(ns, arbol)
+        tiempos.append((etapa, time.perf_counter() - t0))
+    arbol.volcar()
+
+    print("\n⏱  Build:", " | ".join(f"{e} {s:.2f}s" for e, s in tiempos))
+    print(f"   Escritos a través del árbol compartido: {len(arbol.escritos)} (uno por archivo)")
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] in ("-h", "--help") or (argv[0] not in COMANDOS and argv[0] != "build"):
+        print(__doc__.strip().split("\n\n")[0] + "\n")
+        print(f"  {'build':<11} Todas las etapas del deploy en un proceso ({' → '.join(ETAPAS_BUILD)}).")
+        for nombre, (_, _, desc) in COMANDOS.items():
+            print(f"  {nombre:<11} {desc}")
+        if argv and argv[0] not in ("-h", "--help"):
+            print(f"\nComando desconocido: {argv[0]}"); sys.exit(2)
+        return
+    comando, resto = argv[0], argv[1:]
+    if comando == "build":
+        return build(resto)
+    mod = cargar(comando)
+    sys.argv = [f"apuntes.py {comando}", *resto]
+    mod.main()
+
+if __name__ == "__main__":
+    main()
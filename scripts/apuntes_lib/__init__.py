@@ -0,0 +1,7 @@
+# -*- coding: utf-8 -*-
+"""
+Código compartido por los scripts de /scripts y /apuntes.
+
+Los scripts de /scripts lo importan directo (`from apuntes_lib import ...`);
+los de /apuntes agregan /scripts al sys.path antes de importarlo.
+"""
@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+"""
+Almacén de PDFs direccionado por contenido.
+
+Cada PDF se guarda una sola vez como resources/apuntes_store/<sha256>.pdf y
+resources/apuntes_Listos/<nombre original> pasa a ser un symlink relativo al
+blob, así la URL por nombre sigue funcionando. Un PDF idéntico subido con otro
+nombre solo agrega un symlink (cero bytes extra en el repo), y las páginas
+nuevas enlazan al blob, así el deploy tampoco lo copia dos veces.
+nombres.json (nombre → sha256) sirve de mapa de redirección.
+
+Ingresar es un os.link + unlink (O(1) en el mismo filesystem). El link falla si
+el blob ya existe, así dos workers con el mismo contenido no cuentan ambos como
+nuevo. Solo si el origen está en otro filesystem se cae a copiar, con aviso.
+ingresar_flujo() recibe un
+flujo (p. ej. un miembro de un ZIP) y lo deja como blob en una pasada.
+
+Publicación: _quarto.yml copia resources/apuntes_store/** a docs/ y el
+post-render (scripts/materializar_enlaces.py) cambia los symlinks que hayan
+quedado en docs/ por hard links a esos blobs.
+"""
+
+from pathlib import Path
+import errno, hashlib, json, os, shutil, uuid
+
+from .escritura import escribir_si_cambia
+
+STORE_DIR = Path("resources/apuntes_store")
+SITE_BASE_STORE = "/resources/apuntes_store"
+MAPA_FILE = "nombres.json"
+
+def ruta_blob(sha: str, store: Path = STORE_DIR) -> Path:
+    return store / f"{sha}.pdf"
+
+def url_blob(sha: str) -> str:
+    return f"{SITE_BASE_STORE}/{sha}.pdf"
+
+def _publicar(src: Path, blob: Path) -> bool:
+    """
+    Deja `src` como `blob` y lo saca de su lugar. True si el blob es nuevo.
+    os.link falla con FileExistsError si el blob ya está (otro worker con el mismo
+    contenido se adelantó): "nuevo" sale del propio enlace, no de un exists() previo.
+    """
+    try:
+        os.link(src, blob)
+    except FileExistsError:
+        src.unlink()
+        return False
+    except OSError as e:
+        if e.errno not in (errno.EPERM, errno.ENOTSUP, errno.EMLINK):
+            raise
+        # filesystem sin hard links: rename (aquí sí puede haber una carrera, sin daño)
+        nuevo = not blob.exists()
+        os.replace(src, blob)
+        return nuevo
+    src.unlink()
+    return True
+
+def ingresar(pdf: Path, sha: str, store: Path = STORE_DIR):
+    """
+    Mueve `pdf` al almacén. Devuelve (blob, nuevo, avisos); si el blob ya existía
+    (duplicado) el archivo entrante simplemente se borra.
+    """
+    blob = ruta_blob(sha, store)
+    store.mkdir(parents=True, exist_ok=True)
+    try:
+        return blob, _publicar(pdf, blob), []
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+    # otro filesystem: copia a un temporal dentro del almacén y de ahí se publica
+    tmp = store / f".entrando-{uuid.uuid4().hex}.part"
+    try:
+        shutil.copy2(pdf, tmp)
+        nuevo = _publicar(tmp, blob)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+    pdf.unlink()
+    return blob, nuevo, [f"⚠️ {pdf.name}: origen en otro filesystem, se copió en vez de renombrar."] if nuevo else []
+
+def sha256_archivo(path: Path, trozo: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for b in iter(lambda: f.read(trozo), b""):
+            h.update(b)
+    return h.hexdigest()
+
+def ingresar_flujo(fuente, store: Path = STORE_DIR, preparar=None, publicado=None, trozo: int = 1 << 20) -> tuple:
+    """
+    Copia `fuente` (algo con .read(n)) al almacén calculando el sha256 mientras
+    escribe. Devuelve (blob, sha, sha_blob, nuevo, bytes): `sha` es el del
+    contenido leído y `sha_blob` el del blob (distinto si `preparar` lo cambió).
+    En disco solo queda el temporal del archivo en curso, dentro del almacén (el
+    rename final es O(1)); si el contenido ya estaba, se borra.
+    `publicado(sha)` da el sha del blob que ya publica ese contenido (alias del
+    manifiesto) o None. `preparar(tmp)` corre solo con contenido nuevo, antes de
+    dejarlo como blob (p. ej. optimizar), y devuelve True si cambió los bytes:
+    el blob se nombra por lo que queda, nunca por lo que entró.
+    """
+    store.mkdir(parents=True, exist_ok=True)
+    tmp = store / f".entrando-{uuid.uuid4().hex}.part"
+    h, n = hashlib.sha256(), 0
+    try:
+        with open(tmp, "wb") as f:
+            while True:
+                b = fuente.read(trozo)
+                if not b:
+                    break
+                h.update(b); f.write(b); n += len(b)
+        sha = h.hexdigest()
+        sha_blob = (publicado(sha) if publicado else None) or sha
+        blob = ruta_blob(sha_blob, store)
+        if blob.exists():
+            return blob, sha, sha_blob, False, n  # atajo: no vale la pena preparar un duplicado
+        sha_blob = sha
+        if preparar and preparar(tmp):
+            sha_blob = sha256_archivo(tmp)
+        blob = ruta_blob(sha_blob, store)
+        return blob, sha, sha_blob, _publicar(tmp, blob), n
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+
+def enlazar(nombre: Path, blob: Path):
+    """Deja `nombre` apuntando a `blob` (symlink relativo; si no se puede, hard link)."""
+    nombre.parent.mkdir(parents=True, exist_ok=True)
+    tmp = nombre.with_name(f".{nombre.name}.lnk-{os.getpid()}")
+    if tmp.is_symlink() or tmp.exists():
+        tmp.unlink()
+    try:
+        os.symlink(os.path.relpath(blob, nombre.parent), tmp)
+    except (OSError, NotImplementedError):
+        os.link(blob, tmp)
+    os.replace(tmp, nombre)
+
+def materializar_enlaces(salida: Path, raiz: Path = Path(".")) -> dict:
+    """
+    Post-render: cambia cada symlink bajo `salida` (docs/) por un hard link al
+    blob ya copiado en salida/resources/apuntes_store (si falta, al del repo;
+    si no se puede enlazar, copia). Quarto puede copiar el symlink tal cual
+    (relativo: solo resuelve si el almacén también se copió) y GitHub Pages no
+    sirve symlinks; con hard links el sitio no depende de eso y git guarda un
+    solo objeto por contenido. Devuelve {"enlazados", "copiados", "rotos"}.
+    """
+    res = {"enlazados": 0, "copiados": 0, "rotos": []}
+    salida, raiz = Path(salida), Path(raiz).resolve()
+    for carpeta, dirs, archivos in os.walk(salida):
+        for nombre in dirs + archivos:
+            p = Path(carpeta) / nombre
+            if not p.is_symlink():
+                continue
+            real = (raiz / p.relative_to(salida)).resolve()
+            if not real.is_file():
+                res["rotos"].append(p.as_posix()); continue
+            try:
+                copia = salida / real.relative_to(raiz)
+            except ValueError:
+                copia = real
+            origen = copia if copia.is_file() and not copia.is_symlink() else real
+            tmp = p.with_name(f".{p.name}.mat-{os.getpid()}")
+            try:
+                os.link(origen, tmp); res["enlazados"] += 1
+            except OSError:
+                shutil.copy2(origen, tmp); res["copiados"] += 1
+            os.replace(tmp, p)
+    return res
+
+def guardar_mapa(mapa: dict, store: Path = STORE_DIR) -> bool:
+    store.mkdir(parents=True, exist_ok=True)
+    return escribir_si_cambia(store / MAPA_FILE, json.dumps(dict(sorted(mapa.items())), ensure_ascii=False, indent=1))
+
+def migrar_directorio(ready_dir: Path, sha_de, store: Path = STORE_DIR) -> dict:
+    """
+    Convierte los PDFs normales de ready_dir en blob + symlink (una vez).
+    `sha_de(path)` calcula el hash. Devuelve {nombre: sha} de lo migrado.
+    """
+    mapa = {}
+    for p in sorted(ready_dir.glob("*.pdf")):
+        if p.is_symlink() or not p.is_file():
+            continue
+        sha = sha_de(p)
+        blob, _, _ = ingresar(p, sha, store)
+        enlazar(p, blob)
+        mapa[p.name] = sha
+    return mapa
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""
+Modelo en memoria del árbol apuntes/ compartido por las etapas de un build.
+
+Cuando los scripts corren por separado cada uno vuelve a cargar el catálogo,
+leer title.txt y parsear front matter. `scripts/apuntes.py build` crea un solo
+Arbol y se lo pasa a cada etapa:
+
+  - catalogo()        se carga una vez; invalidar() tras renombrar carpetas
+  - leer(path)        texto cacheado (ve lo que otra etapa dejó pendiente)
+  - front_matter()    claves de primer nivel, también cacheadas
+  - escribir()        deja el contenido pendiente en memoria
+  - volcar()          escribe cada archivo pendiente una sola vez, y solo si cambió
+
+Así, si crear_index_por_curso arma un index.qmd y Ajuste_index lo retoca, el
+disco ve una sola escritura con el resultado final.
+"""
+
+from pathlib import Path
+
+from . import catalogo, qmd
+from .escritura import contenido_igual, escribir_atomico
+
+class Arbol:
+    def __init__(self, base: Path = catalogo.BASE):
+        self.base = Path(base)
+        self._cat = None
+        self._textos = {}       # ruta -> texto leído del disco
+        self._fm = {}           # ruta -> front matter
+        self._pendientes = {}   # ruta -> texto por escribir (en orden de llegada)
+        self.escritos = []      # rutas que volcar() escribió de verdad
+
+    # ---------- Catálogo ----------
+    def catalogo(self) -> dict:
+        if self._cat is None:
+            self._cat = catalogo.cargar(self.base)
+        return self._cat
+
+    def cursos(self) -> list:
+        return catalogo.cursos(self.catalogo())
+
+    def invalidar(self):
+        """Después de crear o renombrar carpetas: el catálogo y las lecturas ya no sirven."""
+        if self._pendientes:
+            raise RuntimeError("invalidar() con escrituras pendientes: vuelca primero")
+        self._cat = None
+        self._textos.clear(); self._fm.clear()
+
+    # ---------- Archivos ----------
+    def existe(self, path: Path) -> bool:
+        return Path(path).as_posix() in self._pendientes or Path(path).exists()
+
+    def leer(self, path: Path) -> str:
+        clave = Path(path).as_posix()
+        if clave in self._pendientes:
+            return self._pendientes[clave]
+        if clave not in self._textos:
+            self._textos[clave] = Path(path).read_text(encoding="utf-8")
+        return self._textos[clave]
+
+    def front_matter(self, path: Path) -> dict:
+        clave = Path(path).as_posix()
+        if clave not in self._fm:
+            self._fm[clave] = qmd.leer_front_matter(self.leer(path))
+        return self._fm[clave]
+
+    def escribir(self, path: Path, texto: str) -> bool:
+        """Deja `texto` pendiente. True si difiere de lo que había (en disco o pendiente)."""
+        clave = Path(path).as_posix()
+        if self.existe(path) and self.leer(path) == texto:
+            return False
+        self._pendientes[clave] = texto
+        self._fm.pop(clave, None)
+        return True
+
+    def volcar(self) -> list:
+        """Escribe lo pendiente (una vez por archivo, atómico, solo si cambió). Devuelve lo escrito."""
+        escritos = []
+        for clave, texto in self._pendientes.items():
+            if not contenido_igual(Path(clave), texto):
+                Path(clave).parent.mkdir(parents=True, exist_ok=True)
+                escribir_atomico(Path(clave), texto)
+                escritos.append(clave)
+            self._textos[clave] = texto
+        self._pendientes.clear()
+        self.escritos += escritos
+        return escritos
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""
+Catálogo de cursos en disco: apuntes/anio-*/sem-*/<curso>.
+
+Se guarda en .apuntes_catalogo.json y se reconstruye solo si cambió el mtime de
+alguna carpeta anio-*/sem-* (cursos nuevos o renombrados) o de algún title.txt /
+alias.txt (nombres alternativos del curso, uno por línea; opcional).
+Validarlo cuesta un stat por carpeta/curso, no un recorrido de todo el árbol,
+y todos los scripts resuelven los cursos con las mismas reglas.
+"""
+
+from pathlib import Path
+import json, os
+
+from .escritura import escribir_si_cambia
+from .texto import norm_key
+
+BASE = Path("apuntes")
+CACHE_FILE = Path(".apuntes_catalogo.json")
+CATALOGO_VERSION = 2
+
+# ---------- Utilidades ----------
+def _mtime(p: Path):
+    try:
+        return os.stat(p).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+# ---------- Construcción ----------
+def construir(base: Path = BASE) -> dict:
+    """Recorre el árbol una vez y arma el catálogo (sin escribirlo)."""
+    cursos, mtimes = [], {base.as_posix(): _mtime(base)}
+    for anio_dir in sorted(base.glob("anio-*")):
+        if not anio_dir.is_dir():
+            continue
+        mtimes[anio_dir.as_posix()] = _mtime(anio_dir)
+        for sem_dir in sorted(anio_dir.glob("sem-*")):
+            if not sem_dir.is_dir():
+                continue
+            mtimes[sem_dir.as_posix()] = _mtime(sem_dir)
+            for course_dir in sorted(sem_dir.iterdir()):
+                if not course_dir.is_dir():
+                    continue
+                tfile = course_dir / "title.txt"
+                mtimes[tfile.as_posix()] = _mtime(tfile)
+                titulo = course_dir.name
+                if mtimes[tfile.as_posix()] is not None:
+                    titulo = tfile.read_text(encoding="utf-8").strip() or course_dir.name
+                afile = course_dir / "alias.txt"
+                mtimes[afile.as_posix()] = _mtime(afile)
+                alias = []
+                if mtimes[afile.as_posix()] is not None:
+                    alias = [l.strip() for l in afile.read_text(encoding="utf-8").splitlines() if l.strip()]
+                cursos.append({
+                    "dir": course_dir.as_posix(),
+                    "nombre": course_dir.name,
+                    "key": norm_key(course_dir.name),
+                    "titulo": titulo,
+                    "alias": alias,
+                    "anio": anio_dir.name,
+                    "sem": sem_dir.name,
+                })
+    return {"version": CATALOGO_VERSION, "base": base.as_posix(), "mtimes": mtimes, "cursos": cursos}
+
+def es_valido(cat: dict, base: Path = BASE) -> bool:
+    if cat.get("version") != CATALOGO_VERSION or cat.get("base") != base.as_posix():
+        return False
+    return all(_mtime(Path(p)) == m for p, m in cat.get("mtimes", {}).items())
+
+def guardar(cat: dict, cache: Path = CACHE_FILE):
+    escribir_si_cambia(cache, json.dumps(cat, ensure_ascii=False, indent=1))
+
+def cargar(base: Path = BASE, cache: Path = CACHE_FILE, refrescar: bool = False) -> dict:
+    """Devuelve el catálogo desde caché si sigue vigente; si no, lo reconstruye y lo guarda."""
+    if not refrescar and cache.exists():
+        try:
+            cat = json.loads(cache.read_text(encoding="utf-8"))
+            if es_valido(cat, base):
+                return cat
+        except Exception:
+            pass
+    cat = construir(base)
+    try:
+        guardar(cat, cache)
+    except OSError:
+        pass  # sin permiso de escritura: igual sirve en memoria
+    return cat
+
+# ---------- Consultas ----------
+def cursos(cat: dict) -> list:
+    """Cursos ordenados por ruta (anio → sem → carpeta)."""
+    return cat["cursos"]
+
+def index_por_clave(cat: dict) -> dict:
+    """
+    norm_key → [Path de carpeta de curso]. Indexa por nombre de carpeta y por
+    título humano (title.txt), sin duplicar.
+    """
+    index = {}
+    for c in cat["cursos"]:
+        d = Path(c["dir"])
+        for k in (c["key"], norm_key(c["titulo"])):
+            lst = index.setdefault(k, [])
+            if d not in lst:
+                lst.append(d)
+    return index
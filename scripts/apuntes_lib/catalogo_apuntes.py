@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+"""
+Catálogo de apuntes en SQLite (.apuntes_catalogo.sqlite, local, se regenera).
+
+Guarda por nota: curso, año, tema, autores (tabla aparte, con índice), fecha,
+título, descripción, PDF y sha256; y por curso: título, descripción e imagen.
+Con eso escribe los listados ya calculados que leen las páginas (items de
+listado de Quarto en YAML), así el render no tiene que abrir cada .qmd:
+
+  apuntes/<anio>/<sem>/<curso>/_apuntes.yml   notas del curso (index.qmd del curso)
+  apuntes/_ultimos.yml                        notas más recientes (inicio)
+  cursos/_<anio>-<sem>.yml                    tarjetas de cursos (cursos/cursos.qmd)
+
+sincronizar() solo vuelve a leer los .qmd cuyo mtime cambió; el generador
+además registra lo que ya sabe de parse_filename (tema, PDF, sha256).
+"""
+
+from pathlib import Path
+import os, sqlite3
+
+from . import catalogo, qmd
+from .escritura import escribir_si_cambia
+from .plantillas import yaml_str, yaml_lista
+
+DB_FILE = Path(".apuntes_catalogo.sqlite")
+ESQUEMA_VERSION = 1
+ULTIMOS_N = 12
+CURSOS_DIR = Path("cursos")
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS apuntes (
+    qmd TEXT PRIMARY KEY,          -- apuntes/anio-2/sem-04/<curso>/<nota>.qmd
+    curso_dir TEXT NOT NULL,
+    curso TEXT, anio TEXT, tema TEXT,
+    titulo TEXT, descripcion TEXT, fecha TEXT,
+    pdf TEXT, sha256 TEXT,
+    mtime_ns INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS autores (
+    qmd TEXT NOT NULL REFERENCES apuntes(qmd) ON DELETE CASCADE,
+    orden INTEGER NOT NULL,
+    autor TEXT NOT NULL,
+    PRIMARY KEY (qmd, orden)
+);
+CREATE TABLE IF NOT EXISTS cursos (
+    dir TEXT PRIMARY KEY,
+    titulo TEXT, descripcion TEXT, imagen TEXT, anio TEXT, sem TEXT,
+    mtime_ns INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS apuntes_curso ON apuntes(curso_dir, fecha);
+CREATE INDEX IF NOT EXISTS apuntes_anio ON apuntes(anio);
+CREATE INDEX IF NOT EXISTS apuntes_fecha ON apuntes(fecha);
+CREATE INDEX IF NOT EXISTS autores_autor ON autores(autor);
+"""
+
+def abrir(path: Path = DB_FILE) -> sqlite3.Connection:
+    con = sqlite3.connect(str(path))
+    con.row_factory = sqlite3.Row
+    con.execute("PRAGMA foreign_keys = ON")
+    if con.execute("PRAGMA user_version").fetchone()[0] != ESQUEMA_VERSION:
+        # es una caché: si cambia el esquema se rehace desde los .qmd
+        con.executescript("DROP TABLE IF EXISTS autores; DROP TABLE IF EXISTS apuntes; DROP TABLE IF EXISTS cursos;")
+        con.execute(f"PRAGMA user_version = {ESQUEMA_VERSION}")
+    con.executescript(ESQUEMA)
+    return con
+
+# ---------- Carga ----------
+def _leer(path: Path) -> dict:
+    return qmd.leer_front_matter(path.read_text(encoding="utf-8"))
+
+def _guardar_apunte(con, rel: str, curso_dir: str, fm: dict, mtime_ns: int):
+    cats = fm.get("categories") if isinstance(fm.get("categories"), list) else []
+    autores = fm.get("author") if isinstance(fm.get("author"), list) else ([fm["author"]] if fm.get("author") else [])
+    con.execute("""
+        INSERT INTO apuntes (qmd, curso_dir, curso, anio, titulo, descripcion, fecha, mtime_ns)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(qmd) DO UPDATE SET curso_dir=excluded.curso_dir, curso=excluded.curso, anio=excluded.anio,
+            titulo=excluded.titulo, descripcion=excluded.descripcion, fecha=excluded.fecha, mtime_ns=excluded.mtime_ns
+    """, (rel, curso_dir, cats[0] if cats else None, cats[1] if len(cats) > 1 else None,
+          fm.get("title"), fm.get("description"), str(fm.get("date") or ""), mtime_ns))
+    con.execute("DELETE FROM autores WHERE qmd = ?", (rel,))
+    con.executemany("INSERT INTO autores (qmd, orden, autor) VALUES (?, ?, ?)",
+                    [(rel, i, a) for i, a in enumerate(autores)])
+
+def registrar(con, qmd_path: str, meta: dict, pdf: str, sha256: str):
+    """Datos que el generador ya calculó (parse_filename): no hace falta releerlos del .qmd."""
+    con.execute("UPDATE apuntes SET tema = ?, pdf = ?, sha256 = ? WHERE qmd = ?",
+                (meta.get("tema_hum"), pdf, sha256, qmd_path))
+
+def sincronizar(con, base: Path = catalogo.BASE, cat: dict | None = None) -> int:
+    """
+    Pone al día el catálogo con los .qmd del disco. Devuelve cuántos archivos releyó.
+    `cat` es el catálogo de cursos si ya está cargado.
+    """
+    previos = {r["qmd"]: r["mtime_ns"] for r in con.execute("SELECT qmd, mtime_ns FROM apuntes")}
+    previos_cursos = {r["dir"]: r["mtime_ns"] for r in con.execute("SELECT dir, mtime_ns FROM cursos")}
+    cursos = {c["dir"]: c for c in catalogo.cursos(cat or catalogo.cargar(base))}
+    carpetas = list(cursos)
+    pendiente = base / "_pendiente"
+    if pendiente.is_dir():
+        carpetas += sorted(d.path for d in os.scandir(pendiente) if d.is_dir())
+
+    vistos, vistos_cursos, leidos = set(), set(), 0
+    for carpeta in carpetas:
+        rel_dir = Path(carpeta).as_posix()
+        try:
+            entradas = sorted(os.scandir(carpeta), key=lambda e: e.name)
+        except FileNotFoundError:
+            continue
+        for e in entradas:
+            if not e.name.endswith(".qmd") or not e.is_file():
+                continue
+            rel, mtime = f"{rel_dir}/{e.name}", e.stat().st_mtime_ns
+            if e.name == "index.qmd":
+                vistos_cursos.add(rel_dir)
+                if previos_cursos.get(rel_dir) == mtime:
+                    continue
+                fm, c = _leer(Path(e.path)), cursos.get(carpeta, {})
+                con.execute("""INSERT OR REPLACE INTO cursos (dir, titulo, descripcion, imagen, anio, sem, mtime_ns)
+                               VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                            (rel_dir, fm.get("title") or c.get("titulo"), fm.get("description"),
+                             fm.get("image"), c.get("anio"), c.get("sem"), mtime))
+            else:
+                vistos.add(rel)
+                if previos.get(rel) == mtime:
+                    continue
+                _guardar_apunte(con, rel, rel_dir, _leer(Path(e.path)), mtime)
+            leidos += 1
+
+    for rel in set(previos) - vistos:
+        con.execute("DELETE FROM apuntes WHERE qmd = ?", (rel,))
+    for rel in set(previos_cursos) - vistos_cursos:
+        con.execute("DELETE FROM cursos WHERE dir = ?", (rel,))
+    con.commit()
+    return leidos
+
+# ---------- Consultas ----------
+def buscar(con, curso_dir: str | None = None, anio: str | None = None, autor: str | None = None,
+           limite: int | None = None) -> list:
+    """Notas (más recientes primero) filtradas por curso, año y/o autor; usan los índices."""
+    sql, params = "SELECT a.* FROM apuntes a", []
+    conds = []
+    if autor:
+        sql += " JOIN autores au ON au.qmd = a.qmd"
+        conds.append("au.autor = ?"); params.append(autor)
+    if curso_dir:
+        conds.append("a.curso_dir = ?"); params.append(curso_dir)
+    if anio:
+        conds.append("a.anio = ?"); params.append(anio)
+    if conds:
+        sql += " WHERE " + " AND ".join(conds)
+    sql += " ORDER BY a.fecha DESC, a.titulo"
+    if limite:
+        sql += f" LIMIT {int(limite)}"
+    return con.execute(sql, params).fetchall()
+
+def autores_de(con, rel: str) -> list:
+    return [r["autor"] for r in con.execute("SELECT autor FROM autores WHERE qmd = ? ORDER BY orden", (rel,))]
+
+# ---------- Listados ----------
+def url_html(rel: str) -> str:
+    return "/" + Path(rel).with_suffix(".html").as_posix()
+
+def items_yaml(items: list) -> str:
+    """Lista de items de listado de Quarto (solo strings y listas de strings)."""
+    if not items:
+        return "[]\n"
+    out = []
+    for it in items:
+        primera = True
+        for k, v in it.items():
+            if v in (None, "", []):
+                continue
+            val = f"[{yaml_lista(v)}]" if isinstance(v, list) else f'"{yaml_str(v)}"'
+            out.append(("- " if primera else "  ") + f"{k}: {val}")
+            primera = False
+    return "\n".join(out) + "\n"
+
+def _item_apunte(con, r) -> dict:
+    return {"title": r["titulo"], "path": url_html(r["qmd"]), "description": r["descripcion"],
+            "date": r["fecha"], "author": autores_de(con, r["qmd"]),
+            "categories": [x for x in (r["curso"], r["anio"]) if x]}
+
+def escribir_listados(con, base: Path = catalogo.BASE, cursos_dir: Path = CURSOS_DIR) -> list:
+    """Escribe los .yml de listados que cambiaron. Devuelve sus rutas (para el grafo de páginas)."""
+    cambiados = []
+
+    def escribir(path: Path, items: list):
+        if escribir_si_cambia(path, items_yaml(items)):
+            cambiados.append(path.as_posix())
+
+    cursos = con.execute("SELECT * FROM cursos ORDER BY anio, sem, titulo").fetchall()
+    for c in cursos:
+        escribir(Path(c["dir"]) / "_apuntes.yml", [_item_apunte(con, r) for r in buscar(con, curso_dir=c["dir"])])
+    escribir(base / "_ultimos.yml", [_item_apunte(con, r) for r in buscar(con, limite=ULTIMOS_N)])
+
+    por_sem = {}
+    for c in cursos:
+        if c["anio"] and c["sem"]:
+            por_sem.setdefault(f"{c['anio']}-{c['sem']}", []).append(
+                {"title": c["titulo"], "path": f"/{c['dir']}/index.html",
+                 "description": c["descripcion"], "image": c["imagen"]})
+    if cursos_dir.is_dir():
+        for clave, items in sorted(por_sem.items()):
+            escribir(cursos_dir / f"_{clave}.yml", items)
+    return cambiados
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""
+Qué páginas de Quarto hay que volver a renderizar después de un cambio.
+
+El grafo sale de los propios `listing: contents:` del sitio: una página con
+listado depende de cada .qmd que calza con sus globs (relativos a la carpeta de
+la página; con "/" inicial, relativos a la raíz; "!" excluye). Si cambia una
+nota se re-renderizan la nota y los listados que la incluyen (el index.qmd del
+curso, y el de inicio/año si sus globs la alcanzan). Si cambia un index.qmd de
+curso, los listados de año y cursos/cursos.qmd que lo incluyen, y así.
+"""
+
+from pathlib import Path, PurePosixPath
+import re, shutil, subprocess
+
+from . import catalogo
+
+# páginas que pueden tener listados (además del index.qmd de cada curso)
+PAGINAS_LISTADO = ["*.qmd", "cursos/*.qmd", "apuntes/*.qmd", "apuntes/anio-*/*.qmd"]
+# lo que Quarto renderiza; el resto (p. ej. los .yml de listados) solo arrastra a sus páginas
+EXT_PAGINA = (".qmd", ".md", ".ipynb")
+
+_FM = re.compile(r"\A---\n(.*?)\n---\n", re.S)
+
+def _glob_a_regex(g: str) -> re.Pattern:
+    """Glob estilo Quarto: * y ? no cruzan '/', ** sí (incluye cero carpetas)."""
+    out, i = [], 0
+    while i < len(g):
+        if g.startswith("**/", i):
+            out.append(r"(?:.*/)?"); i += 3
+        elif g.startswith("**", i):
+            out.append(r".*"); i += 2
+        elif g[i] == "*":
+            out.append(r"[^/]*"); i += 1
+        elif g[i] == "?":
+            out.append(r"[^/]"); i += 1
+        else:
+            out.append(re.escape(g[i])); i += 1
+    return re.compile("".join(out) + r"\Z")
+
+def _normalizar(p: str) -> str:
+    partes = []
+    for x in PurePosixPath(p).parts:
+        if x == "..":
+            if partes:
+                partes.pop()
+        elif x != ".":
+            partes.append(x)
+    return "/".join(partes)
+
+def contents_de_listado(texto: str) -> list:
+    """
+    Extrae los globs de `contents:` del front matter (lista en línea, lista en
+    bloque o string suelto). Parser mínimo: alcanza para los listados del sitio.
+    """
+    m = _FM.match(texto)
+    if not m:
+        return []
+    lineas = m.group(1).splitlines()
+    globs = []
+    for i, l in enumerate(lineas):
+        mm = re.match(r"^(\s*)(?:-\s+)?contents:\s*(.*?)\s*(?:#.*)?$", l)
+        if not mm:
+            continue
+        resto = mm.group(2)
+        if resto.startswith("["):
+            globs += [x.strip().strip("\"'") for x in resto.strip("[]").split(",") if x.strip()]
+        elif resto:
+            globs.append(resto.strip("\"'"))
+        else:
+            for sig in lineas[i + 1:]:
+                it = re.match(r"^\s*-\s+(.*?)\s*(?:#.*)?$", sig)
+                if not it:
+                    break
+                globs.append(it.group(1).strip("\"'"))
+    return globs
+
+class Grafo:
+    def __init__(self, raiz: Path = Path("."), base: Path = catalogo.BASE):
+        self.raiz = raiz
+        self.listados = {}   # página (posix relativa a raíz) → ([regex incluye], [regex excluye])
+        paginas = set()
+        for g in PAGINAS_LISTADO:
+            paginas.update(raiz.glob(g))
+        for c in catalogo.cursos(catalogo.cargar(base)):
+            paginas.add(raiz / c["dir"] / "index.qmd")
+        for p in sorted(paginas):
+            if not p.is_file():
+                continue
+            globs = contents_de_listado(p.read_text(encoding="utf-8"))
+            if not globs:
+                continue
+            rel = p.relative_to(raiz).as_posix()
+            carpeta = PurePosixPath(rel).parent.as_posix()
+            inc, exc = [], []
+            for g in globs:
+                neg = g.startswith("!")
+                g = g[1:] if neg else g
+                g = g[1:] if g.startswith("/") else (f"{carpeta}/{g}" if carpeta != "." else g)
+                (exc if neg else inc).append(_glob_a_regex(_normalizar(g)))
+            self.listados[rel] = (inc, exc)
+
+    def listados_que_incluyen(self, archivo: str) -> list:
+        out = []
+        for pag, (inc, exc) in self.listados.items():
+            if pag != archivo and any(r.match(archivo) for r in inc) and not any(r.match(archivo) for r in exc):
+                out.append(pag)
+        return out
+
+    def afectadas(self, cambiados) -> list:
+        """Páginas a re-renderizar: lo que cambió + los listados que lo muestran."""
+        res = set()
+        for f in cambiados:
+            rel = Path(f).as_posix()
+            if rel.endswith(EXT_PAGINA):
+                res.add(rel)
+            res.update(self.listados_que_incluyen(rel))
+        return sorted(res)
+
+def quarto_render(paginas: list) -> int:
+    """Corre `quarto render` solo sobre esas páginas. Devuelve el código de salida."""
+    if not paginas:
+        return 0
+    quarto = shutil.which("quarto")
+    if not quarto:
+        print("⚠️ No encuentro `quarto` en el PATH; no se renderiza.")
+        return 1
+    return subprocess.call([quarto, "render", *paginas])
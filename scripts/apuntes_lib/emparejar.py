@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""
+Emparejamiento aproximado del curso que viene en el nombre del PDF.
+
+Se arma una vez desde el catálogo (nombre de carpeta, title.txt y alias.txt) con
+dos índices invertidos: prefijos de tokens (abreviaturas, "TeoriaModerna") y
+trigramas (errores de tipeo). Cada consulta solo puntúa a los candidatos que
+comparten algún token/trigrama y queda memorizada.
+"""
+
+from pathlib import Path
+import re
+
+from .texto import strip_accents, norm_key
+
+UMBRAL = 0.70        # puntaje mínimo para aceptar un match aproximado
+MARGEN = 0.08        # si el 2° curso queda a menos de esto del 1°, es ambiguo
+PREFIJO_MIN = 3      # largo mínimo de una abreviatura ("Estad", "Soc")
+STOPWORDS = {"de", "del", "la", "las", "el", "los", "y", "e", "en", "a", "al"}
+
+def tokens(s: str) -> list:
+    """'TeoriaModerna' → ['teoria', 'moderna']; 'Teorías Sociológicas de la...' → ['teoria', 'sociologica', ...]"""
+    s = re.sub(r"(?<=[a-záéíóúñ])(?=[A-ZÁÉÍÓÚÑ])", " ", s)   # separa camelCase
+    out = []
+    for t in re.split(r"[^a-z0-9]+", strip_accents(s).lower()):
+        if not t or t in STOPWORDS:
+            continue
+        if len(t) > 4 and t.endswith("s"):
+            t = t[:-1]   # plural simple: teorias → teoria
+        out.append(t)
+    return out
+
+def trigramas(s: str) -> set:
+    k = f"  {norm_key(s)} "
+    return {k[i:i + 3] for i in range(len(k) - 2)}
+
+def dice(a: set, b: set) -> float:
+    return 2 * len(a & b) / (len(a) + len(b)) if a and b else 0.0
+
+class IndiceCursos:
+    def __init__(self, cat: dict):
+        # cursos con el mismo título (p. ej. "Electivo" en varios semestres) se agrupan:
+        # la primera carpeta manda, igual que el match exacto de siempre
+        self.grupos = []       # [(titulo, [Path, ...], [(tokens, trigramas), ...])]
+        self.exacto = {}       # norm_key → id de grupo
+        self.por_prefijo = {}  # prefijo de token → {id}
+        self.por_trigrama = {} # trigrama → {id}
+        por_titulo = {}
+        for c in cat["cursos"]:
+            k = norm_key(c["titulo"])
+            if k in por_titulo:
+                self.grupos[por_titulo[k]][1].append(Path(c["dir"]))
+                gid = por_titulo[k]
+            else:
+                gid = por_titulo[k] = len(self.grupos)
+                self.grupos.append((c["titulo"], [Path(c["dir"])], []))
+            for nombre in [c["nombre"], c["titulo"], *c.get("alias", [])]:
+                self.exacto.setdefault(norm_key(nombre), gid)
+                toks, tris = tokens(nombre), trigramas(nombre)
+                self.grupos[gid][2].append((toks, tris))
+                for t in toks:
+                    for n in range(min(PREFIJO_MIN, len(t)), len(t) + 1):
+                        self.por_prefijo.setdefault(t[:n], set()).add(gid)
+                for g in tris:
+                    self.por_trigrama.setdefault(g, set()).add(gid)
+        self._memo = {}
+
+    def _puntaje(self, q_toks: list, q_tris: set, gid: int) -> float:
+        mejor = 0.0
+        for toks, tris in self.grupos[gid][2]:
+            s_tok = 0.0
+            if q_toks and toks:
+                m = sum(1 for q in q_toks if any(c == q or (len(q) >= PREFIJO_MIN and c.startswith(q)) for c in toks))
+                s_tok = 0.75 * (m / len(q_toks)) + 0.25 * (m / len(toks))
+            mejor = max(mejor, s_tok, dice(q_tris, tris))
+        return mejor
+
+    def resolver(self, curso_raw: str) -> dict:
+        """
+        Devuelve {"dir": Path|None, "titulo", "score", "modo", "candidatos"} con
+        modo ∈ exacto | aproximado | ambiguo | sin_match.
+        """
+        if curso_raw in self._memo:
+            return self._memo[curso_raw]
+        k = norm_key(curso_raw)
+        if k in self.exacto:
+            titulo, dirs, _ = self.grupos[self.exacto[k]]
+            res = {"dir": dirs[0], "titulo": titulo, "score": 1.0, "modo": "exacto", "candidatos": []}
+            self._memo[curso_raw] = res
+            return res
+
+        q_toks, q_tris = tokens(curso_raw), trigramas(curso_raw)
+        cand = set()
+        for q in q_toks:
+            cand |= self.por_prefijo.get(q if len(q) >= PREFIJO_MIN else "", set())
+        for g in q_tris:
+            cand |= self.por_trigrama.get(g, set())
+        ranking = sorted(((self._puntaje(q_toks, q_tris, gid), gid) for gid in cand), key=lambda x: (-x[0], x[1]))
+        candidatos = [(self.grupos[gid][0], self.grupos[gid][1][0], round(sc, 3)) for sc, gid in ranking[:3]]
+
+        res = {"dir": None, "titulo": None, "score": 0.0, "modo": "sin_match", "candidatos": candidatos}
+        if ranking and ranking[0][0] >= UMBRAL:
+            sc, gid = ranking[0]
+            res["score"] = round(sc, 3)
+            if len(ranking) > 1 and sc - ranking[1][0] < MARGEN:
+                res["modo"] = "ambiguo"
+            else:
+                res.update(dir=self.grupos[gid][1][0], titulo=self.grupos[gid][0], modo="aproximado")
+        self._memo[curso_raw] = res
+        return res
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""
+Escritura "solo si cambia" y atómica.
+
+Reescribir un archivo con los mismos bytes igual le cambia el mtime, y con
+`freeze: auto` Quarto vuelve a renderizar la página. Aquí primero se compara
+(tamaño y luego contenido) y, si de verdad cambió, se escribe a un temporal en
+la misma carpeta y se hace os.replace (nunca queda un archivo a medias).
+"""
+
+from pathlib import Path
+import os
+
+def _a_bytes(data, encoding: str) -> bytes:
+    return data.encode(encoding) if isinstance(data, str) else data
+
+def contenido_igual(path: Path, data, encoding: str = "utf-8") -> bool:
+    b = _a_bytes(data, encoding)
+    try:
+        if os.stat(path).st_size != len(b):
+            return False
+        return Path(path).read_bytes() == b
+    except FileNotFoundError:
+        return False
+
+def escribir_atomico(path: Path, data, encoding: str = "utf-8"):
+    path = Path(path)
+    tmp = path.with_name(f".{path.name}.tmp-{os.getpid()}")
+    try:
+        with open(tmp, "wb") as f:
+            f.write(_a_bytes(data, encoding))
+        os.replace(tmp, path)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+
+def escribir_si_cambia(path: Path, data, encoding: str = "utf-8") -> bool:
+    """Escribe solo si el contenido difiere. Devuelve True si escribió."""
+    if contenido_igual(path, data, encoding):
+        return False
+    escribir_atomico(path, data, encoding)
+    return True
+
+class Contador:
+    """Lleva la cuenta de escrituras hechas y evitadas para el resumen final."""
+    def __init__(self):
+        self.escritos = 0
+        self.evitados = 0
+
+    def escribir(self, path: Path, data, encoding: str = "utf-8") -> bool:
+        hizo = escribir_si_cambia(path, data, encoding)
+        if hizo:
+            self.escritos += 1
+        else:
+            self.evitados += 1
+        return hizo
+
+    def resumen(self) -> str:
+        return f"Escrituras: {self.escritos} | Evitadas (sin cambios): {self.evitados}"
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""
+Variantes redimensionadas de las imágenes del sitio (banners de cursos y
+fotos del equipo) en WebP/JPEG a unos pocos anchos. AVIF no: las imágenes se
+referencian desde `image:` de los listados de Quarto y desde ![]() de markdown,
+que aceptan una sola URL (nada de <picture>), así que una variante AVIF nunca
+se serviría.
+
+Las variantes viven en resources/imagenes/_variantes/<ruta>-<ancho>.<ext> y
+variantes.json guarda el sha256 de cada original: si el original no cambió no
+se vuelve a procesar nada. url_variante() devuelve la variante del tamaño
+pedido, o el original si todavía no hay variantes (sin Pillow, por ejemplo).
+
+Requiere Pillow (opcional).
+"""
+
+from pathlib import Path
+import hashlib, json
+
+from .escritura import escribir_si_cambia
+
+IMAGENES_DIR = Path("resources/imagenes")
+VARIANTES_DIR = IMAGENES_DIR / "_variantes"
+MANIFIESTO_FILE = "variantes.json"
+ANCHOS = (320, 640, 1280)
+ANCHO_TARJETA = 640   # tarjetas de los listados (grid de cursos), 2x para pantallas retina
+ANCHO_FOTO = 320      # avatares del equipo
+EXTENSIONES = (".jpg", ".jpeg", ".png")
+EXT = {"webp": "webp", "jpeg": "jpg"}
+CALIDAD = {"webp": 78, "jpeg": 82}
+PREFERENCIA = ("webp", "jpeg")  # lo que se referencia (y lo único que se genera)
+
+def sha256(path: Path) -> str:
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+def formatos_disponibles() -> list:
+    try:
+        from PIL import features
+    except ImportError:
+        return []
+    fmts = ["jpeg"]
+    if features.check("webp"):
+        fmts.insert(0, "webp")
+    return fmts
+
+def cargar_manifiesto(carpeta: Path = VARIANTES_DIR) -> dict:
+    try:
+        return json.loads((carpeta / MANIFIESTO_FILE).read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        return {}
+
+def guardar_manifiesto(man: dict, carpeta: Path = VARIANTES_DIR) -> bool:
+    carpeta.mkdir(parents=True, exist_ok=True)
+    return escribir_si_cambia(carpeta / MANIFIESTO_FILE, json.dumps(man, ensure_ascii=False, indent=1, sort_keys=True))
+
+def ruta_variante(src: Path, ancho: int, fmt: str, carpeta: Path = VARIANTES_DIR) -> Path:
+    rel = Path(src).relative_to(IMAGENES_DIR).with_suffix("")
+    return carpeta / f"{rel.as_posix()}-{ancho}.{EXT[fmt]}"
+
+def al_dia(src: Path, registro: dict | None, sha: str, fmts: list) -> bool:
+    """Mismo original, mismos formatos (un registro con AVIF de antes se rehace) y archivos presentes."""
+    return bool(registro) and registro.get("sha256") == sha and set(registro["variantes"]) == set(fmts) and all(
+        Path(p).exists() for vs in registro["variantes"].values() for p in vs.values())
+
+def rutas(registro: dict | None) -> set:
+    return {p for vs in (registro or {}).get("variantes", {}).values() for p in vs.values()}
+
+def generar(src: Path, fmts: list, carpeta: Path = VARIANTES_DIR) -> dict:
+    """Escribe las variantes de `src` y devuelve su registro para el manifiesto."""
+    from PIL import Image, ImageOps
+    with Image.open(src) as im:
+        im = ImageOps.exif_transpose(im)
+        if im.mode not in ("RGB", "RGBA"):
+            im = im.convert("RGBA" if "transparency" in im.info else "RGB")
+        ancho, alto = im.size
+        # nunca se agranda: anchos menores al original, o el original si es más chico
+        anchos = [w for w in ANCHOS if w < ancho] or [ancho]
+        variantes = {}
+        for w in anchos:
+            red = im if w == ancho else im.resize((w, round(alto * w / ancho)), Image.LANCZOS)
+            for fmt in fmts:
+                out = ruta_variante(src, w, fmt, carpeta)
+                out.parent.mkdir(parents=True, exist_ok=True)
+                img = red.convert("RGB") if fmt == "jpeg" and red.mode != "RGB" else red
+                tmp = out.with_name(f".{out.name}.tmp")
+                img.save(tmp, format=fmt.upper(), quality=CALIDAD[fmt], optimize=fmt == "jpeg")
+                tmp.replace(out)
+                variantes.setdefault(fmt, {})[str(w)] = out.as_posix()
+    return {"sha256": sha256(src), "ancho": ancho, "alto": alto, "variantes": variantes}
+
+def url_variante(url: str, ancho: int, man: dict | None = None) -> str:
+    """
+    '/resources/imagenes/cursos/x.jpg' → '/resources/imagenes/_variantes/cursos/x-640.webp'
+    (la menor variante con ancho ≥ `ancho`; si no hay, la más grande; si no hay
+    variantes, la misma url).
+    """
+    man = cargar_manifiesto() if man is None else man
+    registro = man.get(url.lstrip("/"))
+    if not registro:
+        return url
+    for fmt in PREFERENCIA:
+        vs = registro["variantes"].get(fmt)
+        if not vs:
+            continue
+        anchos = sorted(int(w) for w in vs)
+        w = next((a for a in anchos if a >= ancho), anchos[-1])
+        return ("/" if url.startswith("/") else "") + vs[str(w)]
+    return url
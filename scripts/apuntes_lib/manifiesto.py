@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+"""
+Manifiesto de build en SQLite (.apuntes_manifest.sqlite, en modo WAL).
+
+Una fila por PDF: la primera fecha de render va en su propia columna y el resto
+de la entrada (sha256, meta, .qmd, URL, sha del .qmd) como JSON. Antes era un
+JSON que cada corrida leía entero y reescribía entero, sin candado: dos
+generadores a la vez (el servidor de subidas, --watch y una corrida a mano) se
+pisaban las fechas, y un corte a medio escribir dejaba un archivo roto que se
+leía como {} (todas las fechas nuevas y render completo).
+
+  - guardar()      upsert solo de las entradas que cambiaron, en una transacción
+                   (BEGIN IMMEDIATE: los escritores se turnan, nadie pisa filas ajenas)
+  - la fecha       se fija una vez: un upsert nunca la reemplaza
+  - WAL            los lectores no esperan al escritor; un corte deja la última
+                   transacción completa, nunca un archivo a medias
+
+Si un PDF se optimizó, el blob lleva el sha de los bytes optimizados
+(blob_sha256) y la tabla alias guarda sha subido → sha del blob, en la misma
+transacción que la entrada: volver a subir el original reutiliza ese blob.
+
+La base SQLite es un caché local (no va en git). Lo versionado son las fechas,
+en .apuntes_first_render.json ({nombre: fecha}, ordenado):
+
+  - exportar_fechas()  una vez al final de cada lote, y solo si hay fechas
+                       nuevas desde la última sincronización
+  - traer_fechas()     al abrir, solo si el JSON cambió desde entonces (mtime +
+                       tamaño guardados en la tabla meta: un stat, sin leerlo);
+                       agrega las fechas que la base no tenga, sin reemplazar ninguna
+
+Un clon nuevo, o un `git pull` con PDFs renderizados en otra máquina, conserva
+los `date:` ya publicados.
+
+La primera vez también importa .apuntes_manifest.json (formato anterior). Si
+algún JSON está roto, se detiene con EstadoCorrupto en vez de empezar de cero.
+"""
+
+from contextlib import contextmanager
+from pathlib import Path
+import json, sqlite3
+
+from .escritura import escribir_si_cambia
+
+DB_FILE = Path(".apuntes_manifest.sqlite")
+JSON_FILE = Path(".apuntes_manifest.json")          # formato anterior (versión 1), se importa una vez
+FECHAS_FILE = Path(".apuntes_first_render.json")    # versionado: {nombre: primera fecha de render}
+ESQUEMA_VERSION = 1
+ESPERA_S = 30                                        # cuánto espera un escritor a que el otro termine
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS entradas (
+    fname TEXT PRIMARY KEY,        -- nombre original del PDF
+    fecha TEXT,                    -- first_render_date (no se reemplaza)
+    datos TEXT NOT NULL            -- resto de la entrada, JSON
+);
+CREATE TABLE IF NOT EXISTS alias (
+    fuente TEXT PRIMARY KEY,       -- sha256 del PDF subido
+    blob TEXT NOT NULL             -- sha256 del blob publicado (distinto si se optimizó)
+);
+CREATE TABLE IF NOT EXISTS meta (
+    clave TEXT PRIMARY KEY,        -- fechas_firma: mtime_ns:tamaño del JSON de fechas sincronizado
+    valor                          -- fechas_n: cuántas fechas tenía
+);
+"""
+
+class EstadoCorrupto(RuntimeError):
+    pass
+
+@contextmanager
+def transaccion(con: sqlite3.Connection):
+    """BEGIN IMMEDIATE … COMMIT (ROLLBACK si algo falla): toma el candado de escritura de entrada."""
+    con.execute("BEGIN IMMEDIATE")
+    try:
+        yield con
+    except BaseException:
+        con.execute("ROLLBACK")
+        raise
+    con.execute("COMMIT")
+
+def abrir(path: Path = DB_FILE, importar: Path = JSON_FILE, fechas: Path = FECHAS_FILE) -> sqlite3.Connection:
+    con = sqlite3.connect(str(path), timeout=ESPERA_S, isolation_level=None)
+    con.execute("PRAGMA journal_mode = WAL")
+    con.execute("PRAGMA synchronous = NORMAL")
+    con.executescript(ESQUEMA)
+    if con.execute("PRAGMA user_version").fetchone()[0] != ESQUEMA_VERSION:
+        with transaccion(con):
+            # otro proceso pudo importar mientras esperábamos el candado
+            if con.execute("PRAGMA user_version").fetchone()[0] != ESQUEMA_VERSION:
+                _importar(con, importar)
+                con.execute(f"PRAGMA user_version = {ESQUEMA_VERSION}")
+    traer_fechas(con, fechas)
+    return con
+
+def abrir_lectura(path: Path = DB_FILE) -> sqlite3.Connection | None:
+    """Conexión de solo lectura (workers); None si aún no hay manifiesto."""
+    if not Path(path).exists():
+        return None
+    return sqlite3.connect(f"{Path(path).resolve().as_uri()}?mode=ro", uri=True, timeout=ESPERA_S)
+
+# ---------- Importación ----------
+def _leer_json(path: Path):
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError) as e:
+        raise EstadoCorrupto(f"No se pudo leer {path} ({e}). Restáuralo (p. ej. desde git) o muévelo "
+                             "si de verdad quieres empezar sin él.")
+
+def _importar(con, json_file: Path):
+    if not json_file.exists():
+        return
+    data = _leer_json(json_file)
+    if data.get("version") != 1:
+        raise EstadoCorrupto(f"{json_file}: versión desconocida {data.get('version')!r}")
+    _upsert(con, data.get("entries", {}))
+    if data.get("entries"):
+        print(f"✓ Manifiesto importado a {DB_FILE}: {len(data['entries'])} entradas.")
+
+# ---------- Fechas versionadas ----------
+def _meta(con, clave: str):
+    fila = con.execute("SELECT valor FROM meta WHERE clave = ?", (clave,)).fetchone()
+    return fila[0] if fila else None
+
+def _sincronizado(con, firma: str | None, n: int):
+    con.executemany("INSERT OR REPLACE INTO meta (clave, valor) VALUES (?, ?)",
+                    [("fechas_firma", firma), ("fechas_n", n)])
+
+def _firma(path: Path) -> str | None:
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    return f"{st.st_mtime_ns}:{st.st_size}"
+
+def _traer(con, fechas_file: Path, firma: str) -> int:
+    """(dentro de una transacción) fechas del JSON que faltan en la base; deja anotada su firma."""
+    fechas = [(f, d) for f, d in _leer_json(fechas_file).items() if d]
+    antes = con.total_changes
+    con.executemany("""
+        INSERT INTO entradas (fname, fecha, datos) VALUES (?, ?, '{}')
+        ON CONFLICT(fname) DO UPDATE SET fecha = excluded.fecha WHERE entradas.fecha IS NULL
+    """, fechas)
+    n = con.total_changes - antes
+    _sincronizado(con, firma, len(fechas))
+    return n
+
+def traer_fechas(con: sqlite3.Connection, fechas_file: Path = FECHAS_FILE) -> int:
+    """Si el JSON cambió desde la última sincronización, agrega las fechas que falten. Devuelve cuántas."""
+    firma = _firma(fechas_file)
+    if firma is None or firma == _meta(con, "fechas_firma"):
+        return 0
+    with transaccion(con):
+        # otro proceso pudo traerlas mientras esperábamos el candado
+        n = 0 if firma == _meta(con, "fechas_firma") else _traer(con, fechas_file, firma)
+    if n:
+        print(f"✓ {n} fecha(s) de {fechas_file} agregadas al manifiesto.")
+    return n
+
+def exportar_fechas(con: sqlite3.Connection, fechas_file: Path = FECHAS_FILE) -> bool:
+    """
+    Reescribe {nombre: fecha} (ordenado, determinista) si la base tiene fechas
+    que el JSON no. Con el candado tomado: dos exportaciones no se cruzan, y si
+    el JSON cambió por fuera (git pull) primero se traen sus fechas. True si escribió.
+    """
+    with transaccion(con):
+        firma = _firma(fechas_file)
+        if firma is not None and firma != _meta(con, "fechas_firma"):
+            _traer(con, fechas_file, firma)
+        n = con.execute("SELECT count(fecha) FROM entradas").fetchone()[0]
+        if firma is not None and n == _meta(con, "fechas_n"):
+            return False
+        fechas = dict(con.execute("SELECT fname, fecha FROM entradas WHERE fecha IS NOT NULL ORDER BY fname"))
+        escrito = escribir_si_cambia(fechas_file, json.dumps(fechas, ensure_ascii=False, indent=2, sort_keys=True) + "\n")
+        _sincronizado(con, _firma(fechas_file), n)
+    return escrito
+# ---------- Lectura ----------
+def _entrada(fecha, datos: str) -> dict:
+    e = json.loads(datos)
+    if fecha:
+        e["first_render_date"] = fecha
+    return e
+
+def cargar(con: sqlite3.Connection) -> dict:
+    """{nombre_pdf: entrada} completo (lectura consistente, no bloquea a los escritores)."""
+    return {f: _entrada(d, j) for f, d, j in con.execute("SELECT fname, fecha, datos FROM entradas")}
+
+def alias(con: sqlite3.Connection, sha: str) -> str | None:
+    """sha del blob que publica el contenido subido `sha`, si se publicó con otro."""
+    fila = con.execute("SELECT blob FROM alias WHERE fuente = ?", (sha,)).fetchone()
+    return fila[0] if fila else None
+
+def obtener(con: sqlite3.Connection, fname: str) -> dict | None:
+    fila = con.execute("SELECT fecha, datos FROM entradas WHERE fname = ?", (fname,)).fetchone()
+    return _entrada(*fila) if fila else None
+
+# ---------- Escritura ----------
+def _upsert(con, cambios: dict):
+    con.executemany("""
+        INSERT INTO entradas (fname, fecha, datos) VALUES (?, ?, ?)
+        ON CONFLICT(fname) DO UPDATE SET datos = excluded.datos, fecha = COALESCE(entradas.fecha, excluded.fecha)
+    """, [(f, e.get("first_render_date"),
+           json.dumps({k: v for k, v in e.items() if k != "first_render_date"}, ensure_ascii=False, sort_keys=True))
+          for f, e in cambios.items()])
+    con.executemany("INSERT OR REPLACE INTO alias (fuente, blob) VALUES (?, ?)",
+                    [(e["sha256"], e["blob_sha256"]) for e in cambios.values()
+                     if e.get("blob_sha256") and e.get("sha256") and e["blob_sha256"] != e["sha256"]])
+
+def guardar_alias(con: sqlite3.Connection, fuente: str, blob: str):
+    """Registra sha subido → sha del blob apenas se publica (antes de cerrar el lote)."""
+    with transaccion(con):
+        con.execute("INSERT OR REPLACE INTO alias (fuente, blob) VALUES (?, ?)", (fuente, blob))
+
+def guardar(con: sqlite3.Connection, cambios: dict):
+    """Upsert de `cambios` {nombre_pdf: entrada} en una transacción; lo demás no se toca."""
+    if cambios:
+        with transaccion(con):
+            _upsert(con, cambios)
+
+def fusionar(con: sqlite3.Connection, cambios: dict):
+    """Como guardar(), pero mezcla los campos con la entrada existente (leer y escribir en la misma transacción)."""
+    if cambios:
+        with transaccion(con):
+            _upsert(con, {f: {**(obtener(con, f) or {}), **c} for f, c in cambios.items()})
@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+"""
+Migración de carpetas de curso a slugs: primero un plan, después aplicarlo
+con diario (.apuntes_migracion.jsonl) para poder reanudar o deshacer.
+
+El plan se calcula completo antes de tocar nada:
+  - renombrar   origen → destino con un solo os.rename (O(1)) si el destino no existe
+  - fusionar    solo si el destino ya existe (colisión real): se mueven los
+                archivos que no están en el destino; los que chocan quedan en el
+                origen y se informan
+  - title       title.txt con el nombre humano
+Dos cursos cuyo nombre da el mismo slug también son colisión: el primero se
+renombra y el resto se fusiona.
+
+Cada paso se anota en el diario *antes* de hacerlo; deshacer revisa el disco
+(si el destino está y el origen no, lo devuelve), así sirve aunque el proceso
+se haya cortado justo entre anotar y hacer.
+"""
+
+from pathlib import Path
+from datetime import datetime
+import json, os
+
+from . import catalogo
+from .escritura import escribir_si_cambia
+from .texto import slugify
+
+DIARIO_FILE = Path(".apuntes_migracion.jsonl")
+
+# ---------- Plan ----------
+def planificar(base: Path = catalogo.BASE, asegurar_title: bool = False, cat: dict | None = None) -> dict:
+    """
+    {"pasos": [...], "colisiones": [(destino, [origenes])]}. Con asegurar_title
+    también agrega title.txt a las carpetas que ya están en slug y no lo tienen.
+    `cat` evita recargar el catálogo si ya está en memoria (Arbol).
+    """
+    pasos, por_destino = [], {}
+    for c in sorted(catalogo.cursos(cat or catalogo.cargar(base)), key=lambda c: c["dir"]):
+        origen = Path(c["dir"])
+        if not origen.is_dir():
+            continue
+        humano, slug = origen.name, slugify(origen.name)
+        if humano == slug:
+            if asegurar_title and not (origen / "title.txt").exists():
+                pasos.append({"tipo": "title", "dir": origen.as_posix(), "texto": humano, "solo_si_falta": True})
+            continue
+        por_destino.setdefault((origen.parent / slug).as_posix(), []).append((origen, humano))
+
+    colisiones = []
+    for destino, origenes in sorted(por_destino.items()):
+        d = Path(destino)
+        # en un FS que no distingue mayúsculas "Electivos" y "electivos" son la misma carpeta
+        mismo = d.exists() and os.path.samefile(origenes[0][0], d)
+        libre = not d.exists() or mismo
+        if len(origenes) > 1 or not libre:
+            colisiones.append((destino, [o.as_posix() for o, _ in origenes]))
+        for k, (origen, humano) in enumerate(origenes):
+            if k == 0 and libre:
+                pasos.append({"tipo": "renombrar", "origen": origen.as_posix(), "destino": destino, "via_tmp": mismo})
+                pasos.append({"tipo": "title", "dir": destino, "texto": humano, "solo_si_falta": False})
+            else:
+                pasos.append({"tipo": "fusionar", "origen": origen.as_posix(), "destino": destino})
+                pasos.append({"tipo": "title", "dir": destino, "texto": humano, "solo_si_falta": True})
+    return {"pasos": pasos, "colisiones": colisiones}
+
+def describir(paso: dict) -> str:
+    if paso["tipo"] == "renombrar":
+        return f"renombrar {paso['origen']} → {paso['destino']}"
+    if paso["tipo"] == "fusionar":
+        return f"fusionar  {paso['origen']} → {paso['destino']} (el destino ya existe)"
+    return f"title.txt {paso['dir']} = \"{paso['texto']}\""
+
+# ---------- Diario ----------
+def _anotar(diario: Path, registro: dict):
+    with open(diario, "a", encoding="utf-8") as f:
+        f.write(json.dumps(registro, ensure_ascii=False) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+def leer_diario(diario: Path = DIARIO_FILE) -> tuple:
+    """(plan, registros) de una migración que no terminó; (None, []) si no hay."""
+    if not diario.exists():
+        return None, []
+    lineas = []
+    for l in diario.read_text(encoding="utf-8").splitlines():
+        try:
+            lineas.append(json.loads(l))
+        except ValueError:
+            break  # última línea a medio escribir cuando se cortó
+    return (lineas[0]["plan"] if lineas else None), lineas[1:]
+
+# ---------- Aplicar ----------
+def _title(diario, i, paso):
+    tt = Path(paso["dir"]) / "title.txt"
+    if paso["solo_si_falta"] and tt.exists():
+        return
+    previo = tt.read_text(encoding="utf-8") if tt.exists() else None
+    _anotar(diario, {"paso": i, "title": tt.as_posix(), "previo": previo})
+    escribir_si_cambia(tt, paso["texto"])
+
+def _renombrar(diario, i, paso):
+    origen, destino = Path(paso["origen"]), Path(paso["destino"])
+    tmp = origen.with_name(f".{origen.name}.migrando")
+    if tmp.exists():
+        os.rename(tmp, destino); return  # se cortó entre los dos renames
+    if not origen.exists() and destino.exists():
+        return  # ya hecho (reanudación)
+    _anotar(diario, {"paso": i, "renombrar": [paso["origen"], paso["destino"]]})
+    if paso.get("via_tmp"):
+        os.rename(origen, tmp); os.rename(tmp, destino)
+    else:
+        os.rename(origen, destino)
+
+def _fusionar(diario, i, paso) -> list:
+    origen, destino = Path(paso["origen"]), Path(paso["destino"])
+    if not origen.exists():
+        return []
+    choques = []
+    for p in sorted(origen.iterdir()):
+        dst = destino / p.name
+        if dst.exists():
+            choques.append(p.as_posix()); continue
+        _anotar(diario, {"paso": i, "mover": [p.as_posix(), dst.as_posix()]})
+        os.rename(p, dst)
+    if not choques:
+        _anotar(diario, {"paso": i, "rmdir": paso["origen"]})
+        origen.rmdir()
+    return choques
+
+def aplicar(plan: dict, diario: Path = DIARIO_FILE, reanudar: bool = False) -> list:
+    """Ejecuta el plan. Devuelve los archivos que no se movieron por chocar con el destino."""
+    if not reanudar:
+        _anotar(diario, {"plan": plan, "creado": datetime.now().isoformat(timespec="seconds")})
+    choques = []
+    for i, paso in enumerate(plan["pasos"]):
+        if paso["tipo"] == "renombrar":
+            _renombrar(diario, i, paso)
+        elif paso["tipo"] == "fusionar":
+            choques += _fusionar(diario, i, paso)
+        else:
+            _title(diario, i, paso)
+    diario.unlink()
+    return choques
+
+def reanudar(diario: Path = DIARIO_FILE) -> list:
+    plan, _ = leer_diario(diario)
+    return aplicar(plan, diario, reanudar=True) if plan else []
+
+def deshacer(diario: Path = DIARIO_FILE) -> int:
+    """Revierte lo anotado, del último paso al primero. Devuelve cuántas acciones revirtió."""
+    _, registros = leer_diario(diario)
+    n = 0
+    for r in reversed(registros):
+        if "renombrar" in r:
+            origen, destino = map(Path, r["renombrar"])
+            tmp = origen.with_name(f".{origen.name}.migrando")
+            if tmp.exists():
+                os.rename(tmp, origen); n += 1
+            elif destino.exists() and origen.exists() and os.path.samefile(origen, destino):
+                os.rename(destino, tmp); os.rename(tmp, origen); n += 1  # solo cambió mayúsculas
+            elif destino.exists() and not origen.exists():
+                os.rename(destino, origen); n += 1
+        elif "mover" in r:
+            src, dst = map(Path, r["mover"])
+            if dst.exists() and not src.exists():
+                src.parent.mkdir(parents=True, exist_ok=True)
+                os.rename(dst, src); n += 1
+        elif "rmdir" in r:
+            Path(r["rmdir"]).mkdir(parents=True, exist_ok=True)
+        elif "title" in r:
+            tt = Path(r["title"])
+            if r["previo"] is None:
+                if tt.exists():
+                    tt.unlink(); n += 1
+            elif tt.parent.exists():
+                escribir_si_cambia(tt, r["previo"]); n += 1
+    if diario.exists():
+        diario.unlink()
+    return n
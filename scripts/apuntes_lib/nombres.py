@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+"""
+Parser de nombres de PDF con gramática explícita (sin heurísticas sueltas).
+
+    nombre  := curso "_" [extra "_"]* año "_" resto            (extra: va al tema)
+    resto   := tema ("_" tema)* "_" autores_A                  patrón A
+             | [tema ("_" tema)*] ("_" par ["_" conector])+    patrón B
+    par     := APELLIDO "_" NOMBRE
+    año     := \\d{4}
+
+Cada campo (lo que queda entre "_", sin espacios sobrantes) se clasifica una vez
+con expresiones compiladas: CONECTOR (y, &, and, e), NOMBRE (palabra con
+mayúscula, con partículas "de", "del", "la"… y guiones), AÑO o TEXTO. Como los
+campos se repiten mucho (autores, años, cursos) la clasificación está en caché
+y un lote de miles de nombres se valida sin tocar el disco.
+
+La cola de campos después del año se recorre de derecha a izquierda con una
+máquina de estados:
+
+    AUTORES ──NOMBRE──▶ APELLIDO ──NOMBRE──▶ PAR ──CONECTOR──▶ AUTORES
+                                             PAR ──NOMBRE────▶ APELLIDO
+    cualquier otro campo ⇒ TEMA (lo que falta es el tema)
+
+Si no se arma ningún par, el último campo es la lista de autores del patrón A
+("Aravena Katherine y Monreal Sebastián"). analizar() además marca como
+"ambiguo" lo que se puede leer de dos formas (tema vacío, tema hecho solo de
+nombres, campos extra antes del año…), para revisarlo antes de publicar.
+"""
+
+from functools import lru_cache
+import re
+
+from .texto import strip_accents
+
+# ---------- Utilidades ----------
+@lru_cache(maxsize=16384)
+def smart_title(s):
+    return re.sub(r"\s+", " ", s.replace("_", " ").strip()).title()
+
+def limpiar(campo: str) -> str:
+    """Espacios sobrantes fuera y adentro ("Ficha Locke " → "Ficha Locke")."""
+    return " ".join(campo.split())
+
+# ---------- Léxico ----------
+_NOMBRE = r"[A-Z][a-z'´’]+(?:-[A-Z][a-z'´’]+)*"
+_PARTICULA = r"(?i:de|del|la|las|los|da|das|do|dos|van|von|der|di|le)"
+RE_NOMBRE = re.compile(rf"(?:{_PARTICULA} )*{_NOMBRE}(?: (?:{_PARTICULA} )+{_NOMBRE})*")
+RE_CONECTOR = re.compile(r"(?i:y|e|and|&)")
+RE_ANIO = re.compile(r"\d{4}")
+RE_SEP_AUTORES = re.compile(r"\s*(?:&|,|;|\s(?:y|e|and)\s)\s*", re.I)
+
+CONECTOR, NOMBRE, ANIO, TEXTO = "conector", "nombre", "anio", "texto"
+
+@lru_cache(maxsize=65536)
+def clasificar(campo: str) -> str:
+    if RE_ANIO.fullmatch(campo):
+        return ANIO
+    if RE_CONECTOR.fullmatch(campo):
+        return CONECTOR
+    if RE_NOMBRE.fullmatch(strip_accents(campo)):
+        return NOMBRE
+    return TEXTO
+
+# ---------- Autores / APA ----------
+def split_authors(raw):
+    return [p for p in (limpiar(x) for x in RE_SEP_AUTORES.split(raw.replace("_", " "))) if p]
+
+@lru_cache(maxsize=16384)
+def name_to_apa(author):
+    parts = limpiar(author.replace("_", " ")).split(" ")
+    if len(parts) == 1:
+        return parts[0]
+    if clasificar(parts[0]) == NOMBRE:
+        last, names = parts[0], parts[1:]
+    else:
+        last, names = parts[-1], parts[:-1]
+    return apa_par(last, " ".join(names))
+
+def apa_par(apellido: str, nombre: str) -> str:
+    """Patrón B: el campo apellido va entero ("De la Fuente"), del nombre solo iniciales."""
+    initials = [(n.strip("-")[0].upper() + ".") for n in nombre.split(" ") if n.strip("-")]
+    return f"{apellido}, {' '.join(initials)}".strip()
+
+# ---------- Máquina de estados ----------
+class NombreInvalido(ValueError):
+    pass
+
+def _pares(cola: list) -> tuple:
+    """(índice donde termina el tema, [(apellido, nombre)]) recorriendo la cola desde el final."""
+    estado, pares, corte, nombre = "autores", [], len(cola), None
+    for i in range(len(cola) - 1, -1, -1):
+        clase = clasificar(cola[i])
+        if estado in ("autores", "par") and clase == NOMBRE:
+            estado, nombre = "apellido", cola[i]
+        elif estado == "apellido" and clase == NOMBRE:
+            pares.append((cola[i], nombre)); estado, corte = "par", i
+        elif estado == "par" and clase == CONECTOR:
+            estado = "autores"
+        else:
+            break
+    pares.reverse()
+    return corte, pares
+
+def parse(nombre: str) -> dict:
+    """
+    Curso_AAAA_Tema_Autor(es).pdf (A) o Curso_AAAA_Tema_Apellido_Nombre[_Apellido_Nombre…].pdf (B).
+    Devuelve la meta que usa el generador; NombreInvalido si no calza con la gramática.
+    """
+    return analizar(nombre, estricto=True)["meta"]
+
+def analizar(nombre: str, estricto: bool = False) -> dict:
+    """
+    {"nombre", "estado": ok|ambiguo|rechazado, "patron": A|B|None, "meta", "avisos", "error"}.
+    Con estricto=True un rechazo levanta NombreInvalido.
+    """
+    stem = nombre[:-4] if nombre[-4:].lower() == ".pdf" else nombre
+    campos = [c for c in (limpiar(x) for x in stem.split("_")) if c]
+    res = {"nombre": nombre, "estado": "ok", "patron": None, "meta": None, "avisos": [], "error": None}
+
+    def rechazar(msg):
+        if estricto:
+            raise NombreInvalido(f"{msg}: {nombre}")
+        res.update(estado="rechazado", error=msg)
+        return res
+
+    if len(campos) < 3:
+        return rechazar("Nombre no cumple patrón mínimo (Curso_AAAA_Tema_Autor)")
+    curso = campos[0]
+    if clasificar(curso) == ANIO:
+        return rechazar("Falta el curso antes del año")
+    i_anio = next((i for i in range(1, len(campos)) if clasificar(campos[i]) == ANIO), None)
+    if i_anio is None:
+        return rechazar("No se encontró año AAAA")
+    anio, extra, cola = campos[i_anio], campos[1:i_anio], campos[i_anio + 1:]
+    avisos = res["avisos"]
+    if extra:
+        avisos.append(f"campos entre curso y año (van al tema): {' | '.join(extra)}")
+
+    corte, pares = _pares(cola)
+    if pares:
+        res["patron"] = "B"
+        tema_campos = cola[:corte]
+        autores_display = [f"{ap} {no}" for ap, no in pares]
+        autores_apa = [apa_par(ap, no) for ap, no in pares]
+        if sum(clasificar(c) == NOMBRE for c in tema_campos) >= 2 and \
+                all(clasificar(c) in (NOMBRE, CONECTOR) for c in tema_campos):
+            avisos.append("el tema son solo nombres: ¿es otro autor?")
+    else:
+        res["patron"] = "A"
+        tema_campos = cola[:-1]
+        autores_raw = split_authors(cola[-1]) if cola else []
+        autores_display = autores_raw
+        autores_apa = [name_to_apa(a) for a in autores_raw]
+        if not cola:
+            avisos.append("sin tema ni autores después del año")
+        elif len(autores_raw) == 1 and " " not in autores_raw[0]:
+            avisos.append(f"autor de una sola palabra: \"{autores_raw[0]}\"")
+    tema = " ".join(extra + tema_campos)
+    if not tema:
+        avisos.append("sin tema: se usa el nombre del curso")
+    if anio[:2] not in ("19", "20"):
+        avisos.append(f"año poco probable: {anio}")
+
+    res["meta"] = {
+        "curso_raw": curso,
+        "curso_hum": smart_title(curso),
+        "anio": anio,
+        "tema_hum": smart_title(tema or curso),
+        "autores_raw": autores_display,
+        "autores_apa": autores_apa,
+        "stem": stem,
+    }
+    if avisos:
+        res["estado"] = "ambiguo"
+    return res
+
+# ---------- Lotes ----------
+def analizar_lote(nombres) -> dict:
+    """Reporte de un lote: {"total", "ok", "ambiguos": [...], "rechazados": [...]} (sin las metas OK)."""
+    rep = {"total": 0, "ok": 0, "ambiguos": [], "rechazados": []}
+    for n in nombres:
+        r = analizar(n)
+        rep["total"] += 1
+        if r["estado"] == "ok":
+            rep["ok"] += 1
+        elif r["estado"] == "ambiguo":
+            rep["ambiguos"].append({"nombre": n, "patron": r["patron"], "avisos": r["avisos"],
+                                    "tema": r["meta"]["tema_hum"], "autores": r["meta"]["autores_raw"]})
+        else:
+            rep["rechazados"].append({"nombre": n, "error": r["error"]})
+    return rep
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""
+Optimización opcional de PDFs antes de entrar al almacén.
+
+- Ghostscript (`gs`): baja las imágenes sobredimensionadas a ~150 dpi
+  (/ebook), junta imágenes repetidas y descarta objetos sin uso.
+- qpdf: linealiza ("fast web view": la primera página se ve antes de que
+  termine la descarga), comprime streams y saca recursos no referenciados.
+
+Solo herramientas locales (funciona offline); la que no esté se salta. El
+resultado se queda solo si pesa menos que el original. Se optimiza antes de
+entrar al almacén: el blob se nombra por el sha256 de los bytes optimizados y
+el manifiesto guarda el alias sha subido → blob, así un PDF ya optimizado no se
+vuelve a procesar aunque lo suban de nuevo. Lo que ya estaba en el almacén se
+optimiza aparte, a pedido (genera_qmd_desde_pdfs.py --optimizar-almacen).
+"""
+
+from pathlib import Path
+import os, shutil, subprocess
+
+GS_PRESET = "/ebook"
+
+def herramientas() -> list:
+    return [h for h in ("gs", "qpdf") if shutil.which(h)]
+
+def _gs(origen: Path, destino: Path) -> bool:
+    r = subprocess.run(["gs", "-q", "-dSAFER", "-dBATCH", "-dNOPAUSE", "-sDEVICE=pdfwrite",
+                        "-dCompatibilityLevel=1.5", f"-dPDFSETTINGS={GS_PRESET}",
+                        "-dDetectDuplicateImages=true", f"-sOutputFile={destino}", str(origen)],
+                       capture_output=True, timeout=600)
+    return r.returncode == 0 and destino.exists() and destino.stat().st_size > 0
+
+def _qpdf(origen: Path, destino: Path) -> bool:
+    r = subprocess.run(["qpdf", "--linearize", "--object-streams=generate", "--compress-streams=y",
+                        "--remove-unreferenced-resources=yes", str(origen), str(destino)],
+                       capture_output=True, timeout=600)
+    # 3 = terminó con advertencias (PDF levemente dañado pero escrito)
+    return r.returncode in (0, 3) and destino.exists() and destino.stat().st_size > 0
+
+def optimizar(pdf: Path) -> tuple:
+    """
+    Optimiza `pdf` en su lugar. Devuelve (bytes_antes, bytes_despues, pasos);
+    si nada ayudó el archivo queda intacto y despues == antes.
+    """
+    antes = pdf.stat().st_size
+    actual, pasos, temporales = pdf, [], []
+    for nombre, fn in (("gs", _gs), ("qpdf", _qpdf)):
+        if not shutil.which(nombre):
+            continue
+        tmp = pdf.with_name(f".{pdf.stem}.{nombre}-{os.getpid()}.pdf")
+        temporales.append(tmp)
+        try:
+            if fn(actual, tmp):
+                actual = tmp; pasos.append(nombre)
+        except Exception:
+            pass
+    try:
+        despues = actual.stat().st_size
+        if actual != pdf and despues < antes:
+            os.replace(actual, pdf)
+        else:
+            despues, pasos = antes, []
+    finally:
+        for t in temporales:
+            if t.exists():
+                t.unlink()
+    return antes, despues, pasos
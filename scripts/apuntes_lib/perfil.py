@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""
+Instrumentación opcional por etapa y por archivo.
+
+    perf = perfil.crear(activo)          # activo también con APUNTES_PROFILE=1
+    with perf.etapa("migracion"): ...
+    perf.contar("bytes_movidos", n)
+
+Desactivado devuelve un perfil nulo: etapa() entrega siempre el mismo
+nullcontext y contar()/archivo() no hacen nada, así el costo es casi cero.
+Los tiempos por archivo que vienen de procesos hijos se fusionan con archivo().
+"""
+
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+import json, os, time
+
+ENV_VAR = "APUNTES_PROFILE"
+
+def activo_por_entorno() -> bool:
+    return os.environ.get(ENV_VAR, "").strip().lower() not in ("", "0", "no", "false")
+
+class Perfil:
+    activo = True
+
+    def __init__(self):
+        self.inicio = time.perf_counter()
+        self.etapas = {}      # nombre → [segundos, llamadas]
+        self.contadores = {}  # nombre → int
+        self.archivos = {}    # archivo → {etapa: segundos}
+
+    @contextmanager
+    def etapa(self, nombre: str):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.sumar(nombre, time.perf_counter() - t0)
+
+    def sumar(self, nombre: str, segundos: float, llamadas: int = 1):
+        e = self.etapas.setdefault(nombre, [0.0, 0])
+        e[0] += segundos; e[1] += llamadas
+
+    def contar(self, nombre: str, n: int = 1):
+        self.contadores[nombre] = self.contadores.get(nombre, 0) + n
+
+    def archivo(self, nombre: str, tiempos: dict):
+        """Registra los tiempos de un archivo y los suma a sus etapas."""
+        if not tiempos:
+            return
+        self.archivos[nombre] = {k: round(v, 6) for k, v in tiempos.items()}
+        for etapa, s in tiempos.items():
+            self.sumar(etapa, s)
+
+    def tiempos(self) -> dict:
+        """Segundos por etapa (para devolver desde un proceso hijo)."""
+        return {k: v[0] for k, v in self.etapas.items()}
+
+    def reporte(self) -> dict:
+        return {
+            "total_s": round(time.perf_counter() - self.inicio, 6),
+            "etapas": {k: {"s": round(s, 6), "llamadas": n} for k, (s, n) in self.etapas.items()},
+            "contadores": dict(self.contadores),
+            "archivos": self.archivos,
+        }
+
+    def tabla(self) -> str:
+        rep = self.reporte()
+        filas = [f"{'etapa':<22} {'llamadas':>9} {'total s':>10} {'prom ms':>9}"]
+        for k, e in sorted(rep["etapas"].items(), key=lambda kv: -kv[1]["s"]):
+            prom = 1000 * e["s"] / e["llamadas"] if e["llamadas"] else 0.0
+            filas.append(f"{k:<22} {e['llamadas']:>9} {e['s']:>10.4f} {prom:>9.3f}")
+        for k, v in sorted(rep["contadores"].items()):
+            filas.append(f"{k:<22} {v:>9}")
+        filas.append(f"{'TOTAL':<22} {'':>9} {rep['total_s']:>10.4f}")
+        return "\n".join(filas)
+
+    def guardar(self, path: Path):
+        Path(path).write_text(json.dumps(self.reporte(), ensure_ascii=False, indent=2), encoding="utf-8")
+
+class PerfilNulo:
+    activo = False
+    _ctx = nullcontext()
+
+    def etapa(self, nombre: str):
+        return self._ctx
+
+    def sumar(self, *a, **k): pass
+    def contar(self, *a, **k): pass
+    def archivo(self, *a, **k): pass
+
+    def tiempos(self) -> dict:
+        return {}
+
+NULO = PerfilNulo()
+
+def crear(activo: bool = False):
+    return Perfil() if (activo or activo_por_entorno()) else NULO
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""
+Plantillas compiladas una sola vez.
+
+Usan la sintaxis de str.format ({campo}, {{ y }} literales) más conversiones de
+escape que se aplican en una sola pasada (str.translate):
+
+    {x!y}  texto dentro de un string YAML entre comillas dobles
+    {x!l}  lista → "a", "b" (cada elemento escapado para YAML)
+    {x!h}  texto HTML
+    {x!u}  segmento de URL (percent-encoding)
+
+La plantilla se parte en segmentos al compilar; render() solo concatena con un
+único "".join. Un campo que falta queda tal cual ({campo}), como hacía Safe.
+"""
+
+from functools import lru_cache
+from string import Formatter
+from urllib.parse import quote
+
+_YAML = str.maketrans({"\\": "\\\\", '"': '\\"', "\n": "\\n", "\t": "\\t"})
+_HTML = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;", "'": "&#x27;"})
+
+def yaml_str(v) -> str:
+    return str(v).translate(_YAML)
+
+def yaml_lista(v) -> str:
+    return ", ".join('"' + yaml_str(x) + '"' for x in v)
+
+def html(v) -> str:
+    return str(v).translate(_HTML)
+
+def url(v) -> str:
+    return quote(str(v))
+
+CONVERSIONES = {None: str, "s": str, "r": repr, "y": yaml_str, "l": yaml_lista, "h": html, "u": url}
+
+class Plantilla:
+    __slots__ = ("texto", "campos", "_ops")
+
+    def __init__(self, texto: str):
+        self.texto = texto
+        ops, campos = [], []
+        for lit, campo, spec, conv in Formatter().parse(texto):
+            if lit:
+                if ops and ops[-1].__class__ is str:
+                    ops[-1] += lit
+                else:
+                    ops.append(lit)
+            if campo is None:
+                continue
+            if not campo or "." in campo or "[" in campo:
+                raise ValueError(f"Campo no soportado en plantilla: {{{campo}}}")
+            if conv not in CONVERSIONES:
+                raise ValueError(f"Conversión desconocida !{conv} en {{{campo}}}")
+            crudo = "{" + campo + (f"!{conv}" if conv else "") + (f":{spec}" if spec else "") + "}"
+            ops.append((campo, CONVERSIONES[conv], spec, crudo))
+            campos.append(campo)
+        self._ops = tuple(ops)
+        self.campos = tuple(dict.fromkeys(campos))
+
+    def render(self, valores: dict) -> str:
+        partes = []
+        ap = partes.append
+        for op in self._ops:
+            if op.__class__ is str:
+                ap(op); continue
+            campo, fn, spec, crudo = op
+            if campo in valores:
+                v = fn(valores[campo])
+                ap(format(v, spec) if spec else v)
+            else:
+                ap(crudo)
+        return "".join(partes)
+
+@lru_cache(maxsize=None)
+def compilar(texto: str) -> Plantilla:
+    return Plantilla(texto)
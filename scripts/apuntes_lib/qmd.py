@@ -0,0 +1,217 @@
+# -*- coding: utf-8 -*-
+"""
+Editor de .qmd en una sola pasada (sin regex sobre el archivo completo).
+
+Tokenizar recorre las líneas una vez y anota:
+  - el front matter YAML y el rango de líneas de cada clave de primer nivel,
+  - los encabezados (#, ##, …) fuera de bloques de código,
+  - los bloques ::: {#id} con su cierre (respetando anidamiento).
+Las operaciones son declarativas (dicts, se pueden mandar a otros procesos):
+
+    ops = [poner_clave("description", '"Nuevo texto"', despues_de="title"),
+           borrar_seccion(r"sobre\\s+este\\s+curso", hasta_div="apuntes-curso")]
+    nuevo = aplicar(texto, ops)      # devuelve el mismo objeto si nada cambió
+
+Cada operación es lineal en el tamaño del archivo.
+"""
+
+from pathlib import Path
+import json, re
+
+from .escritura import escribir_atomico
+
+RE_CLAVE = re.compile(r"([A-Za-z_][\w-]*)\s*:(?:\s|$)")
+RE_ENCABEZADO = re.compile(r"[ \t]{0,3}(#{1,6})[ \t]+(.*?)[ \t#]*$")
+RE_DIV_ABRE = re.compile(r"[ \t]*(:{3,})[ \t]*(\{[^}]*\}|[^\s{]+)")
+RE_DIV_CIERRA = re.compile(r"[ \t]*(:{3,})[ \t]*$")
+RE_DIV_ID = re.compile(r"#([\w-]+)")
+RE_CERCO = re.compile(r"[ \t]{0,3}(`{3,}|~{3,})")
+
+# ---------- Tokenizador ----------
+class Documento:
+    """Líneas (con su salto) + índices calculados en una pasada."""
+
+    def __init__(self, texto: str):
+        self.lineas = texto.splitlines(keepends=True)
+        self.indexar()
+
+    def texto(self) -> str:
+        return "".join(self.lineas)
+
+    def indexar(self):
+        ls = self.lineas
+        self.fm = None          # (inicio, fin) de las líneas YAML, sin los ---
+        self.claves = {}        # clave -> [inicio, fin) dentro de self.lineas
+        self.encabezados = []   # (línea, nivel, texto)
+        self.divs = {}          # id -> [inicio, fin) incluyendo las líneas ::: de apertura y cierre
+        i = 0
+        if ls and ls[0].rstrip("\r\n") == "---":
+            for j in range(1, len(ls)):
+                if ls[j].rstrip("\r\n") in ("---", "..."):
+                    self.fm = (1, j); i = j + 1
+                    break
+        if self.fm:
+            self._indexar_claves(*self.fm)
+
+        cerco = None   # marcador del bloque de código abierto
+        pila = []      # divs abiertos: (id | None, línea, largo de los ':')
+        for n in range(i, len(ls)):
+            linea = ls[n].rstrip("\r\n")
+            m = RE_CERCO.match(linea)
+            if cerco:
+                if m and m.group(1)[0] == cerco[0] and len(m.group(1)) >= len(cerco) and not linea.strip().strip(cerco[0]):
+                    cerco = None
+                continue
+            if m:
+                cerco = m.group(1); continue
+            if linea.lstrip().startswith(":::"):
+                if RE_DIV_CIERRA.match(linea) and pila:
+                    div_id, ini, _ = pila.pop()
+                    if div_id and div_id not in self.divs:
+                        self.divs[div_id] = (ini, n + 1)
+                    continue
+                m = RE_DIV_ABRE.match(linea)
+                if m:
+                    mid = RE_DIV_ID.search(m.group(2)) if m.group(2).startswith("{") else None
+                    pila.append((mid.group(1) if mid else None, n, len(m.group(1))))
+                continue
+            m = RE_ENCABEZADO.match(linea)
+            if m:
+                self.encabezados.append((n, len(m.group(1)), m.group(2)))
+
+    def _indexar_claves(self, ini: int, fin: int):
+        actual = None
+        for n in range(ini, fin):
+            linea = self.lineas[n]
+            if linea[:1] in (" ", "\t", "-") or not linea.strip():
+                # continuación (indentada o ítem de lista) de la clave actual
+                if actual and linea.strip():
+                    self.claves[actual][1] = n + 1
+                continue
+            m = RE_CLAVE.match(linea)
+            actual = m.group(1) if m else None
+            if actual and actual not in self.claves:
+                self.claves[actual] = [n, n + 1]
+            elif actual:
+                actual = None  # clave repetida: se respeta la primera
+
+    def reemplazar(self, ini: int, fin: int, nuevas: list) -> bool:
+        if self.lineas[ini:fin] == nuevas:
+            return False
+        self.lineas[ini:fin] = nuevas
+        self.indexar()
+        return True
+
+# ---------- Lectura ----------
+def valor_yaml(crudo: str):
+    """Escalar o lista en línea de YAML ("x", x, [a, "b"]). Lo demás queda como texto."""
+    v = crudo.strip()
+    if v.startswith("[") and v.endswith("]"):
+        try:
+            return [str(x) for x in json.loads(v)]
+        except ValueError:
+            return [x.strip().strip("\"'") for x in v[1:-1].split(",") if x.strip()]
+    if v.startswith('"') and v.endswith('"') and len(v) > 1:
+        try:
+            return json.loads(v)
+        except ValueError:
+            return v[1:-1]
+    if v.startswith("'") and v.endswith("'") and len(v) > 1:
+        return v[1:-1].replace("''", "'")
+    return v
+
+def leer_front_matter(texto: str) -> dict:
+    """Claves de primer nivel con valor en la misma línea (las de bloque se omiten)."""
+    doc = Documento(texto)
+    out = {}
+    for clave, (ini, _) in doc.claves.items():
+        resto = doc.lineas[ini].split(":", 1)[1].strip()
+        if resto:
+            out[clave] = valor_yaml(resto)
+    return out
+
+# ---------- Operaciones ----------
+def poner_clave(clave: str, valor: str, despues_de: str | None = None, solo_si_falta: bool = False) -> dict:
+    """clave: valor en el front matter. `valor` puede ser un bloque que empiece con salto de línea."""
+    return {"op": "poner_clave", "clave": clave, "valor": valor, "despues_de": despues_de,
+            "solo_si_falta": solo_si_falta}
+
+def insertar_clave(clave: str, valor: str, despues_de: str | None = None) -> dict:
+    return poner_clave(clave, valor, despues_de, solo_si_falta=True)
+
+def borrar_seccion(titulo: str, hasta_div: str | None = None, nivel: int | None = None) -> dict:
+    """
+    Borra desde el encabezado cuyo texto calza con `titulo` (regex, sin mayúsculas)
+    hasta el próximo encabezado, el bloque ::: {#hasta_div} o el final.
+    Con `nivel` (2 = ##) solo cuenta un encabezado de ese nivel.
+    """
+    return {"op": "borrar_seccion", "titulo": titulo, "hasta_div": hasta_div, "nivel": nivel}
+
+def reemplazar_div(div_id: str, contenido: str) -> dict:
+    """Cambia el bloque ::: {#div_id} … ::: completo por `contenido`."""
+    return {"op": "reemplazar_div", "id": div_id, "contenido": contenido}
+
+def _lineas(texto: str, eol: str) -> list:
+    texto = texto if texto.endswith("\n") else texto + "\n"
+    return [l.rstrip("\r\n") + eol for l in texto.splitlines(keepends=True)]
+
+def _eol(doc: Documento) -> str:
+    return "\r\n" if doc.lineas and doc.lineas[0].endswith("\r\n") else "\n"
+
+def _poner_clave(doc: Documento, op: dict) -> bool:
+    eol = _eol(doc)
+    valor = op["valor"].rstrip("\n")
+    nuevas = _lineas(f"{op['clave']}:" + (valor if valor.startswith("\n") else f" {valor}"), eol)
+    if op["clave"] in doc.claves:
+        if op["solo_si_falta"]:
+            return False
+        return doc.reemplazar(*doc.claves[op["clave"]], nuevas)
+    if doc.fm is None:
+        # sin front matter: se crea
+        return doc.reemplazar(0, 0, [f"---{eol}", *nuevas, f"---{eol}"])
+    despues = doc.claves.get(op["despues_de"]) if op["despues_de"] else None
+    pos = despues[1] if despues else doc.fm[0]
+    return doc.reemplazar(pos, pos, nuevas)
+
+def _borrar_seccion(doc: Documento, op: dict) -> bool:
+    patron = re.compile(op["titulo"], re.I)
+    encs = doc.encabezados
+    for k, (n, nivel, texto) in enumerate(encs):
+        if op.get("nivel") not in (None, nivel) or not patron.search(texto):
+            continue
+        fin = encs[k + 1][0] if k + 1 < len(encs) else len(doc.lineas)
+        div = doc.divs.get(op["hasta_div"]) if op["hasta_div"] else None
+        if div and n < div[0] < fin:
+            fin = div[0]
+        return doc.reemplazar(n, fin, [])
+    return False
+
+def _reemplazar_div(doc: Documento, op: dict) -> bool:
+    if op["id"] not in doc.divs:
+        return False
+    return doc.reemplazar(*doc.divs[op["id"]], _lineas(op["contenido"], _eol(doc)))
+
+OPERACIONES = {"poner_clave": _poner_clave, "borrar_seccion": _borrar_seccion, "reemplazar_div": _reemplazar_div}
+
+def aplicar(texto: str, ops: list) -> str:
+    """Aplica las operaciones en orden. Si ninguna cambió nada devuelve `texto` tal cual."""
+    doc = Documento(texto)
+    cambio = False
+    for op in ops:
+        cambio |= OPERACIONES[op["op"]](doc, op)
+    return doc.texto() if cambio else texto
+
+def editar_archivo(path: Path, ops: list, escribir: bool = True, respaldo=None) -> bool:
+    """
+    True si el archivo cambia. Con escribir=True lo reemplaza de forma atómica,
+    llamando antes a respaldo(path) si se entrega.
+    """
+    texto = Path(path).read_bytes().decode("utf-8")  # sin traducir CRLF: _eol() lo respeta al editar
+    nuevo = aplicar(texto, ops)
+    if nuevo is texto:
+        return False
+    if escribir:
+        if respaldo:
+            respaldo(path)
+        escribir_atomico(path, nuevo)
+    return True
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""
+Respaldos por instantánea, fuera del árbol del sitio (.apuntes_respaldos/).
+
+  objetos/<sha[:2]>/<sha256>.gz     contenido comprimido, una sola vez por contenido
+  instantaneas/<id>.json            una por corrida: {ruta: sha256} + comando y fecha
+
+Respaldar un archivo cuesta un hash y, solo si ese contenido es nuevo, una
+escritura: nada de probar .bak, .bak.1, .bak.2… Quarto no ve la carpeta (empieza
+con punto) y git la ignora. scripts/respaldos.py lista y restaura.
+"""
+
+from pathlib import Path
+from datetime import datetime
+import gzip, hashlib, json, os, time
+
+from .escritura import escribir_atomico, escribir_si_cambia
+
+RESPALDOS_DIR = Path(".apuntes_respaldos")
+
+def _obj(sha: str, raiz: Path) -> Path:
+    return raiz / "objetos" / sha[:2] / f"{sha}.gz"
+
+def guardar_objeto(path: Path, raiz: Path = RESPALDOS_DIR) -> str:
+    """Guarda el contenido actual de `path` (si no estaba) y devuelve su sha256."""
+    data = Path(path).read_bytes()
+    sha = hashlib.sha256(data).hexdigest()
+    obj = _obj(sha, raiz)
+    if not obj.exists():
+        obj.parent.mkdir(parents=True, exist_ok=True)
+        escribir_atomico(obj, gzip.compress(data, 6, mtime=0))
+    return sha
+
+def leer_objeto(sha: str, raiz: Path = RESPALDOS_DIR) -> bytes:
+    return gzip.decompress(_obj(sha, raiz).read_bytes())
+
+class Instantanea:
+    """
+    Una corrida de un script. guardar() respalda un archivo; cerrar() escribe el
+    índice (solo si se respaldó algo). También sirve como `with`.
+    """
+    def __init__(self, comando: str, raiz: Path = RESPALDOS_DIR):
+        self.raiz = raiz
+        ahora = datetime.now()
+        self.id = f"{ahora:%Y%m%d-%H%M%S}-{comando}-{os.getpid()}"
+        self.datos = {"id": self.id, "comando": comando, "creado": ahora.isoformat(timespec="seconds"),
+                      "orden_ns": time.time_ns(), "archivos": {}}
+
+    def guardar(self, path: Path) -> str:
+        sha = guardar_objeto(path, self.raiz)
+        self.agregar(path, sha)
+        return sha
+
+    def agregar(self, path: Path, sha: str):
+        """Para respaldos hechos en otro proceso con guardar_objeto()."""
+        self.datos["archivos"][Path(path).as_posix()] = sha
+
+    def cerrar(self) -> Path | None:
+        if not self.datos["archivos"]:
+            return None
+        destino = self.raiz / "instantaneas" / f"{self.id}.json"
+        destino.parent.mkdir(parents=True, exist_ok=True)
+        escribir_atomico(destino, json.dumps(self.datos, ensure_ascii=False, indent=1, sort_keys=True))
+        return destino
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+# ---------- Consultas / restauración ----------
+def listar(raiz: Path = RESPALDOS_DIR) -> list:
+    """Instantáneas de la más nueva a la más antigua."""
+    carpeta = raiz / "instantaneas"
+    if not carpeta.is_dir():
+        return []
+    out = [json.loads(p.read_text(encoding="utf-8")) for p in carpeta.glob("*.json")]
+    return sorted(out, key=lambda d: (d.get("orden_ns", 0), d["id"]), reverse=True)
+
+def cargar(ident: str, raiz: Path = RESPALDOS_DIR) -> dict:
+    """Instantánea por id completo o por prefijo único."""
+    cands = [d for d in listar(raiz) if d["id"].startswith(ident)]
+    if len(cands) != 1:
+        raise KeyError(f"'{ident}' calza con {len(cands)} instantáneas")
+    return cands[0]
+
+def restaurar(snap: dict, rutas: list | None = None, aplicar: bool = True, raiz: Path = RESPALDOS_DIR) -> list:
+    """Devuelve [(ruta, cambió)] de los archivos (todos o `rutas`) de la instantánea."""
+    quiero = {Path(r).as_posix() for r in rutas} if rutas else None
+    res = []
+    for ruta, sha in sorted(snap["archivos"].items()):
+        if quiero is not None and ruta not in quiero:
+            continue
+        data = leer_objeto(sha, raiz)
+        if aplicar:
+            Path(ruta).parent.mkdir(parents=True, exist_ok=True)
+            res.append((ruta, escribir_si_cambia(Path(ruta), data)))
+        else:
+            try:
+                res.append((ruta, Path(ruta).read_bytes() != data))
+            except FileNotFoundError:
+                res.append((ruta, True))
+    return res
@@ -0,0 +1,22 @@
+# -*- coding: utf-8 -*-
+"""
+Normalización de texto: una sola definición para el parser de nombres, el
+catálogo, el generador y los índices, así las claves de curso y los slugs no
+se separan entre scripts.
+
+  strip_accents("Sociología")      → "Sociologia"
+  norm_key("Sociología Política")  → "sociologiapolitica"   (match de cursos)
+  slugify("Sociología Política")   → "sociologia-politica"  (carpetas, .qmd)
+"""
+
+import re, unicodedata
+
+def strip_accents(s: str) -> str:
+    return "".join(c for c in unicodedata.normalize("NFD", s) if unicodedata.category(c) != "Mn")
+
+def norm_key(s: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "", strip_accents(s).lower())
+
+def slugify(s: str, vacio: str = "curso") -> str:
+    s2 = re.sub(r"[^a-z0-9]+", "-", strip_accents(s).lower()).strip("-")
+    return s2 or vacio
@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+"""
+Búsqueda de texto completo sobre los PDFs.
+
+1) Extrae el texto de cada PDF una sola vez (pypdf si está instalado; si no,
+   `pdftotext` de poppler) y lo cachea por sha256 en .apuntes_cache/texto/.
+2) Arma un índice invertido por curso (un shard por anio/sem/curso) en
+   resources/busqueda/, más indice.json con un filtro de Bloom por shard.
+   El navegador (busqueda.js) baja indice.json, descarta los shards que no
+   pueden tener los términos y solo pide los que sí.
+
+Un shard solo se reescribe si cambió su lista de documentos (firma).
+"""
+
+from pathlib import Path
+import base64, hashlib, json, math, re, shutil, subprocess
+from concurrent.futures import ProcessPoolExecutor
+
+from .texto import strip_accents
+from .escritura import escribir_si_cambia
+
+CACHE_DIR = Path(".apuntes_cache/texto")
+SALIDA_DIR = Path("resources/busqueda")
+INDICE_FILE = "indice.json"
+INDICE_VERSION = 1
+BLOOM_BITS_POR_TERMINO = 10   # ~1% de falsos positivos con k=7
+BLOOM_K = 7
+TOKEN_MAX = 30
+
+STOPWORDS = set("""
+que los las del por una con para como mas pero sus este esta esto estos estas entre sobre
+son ser fue han hay sin tambien donde cuando muy desde todo todos todas ese esa eso les
+nos era sino porque cual cuales otro otra otros otras mismo misma ello ellos ellas hasta
+""".split())
+
+# ---------- Extracción ----------
+def backend() -> str | None:
+    try:
+        import pypdf  # noqa: F401
+        return "pypdf"
+    except ImportError:
+        pass
+    return "pdftotext" if shutil.which("pdftotext") else None
+
+def extraer_texto(pdf: Path) -> str | None:
+    """Texto plano del PDF, "" si no se pudo leer, None si no hay backend."""
+    b = backend()
+    if b == "pypdf":
+        from pypdf import PdfReader
+        try:
+            return "\n".join((p.extract_text() or "") for p in PdfReader(str(pdf)).pages)
+        except Exception:
+            return ""
+    if b == "pdftotext":
+        try:
+            r = subprocess.run(["pdftotext", "-q", "-enc", "UTF-8", str(pdf), "-"],
+                               capture_output=True, timeout=300)
+            return r.stdout.decode("utf-8", "replace")
+        except Exception:
+            return ""
+    return None
+
+def ruta_cache(sha: str, cache: Path = CACHE_DIR) -> Path:
+    return cache / f"{sha}.txt"
+
+def _extraer_a_cache(par):
+    pdf, sha, cache = par
+    txt = extraer_texto(Path(pdf))
+    if txt is not None:
+        cache.mkdir(parents=True, exist_ok=True)
+        escribir_si_cambia(ruta_cache(sha, cache), txt)
+    return sha, txt is not None
+
+def asegurar_textos(pendientes: list, jobs: int = 1, cache: Path = CACHE_DIR) -> int:
+    """Extrae (en paralelo si jobs > 1) los [(pdf, sha)] que aún no están en caché."""
+    faltan = [(str(p), sha, cache) for p, sha in pendientes if not ruta_cache(sha, cache).exists()]
+    if not faltan:
+        return 0
+    if jobs <= 1 or len(faltan) == 1:
+        res = [_extraer_a_cache(x) for x in faltan]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as ex:
+            res = list(ex.map(_extraer_a_cache, faltan))
+    return sum(1 for _, ok in res if ok)
+
+# ---------- Tokens (misma regla que busqueda.js) ----------
+def tokens(texto: str) -> list:
+    return [t for t in re.findall(r"[a-z0-9]{3,}", strip_accents(texto).lower())
+            if len(t) <= TOKEN_MAX and t not in STOPWORDS]
+
+# ---------- Bloom (FNV-1a 32 bits, doble hash; idéntico en busqueda.js) ----------
+def _fnv1a(s: str, h: int) -> int:
+    for ch in s:
+        h ^= ord(ch)
+        h = (h * 0x01000193) & 0xFFFFFFFF
+    return h
+
+def bloom(terminos, k: int = BLOOM_K) -> tuple:
+    m = max(64, math.ceil(len(terminos) * BLOOM_BITS_POR_TERMINO / 8) * 8)
+    bits = bytearray(m // 8)
+    for t in terminos:
+        h1, h2 = _fnv1a(t, 0x811C9DC5), _fnv1a(t, 0x050C5D1F) | 1
+        for i in range(k):
+            b = (h1 + i * h2) % m
+            bits[b >> 3] |= 1 << (b & 7)
+    return m, base64.b64encode(bytes(bits)).decode("ascii")
+
+# ---------- Índice ----------
+def clave_shard(qmd: str) -> str:
+    """apuntes/anio-2/sem-03/economia/x.qmd → anio-2/sem-03/economia"""
+    partes = Path(qmd).parts
+    if partes and partes[0] == "apuntes":
+        partes = partes[1:]
+    return "/".join(partes[:-1]) or "_otros"
+
+def url_pagina(qmd: str) -> str:
+    return "/" + Path(qmd).with_suffix(".html").as_posix()
+
+def construir_indice(docs: list, salida: Path = SALIDA_DIR, cache: Path = CACHE_DIR) -> dict:
+    """
+    docs: [{"fname", "sha", "qmd", "titulo", "curso", "anio"}] (solo los que tienen
+    texto en caché). Escribe los shards que cambiaron y indice.json.
+    """
+    previo = {}
+    try:
+        data = json.loads((salida / INDICE_FILE).read_text(encoding="utf-8"))
+        if data.get("version") == INDICE_VERSION:
+            previo = {s["key"]: s for s in data["shards"]}
+    except Exception:
+        pass
+
+    por_shard = {}
+    for d in docs:
+        por_shard.setdefault(clave_shard(d["qmd"]), []).append(d)
+
+    shards, escritos = [], 0
+    for key in sorted(por_shard):
+        lst = sorted(por_shard[key], key=lambda d: d["fname"])
+        firma = hashlib.sha256(json.dumps(
+            [(d["fname"], d["sha"], d["titulo"], d["qmd"]) for d in lst], ensure_ascii=False
+        ).encode("utf-8")).hexdigest()[:16]
+        rel = f"{key}.json"
+        if key in previo and previo[key].get("firma") == firma and (salida / rel).exists():
+            shards.append(previo[key]); continue
+
+        postings = {}
+        for i, d in enumerate(lst):
+            frec = {}
+            for t in tokens(ruta_cache(d["sha"], cache).read_text(encoding="utf-8")):
+                frec[t] = frec.get(t, 0) + 1
+            for t, n in frec.items():
+                postings.setdefault(t, []).extend((i, n))
+        shard = {
+            "docs": [{"t": d["titulo"], "u": url_pagina(d["qmd"]), "c": d["curso"], "a": d["anio"]} for d in lst],
+            "terms": dict(sorted(postings.items())),
+        }
+        (salida / rel).parent.mkdir(parents=True, exist_ok=True)
+        escritos += escribir_si_cambia(salida / rel, json.dumps(shard, ensure_ascii=False, separators=(",", ":")))
+        m, bits = bloom(postings)
+        shards.append({"key": key, "url": rel, "docs": len(lst), "firma": firma, "m": m, "bloom": bits})
+
+    indice = {"version": INDICE_VERSION, "k": BLOOM_K, "shards": shards}
+    salida.mkdir(parents=True, exist_ok=True)
+    escribir_si_cambia(salida / INDICE_FILE, json.dumps(indice, ensure_ascii=False, separators=(",", ":")))
+    vigentes = {f"{s['key']}.json" for s in shards}
+    for viejo in previo:
+        if f"{viejo}.json" not in vigentes and (salida / f"{viejo}.json").exists():
+            (salida / f"{viejo}.json").unlink()
+    return {"shards": len(shards), "shards_escritos": escritos, "docs": len(docs)}
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""
+Vista previa liviana de cada PDF: miniatura de la primera página, número de
+páginas y tamaño. Todo queda cacheado por sha256 en resources/miniaturas/
+(<sha>.jpg + <sha>.json), así un PDF se procesa una sola vez aunque cambie de
+nombre. Las páginas muestran la miniatura y cargan el visor recién al click.
+
+Herramientas opcionales: `pdftoppm` (poppler) para la miniatura; pypdf o
+`pdfinfo` para contar páginas. Sin ellas la página igual sale, sin imagen.
+"""
+
+from pathlib import Path
+import json, re, shutil, subprocess
+
+from .escritura import escribir_si_cambia
+
+MINIATURAS_DIR = Path("resources/miniaturas")
+SITE_BASE_MINIATURAS = "/resources/miniaturas"
+ANCHO_PX = 360
+
+def contar_paginas(pdf: Path) -> int | None:
+    try:
+        from pypdf import PdfReader
+        return len(PdfReader(str(pdf)).pages)
+    except ImportError:
+        pass
+    except Exception:
+        return None
+    if shutil.which("pdfinfo"):
+        try:
+            r = subprocess.run(["pdfinfo", str(pdf)], capture_output=True, timeout=60)
+            m = re.search(rb"^Pages:\s+(\d+)", r.stdout, re.M)
+            return int(m.group(1)) if m else None
+        except Exception:
+            return None
+    return None
+
+def renderizar_miniatura(pdf: Path, destino: Path) -> bool:
+    """Primera página a JPEG de ANCHO_PX de ancho. False si no hay pdftoppm o falla."""
+    if not shutil.which("pdftoppm"):
+        return False
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        r = subprocess.run(["pdftoppm", "-q", "-f", "1", "-l", "1", "-singlefile", "-jpeg",
+                            "-jpegopt", "quality=75", "-scale-to-x", str(ANCHO_PX), "-scale-to-y", "-1",
+                            str(pdf), str(destino.with_suffix(""))], capture_output=True, timeout=120)
+        return r.returncode == 0 and destino.exists()
+    except Exception:
+        return False
+
+def tamano_humano(n: int) -> str:
+    if n < 1024 * 1024:
+        return f"{max(1, round(n / 1024))} KB"
+    return f"{n / (1024 * 1024):.1f} MB".replace(".", ",")
+
+def info(pdf: Path, sha: str, carpeta: Path = MINIATURAS_DIR) -> dict:
+    """{"paginas", "bytes", "miniatura"} del PDF; se calcula solo la primera vez por sha."""
+    cache = carpeta / f"{sha}.json"
+    try:
+        data = json.loads(cache.read_text(encoding="utf-8"))
+        # reintenta lo que faltó si ahora sí hay herramientas
+        if (data["miniatura"] or not shutil.which("pdftoppm")) and data["paginas"] is not None:
+            return data
+    except (FileNotFoundError, ValueError, KeyError):
+        data = None
+
+    jpg = carpeta / f"{sha}.jpg"
+    ok = jpg.exists() or renderizar_miniatura(pdf, jpg)
+    paginas = contar_paginas(pdf)
+    data = {
+        "paginas": paginas if paginas is not None else (data or {}).get("paginas"),
+        "bytes": pdf.stat().st_size,
+        "miniatura": f"{SITE_BASE_MINIATURAS}/{jpg.name}" if ok else None,
+    }
+    carpeta.mkdir(parents=True, exist_ok=True)
+    escribir_si_cambia(cache, json.dumps(data, sort_keys=True))
+    return data
+
+def detalle(data: dict) -> str:
+    """' · 12 págs. · 1,3 MB' para el botón del visor."""
+    partes = []
+    if data.get("paginas"):
+        partes.append(f"{data['paginas']} pág." if data["paginas"] == 1 else f"{data['paginas']} págs.")
+    if data.get("bytes"):
+        partes.append(tamano_humano(data["bytes"]))
+    return "".join(f" · {p}" for p in partes)
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark reproducible de los scripts de apuntes sobre corpus sintéticos.
+
+Arma en una carpeta temporal una malla falsa (MALLA de crear_estructura.py, con
+carpetas de nombre humano como las deja ese script) y N PDFs con nombres
+realistas (tildes, "&", "y", pares Apellido_Nombre, abreviaturas de curso).
+Luego mide, para cada tamaño de corpus:
+
+  parse_filename, index_course_dirs (frío y con caché), migrar_curso_dirs_a_slug,
+  main() de genera_qmd_desde_pdfs (ingesta y re-ingesta idéntica),
+  crear_index_por_curso.main y Ajuste_index.process_file.
+
+Reporta tiempo, throughput y pico de memoria (tracemalloc, en una pasada aparte
+para no inflar los tiempos).
+
+Uso (desde la raíz del repo):
+    python scripts/bench_apuntes.py --tamanos 500,2000 --json bench.json
+"""
+
+from pathlib import Path
+import argparse, contextlib, importlib.util, io, json, os, random, sys, tempfile, time, tracemalloc
+
+REPO = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO / "scripts"))
+
+import crear_estructura, crear_index_por_curso, Ajuste_index
+from apuntes_lib.texto import strip_accents
+
+def _cargar_generador():
+    spec = importlib.util.spec_from_file_location("genera_qmd_desde_pdfs", REPO / "apuntes" / "genera_qmd_desde_pdfs.py")
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+gen = _cargar_generador()
+
+# ---------- Corpus sintético ----------
+APELLIDOS = ["Aravena", "Ortiz", "Monreal", "Pérez", "Muñoz", "Soto", "Núñez", "González", "Díaz", "Rojas"]
+NOMBRES = ["Katherine", "Cahuil", "Sebastián", "Josefa", "Tomás", "Inés", "Martín", "Belén", "Ángela", "Joaquín"]
+TEMAS = ["Ficha Weber", "Ficha Arendt", "Resumen prueba 1", "Resumen textos prueba 2", "Marxismo",
+         "Park y la Ecología Urbana", "Ficha Locke_", "Síntesis Bourdieu", "Guía & Ejercicios", "Control 3"]
+
+def _variante_curso(rng, curso):
+    """El curso tal cual, sin tildes o en CamelCase abreviado (como llegan de verdad)."""
+    r = rng.random()
+    if r < 0.6:
+        return curso
+    if r < 0.8:
+        return strip_accents(curso)
+    return "".join(w[:1].upper() + w[1:] for w in strip_accents(curso).split() if len(w) > 3)
+
+def _autores(rng):
+    r = rng.random()
+    par = lambda: f"{rng.choice(APELLIDOS)}_{rng.choice(NOMBRES)}"
+    if r < 0.5:
+        return par()                                           # patrón B
+    if r < 0.75:
+        return f"{par()}_{par()}"                              # patrón B, dos autores
+    a, b = (f"{rng.choice(APELLIDOS)} {rng.choice(NOMBRES)}" for _ in range(2))
+    return f"{a} {rng.choice(['y', '&'])} {b}"                 # patrón A
+
+def nombres_sinteticos(n: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    cursos = [c for sems in crear_estructura.MALLA.values() for lst in sems.values() for c in lst]
+    out = set()
+    while len(out) < n:
+        curso = _variante_curso(rng, rng.choice(cursos))
+        out.add(f"{curso}_{rng.randint(2019, 2025)}_{rng.choice(TEMAS)} {len(out)}_{_autores(rng)}.pdf")
+    return sorted(out)
+
+def pdf_falso(rng, kb: int) -> bytes:
+    cuerpo = rng.randbytes(kb * 1024) if kb else b""
+    return b"%PDF-1.4\n1 0 obj<<>>endobj\n" + cuerpo + b"\n%%EOF\n"
+
+def sintetizar(raiz: Path, n: int, kb: int, seed: int = 7) -> list:
+    """Crea la malla (nombres humanos) y N PDFs en resources/pdfs. Devuelve los nombres."""
+    os.chdir(raiz)
+    with contextlib.redirect_stdout(io.StringIO()):
+        crear_estructura.main([])
+    (raiz / "apuntes" / gen.PREFERRED_CSS_NAME).write_text("/* bench */", encoding="utf-8")
+    return escribir_pdfs(raiz, nombres_sinteticos(n, seed), kb, seed)
+
+def escribir_pdfs(raiz: Path, nombres: list, kb: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    pdf_dir = raiz / gen.PDF_DIR
+    pdf_dir.mkdir(parents=True, exist_ok=True)
+    for nombre in nombres:
+        (pdf_dir / nombre).write_bytes(pdf_falso(rng, kb))
+    return nombres
+
+# ---------- Medición ----------
+def medir(fn, repeticiones: int = 1, preparar=None) -> dict:
+    """Mejor tiempo de `repeticiones` (sin tracemalloc)."""
+    tiempos = []
+    for _ in range(repeticiones):
+        if preparar: preparar()
+        with contextlib.redirect_stdout(io.StringIO()):
+            t0 = time.perf_counter(); fn(); tiempos.append(time.perf_counter() - t0)
+    return {"s": min(tiempos)}
+
+def medir_memoria(fn, preparar=None) -> int:
+    if preparar: preparar()
+    tracemalloc.start()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def _destructivas(raiz: Path, nombres: list, kb: int, con_memoria: bool) -> dict:
+    """
+    Etapas que cambian el árbol (migración, ingesta): una sola pasada por corpus.
+    Con con_memoria=True se corren bajo tracemalloc (los tiempos de esa pasada se descartan).
+    """
+    def una(fn):
+        if con_memoria:
+            return None, medir_memoria(fn)
+        return medir(fn)["s"], None
+
+    os.chdir(raiz)
+    out = {}
+    out["migrar_curso_dirs_a_slug"] = (1,) + una(lambda: gen.migrar_curso_dirs_a_slug(gen.APUNTES_BASE))
+    out["genera main() ingesta"] = (len(nombres),) + una(lambda: gen.main([]))
+    escribir_pdfs(raiz, nombres, kb)
+    out["genera main() re-ingesta idéntica"] = (len(nombres),) + una(lambda: gen.main([]))
+    return out
+
+def correr_tamano(n: int, kb: int, reps: int, memoria: bool) -> list:
+    filas = []
+    def agregar(etapa, items, s, pico):
+        filas.append({
+            "etapa": etapa, "n": n, "items": items, "s": round(s, 4),
+            "por_s": round(items / s, 1) if s else None,
+            "pico_mb": None if pico is None else round(pico / 2**20, 2),
+        })
+    def fila(etapa, items, fn, preparar=None):
+        s = medir(fn, reps, preparar)["s"]
+        agregar(etapa, items, s, medir_memoria(fn, preparar) if memoria else None)
+
+    cwd = os.getcwd()
+    try:
+        picos = {}
+        if memoria:
+            with tempfile.TemporaryDirectory(prefix="bench-apuntes-mem-") as tmp:
+                nombres = sintetizar(Path(tmp), n, kb)
+                picos = _destructivas(Path(tmp), nombres, kb, True)
+
+        with tempfile.TemporaryDirectory(prefix="bench-apuntes-") as tmp:
+            raiz = Path(tmp)
+            nombres = sintetizar(raiz, n, kb)
+            paths = [Path(x) for x in nombres]
+
+            def parse_todos():
+                for p in paths:
+                    try: gen.parse_filename(p)
+                    except ValueError: pass
+            fila("parse_filename", n, parse_todos)
+
+            tiempos = _destructivas(raiz, nombres, kb, False)
+            for etapa, (items, s, _) in tiempos.items():
+                agregar(etapa, items, s, picos[etapa][2] if picos else None)
+
+            cache = gen.catalogo.CACHE_FILE
+            borrar_cache = lambda: cache.exists() and cache.unlink()
+            fila("index_course_dirs (frío)", 1, lambda: gen.index_course_dirs(gen.APUNTES_BASE), preparar=borrar_cache)
+            fila("index_course_dirs (caché)", 1, lambda: gen.index_course_dirs(gen.APUNTES_BASE))
+
+            argv = sys.argv
+            def crear_index():
+                sys.argv = ["crear_index_por_curso.py", "--force"]
+                try: crear_index_por_curso.main()
+                finally: sys.argv = argv
+            fila("crear_index_por_curso.main", 1, crear_index)
+
+            indices = sorted((raiz / "apuntes").glob("anio-*/sem-*/*/index.qmd"))
+            def ajustar():
+                for f in indices:
+                    Ajuste_index.process_file(f, apply=False, no_backup=True)
+            fila("Ajuste_index.process_file", len(indices), ajustar)
+    finally:
+        os.chdir(cwd)
+    return filas
+
+def imprimir_tabla(filas: list):
+    print(f"{'etapa':<38} {'N':>7} {'items':>7} {'seg':>9} {'items/s':>11} {'pico MB':>8}")
+    for f in filas:
+        pico = "-" if f["pico_mb"] is None else f"{f['pico_mb']:.2f}"
+        print(f"{f['etapa']:<38} {f['n']:>7} {f['items']:>7} {f['s']:>9.4f} {f['por_s'] or 0:>11.1f} {pico:>8}")
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark de los scripts de apuntes con corpus sintéticos.")
+    ap.add_argument("--tamanos", default="200,1000", help="Cantidades de PDFs separadas por coma (ej: 500,2000,5000).")
+    ap.add_argument("--kb", type=int, default=32, help="Tamaño de cada PDF falso en KB.")
+    ap.add_argument("--reps", type=int, default=3, help="Repeticiones por etapa repetible (se informa la mejor).")
+    ap.add_argument("--sin-memoria", action="store_true", help="No medir pico de memoria (más rápido).")
+    ap.add_argument("--json", metavar="ARCHIVO", help="Guarda los resultados en JSON.")
+    args = ap.parse_args()
+
+    filas = []
+    for n in [int(x) for x in args.tamanos.split(",") if x.strip()]:
+        filas += correr_tamano(n, args.kb, args.reps, not args.sin_memoria)
+    imprimir_tabla(filas)
+    if args.json:
+        Path(args.json).write_text(json.dumps(filas, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"\nResultados en {args.json}")
+
+if __name__ == "__main__":
+    main()
@@ -3,9 +3,16 @@
 """
 Crea SOLO la estructura /apuntes/anio-X/sem-YY/ (sin .qmd).
 Agrega un .gitkeep vacío para que Git incluya las carpetas.
+Un ramo que ya tiene carpeta (con slug o nombre humano, ver title.txt) no se
+vuelve a crear.
 """
 
 from pathlib import Path
+import argparse
+
+from apuntes_lib.arbol import Arbol
+from apuntes_lib.escritura import escribir_si_cambia
+from apuntes_lib.texto import norm_key
 
 BASE = Path("./apuntes")
 
@@ -86,8 +93,17 @@ MALLA = {
     }
 }
 
-def main():
-    creadas = 0
+def configurar(ap: argparse.ArgumentParser):
+    pass  # sin opciones
+
+def ejecutar(args, arbol: Arbol | None = None):
+    arbol = arbol or Arbol(BASE)
+    # ramos que ya existen por semestre (por nombre de carpeta o título humano)
+    existentes = set()
+    for c in arbol.cursos():
+        existentes |= {(c["anio"], c["sem"], c["key"]), (c["anio"], c["sem"], norm_key(c["titulo"]))}
+
+    creadas = existentes_n = 0
     for anio, semestres in MALLA.items():
         for sem, ramos in semestres.items():
             # crea carpeta del semestre
@@ -95,17 +111,27 @@ def main():
             sem_dir.mkdir(parents=True, exist_ok=True)
 
             # .gitkeep para que Git suba la carpeta aunque esté vacía
-            (sem_dir / ".gitkeep").write_text("", encoding="utf-8")
+            escribir_si_cambia(sem_dir / ".gitkeep", "")
 
             # crea carpeta por ramo (sin archivos)
             for ramo in ramos:
+                if (anio, sem, norm_key(ramo)) in existentes:
+                    existentes_n += 1
+                    continue
                 # nombre de carpeta “amable” (sin tildes/espacios no hace falta aún)
                 ramo_dir = sem_dir / ramo
                 ramo_dir.mkdir(parents=True, exist_ok=True)
-                (ramo_dir / ".gitkeep").write_text("", encoding="utf-8")
+                escribir_si_cambia(ramo_dir / ".gitkeep", "")
                 creadas += 1
 
-    print(f"Listo ✅  Estructura creada. Carpetas de ramos: {creadas}")
+    if creadas:
+        arbol.invalidar()
+    print(f"Listo ✅  Estructura creada. Carpetas de ramos nuevas: {creadas} | ya existían: {existentes_n}")
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    configurar(ap)
+    ejecutar(ap.parse_args(argv))
 
 if __name__ == "__main__":
     main()
@@ -2,55 +2,27 @@
 # -*- coding: utf-8 -*-
 
 from pathlib import Path
-import re
-import unicodedata
 import argparse
-import shutil
+
+from apuntes_lib import plantillas, imagenes, respaldos, qmd
+from apuntes_lib.arbol import Arbol
+from apuntes_lib.texto import strip_accents, slugify
 
 ROOT = Path(".")
 BASE = ROOT / "apuntes"
 
-def strip_accents(s: str) -> str:
-    return "".join(
-        c for c in unicodedata.normalize("NFD", s)
-        if unicodedata.category(c) != "Mn"
-    )
-
-def slugify(texto: str) -> str:
-    t = strip_accents(texto).lower()
-    t = re.sub(r"[^a-z0-9]+", "-", t).strip("-")
-    return t or "curso"
-
-def course_title(course_dir: Path) -> str:
-    tfile = course_dir / "title.txt"
-    if tfile.exists():
-        return tfile.read_text(encoding="utf-8").strip() or course_dir.name
-    return course_dir.name
-
-def detect_codes(course_dir: Path):
-    """
-    Devuelve (anio_code, sem_code) tomados del path: .../apuntes/anio-*/sem-*/<curso>
-    """
-    try:
-        sem_code = course_dir.parent.name          # sem-XX
-        anio_code = course_dir.parent.parent.name  # anio-X
-        return anio_code, sem_code
-    except Exception:
-        return "anio-?", "sem-??"
-
 TEMPLATE = r'''---
-title: "{TITLE}"
+title: "{TITLE!y}"
 description: "Síntesis, resúmenes y apuntes del ramo."
 categories: ["{ANIO}", "{SEM}"]
-image: /resources/imagenes/cursos/{BANNER}
+image: {IMAGE}
 title-block-banner: true
 page-layout: full
 
 listing:
   - id: apuntes-curso
     contents:
-      - "*.qmd"
-      - "!index.qmd"
+      - "_apuntes.yml"   # precalculado por genera_qmd_desde_pdfs.py (catálogo SQLite)
     type: table
     sort: "date desc"
     fields: [title, author, date, description]
@@ -62,23 +34,7 @@ listing:
 ::: {{#apuntes-curso}}
 :::
 '''
-
-def backup_file(path: Path) -> Path:
-    """
-    Crea un respaldo .bak (o .bak.N si ya existe). Devuelve la ruta de backup.
-    """
-    base_bak = path.with_suffix(path.suffix + ".bak")
-    if not base_bak.exists():
-        shutil.copy2(path, base_bak)
-        return base_bak
-    # Encuentra el siguiente índice libre
-    i = 1
-    while True:
-        candidate = path.with_suffix(path.suffix + f".bak.{i}")
-        if not candidate.exists():
-            shutil.copy2(path, candidate)
-            return candidate
-        i += 1
+INDEX_TMPL = plantillas.compilar(TEMPLATE)
 
 def should_process(course_dir: Path, only: str | None) -> bool:
     if not only:
@@ -88,17 +44,14 @@ def should_process(course_dir: Path, only: str | None) -> bool:
     name = strip_accents(course_dir.name).lower()
     return target in name
 
-def main():
-    parser = argparse.ArgumentParser(
-        description="Crea o sobrescribe index.qmd en /apuntes/anio-*/sem-*/<curso>/"
-    )
+def configurar(parser: argparse.ArgumentParser):
     parser.add_argument(
         "--force", action="store_true",
         help="Sobrescribe index.qmd si ya existe."
     )
     parser.add_argument(
         "--backup", action="store_true",
-        help="Guarda un respaldo .bak antes de sobrescribir (requiere --force)."
+        help="Respalda antes de sobrescribir en una instantánea (requiere --force; ver scripts/respaldos.py)."
     )
     parser.add_argument(
         "--only", type=str, default=None,
@@ -108,8 +61,11 @@ def main():
         "--dry-run", action="store_true",
         help="No escribe archivos; solo muestra lo que haría."
     )
-    args = parser.parse_args()
 
+def ejecutar(args, arbol: Arbol | None = None):
+    """Con `arbol` (build) los index.qmd quedan pendientes en memoria; si no, se escriben al final."""
+    propio = arbol is None
+    arbol = arbol or Arbol(BASE)
     if not BASE.exists():
         print("No encuentro la carpeta 'apuntes/'. ¿Estás en la raíz del repo?")
         return
@@ -117,54 +73,91 @@ def main():
     creados = 0
     sobrescritos = 0
     saltados = 0
-
-    for anio_dir in sorted(BASE.glob("anio-*")):
-        for sem_dir in sorted(anio_dir.glob("sem-*")):
-            for course_dir in sorted(sem_dir.iterdir()):
-                if not course_dir.is_dir():
-                    continue
-                if not should_process(course_dir, args.only):
-                    continue
-
-                index_qmd = course_dir / "index.qmd"
-                titulo = course_title(course_dir)
-                anio_code, sem_code = detect_codes(course_dir)
-                banner_slug = slugify(titulo) + ".jpg"  # cambia a .png si prefieres
-
-                content = TEMPLATE.format(
-                    TITLE=titulo.replace('"', '\\"'),
-                    ANIO=anio_code,
-                    SEM=sem_code,
-                    BANNER=banner_slug
-                )
-
-                if index_qmd.exists():
-                    if not args.force:
-                        print(f"⏭  Ya existe, no se sobrescribe (usa --force): {index_qmd}")
-                        saltados += 1
-                        continue
-                    # con --force: opcional backup
-                    if args.backup:
-                        bak = backup_file(index_qmd)
-                        print(f"💾  Backup creado: {bak}")
+    identicos = 0
+    imagenes_al_dia = 0
+    snap = respaldos.Instantanea("crear_index_por_curso")
+    variantes = imagenes.cargar_manifiesto()  # banners redimensionados (scripts/variantes_imagenes.py)
+
+    # catálogo compartido (title.txt y códigos anio/sem ya resueltos)
+    for curso in arbol.cursos():
+        course_dir = Path(curso["dir"])
+        if not course_dir.is_dir():
+            continue
+        if not should_process(course_dir, args.only):
+            continue
+
+        index_qmd = course_dir / "index.qmd"
+        titulo = curso["titulo"]
+        anio_code, sem_code = curso["anio"], curso["sem"]
+        banner_slug = slugify(titulo) + ".jpg"  # cambia a .png si prefieres
+        banner = f"/resources/imagenes/cursos/{banner_slug}"
+        # variante de tarjeta si existe; si no, el banner original
+        image = imagenes.url_variante(banner, imagenes.ANCHO_TARJETA, variantes)
+
+        content = INDEX_TMPL.render(dict(
+            TITLE=titulo,
+            ANIO=anio_code,
+            SEM=sem_code,
+            IMAGE=image
+        ))
+
+        if arbol.existe(index_qmd):
+            if not args.force:
+                # sin --force solo se pone al día `image:`, si sigue siendo el banner del curso
+                # (original o una variante); una imagen elegida a mano no se toca
+                propias = {banner} | {"/" + p for p in imagenes.rutas(variantes.get(banner.lstrip("/")))}
+                actual = str(arbol.front_matter(index_qmd).get("image", ""))
+                if actual != image and "/" + actual.lstrip("/") in propias:
                     if args.dry_run:
-                        print(f"[dry-run] Sobrescribiría: {index_qmd}")
+                        print(f"[dry-run] Cambiaría image: {index_qmd}")
                     else:
-                        index_qmd.write_text(content, encoding="utf-8")
-                        print(f"🔁 Sobrescrito: {index_qmd}")
-                    sobrescritos += 1
+                        arbol.escribir(index_qmd, qmd.aplicar(arbol.leer(index_qmd), [qmd.poner_clave("image", image)]))
+                        print(f"🖼  image: {image}: {index_qmd}")
+                    imagenes_al_dia += 1
                 else:
-                    if args.dry_run:
-                        print(f"[dry-run] Crearía: {index_qmd}")
-                    else:
-                        index_qmd.write_text(content, encoding="utf-8")
-                        print(f"✔ Creado: {index_qmd}")
-                    creados += 1
+                    print(f"⏭  Ya existe, no se sobrescribe (usa --force): {index_qmd}")
+                    saltados += 1
+                continue
+            # mismo contenido: no se reescribe (mtime intacto → Quarto no re-renderiza)
+            if arbol.leer(index_qmd) == content:
+                print(f"=  Sin cambios: {index_qmd}")
+                identicos += 1
+                continue
+            # con --force: opcional backup
+            if args.backup and not args.dry_run and index_qmd.exists():
+                snap.guardar(index_qmd)
+            if args.dry_run:
+                print(f"[dry-run] Sobrescribiría: {index_qmd}")
+            else:
+                arbol.escribir(index_qmd, content)
+                print(f"🔁 Sobrescrito: {index_qmd}")
+            sobrescritos += 1
+        else:
+            if args.dry_run:
+                print(f"[dry-run] Crearía: {index_qmd}")
+            else:
+                arbol.escribir(index_qmd, content)
+                print(f"✔ Creado: {index_qmd}")
+            creados += 1
+
+    if propio:
+        arbol.volcar()
+    if snap.cerrar():
+        print(f"💾  Respaldo: instantánea {snap.id} (python3 scripts/respaldos.py restaurar {snap.id})")
 
     print("\nResumen:")
     print(f"  ✔ Nuevos creados     : {creados}")
     print(f"  🔁 Sobrescritos       : {sobrescritos}")
+    print(f"  🖼  image: al día (sin force): {imagenes_al_dia}")
     print(f"  ⏭  Saltados (sin force): {saltados}")
+    print(f"  =  Sin cambios (escritura evitada): {identicos}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Crea o sobrescribe index.qmd en /apuntes/anio-*/sem-*/<curso>/"
+    )
+    configurar(parser)
+    ejecutar(parser.parse_args(argv))
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Post-render: los PDFs de resources/apuntes_Listos/ son symlinks al almacén
+(resources/apuntes_store/<sha256>.pdf). Quarto copia los blobs a docs/ (están
+en `resources:` de _quarto.yml), pero un symlink copiado tal cual queda relativo
+y GitHub Pages no los sirve. Aquí cada symlink de docs/ pasa a ser un hard link
+al blob copiado: cero bytes extra en disco y un solo objeto en git.
+
+Uso (lo llama Quarto vía post-render, o a mano):
+  python3 scripts/materializar_enlaces.py [--out docs]
+"""
+
+from pathlib import Path
+import argparse, os, sys
+
+from apuntes_lib import almacen
+
+def main():
+    ap = argparse.ArgumentParser(description="Cambia los symlinks de docs/ por hard links a los blobs.")
+    ap.add_argument("--out", default=os.environ.get("QUARTO_PROJECT_OUTPUT_DIR", "docs"),
+                    help="Carpeta de salida del sitio (por defecto la de Quarto o docs/).")
+    args = ap.parse_args()
+    out = Path(args.out)
+    if not out.is_dir():
+        print(f"No existe {out} (¿sin render?)."); return
+    r = almacen.materializar_enlaces(out)
+    print(f"🔗 {out}: {r['enlazados']} symlinks → hard links, {r['copiados']} copiados")
+    for p in r["rotos"]:
+        print(f"⚠️ Symlink roto (el blob no está en el almacén): {p}")
+    if r["rotos"]:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
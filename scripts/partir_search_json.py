@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Post-render: parte el search.json de Quarto en shards por año/semestre.
+
+Quarto deja un solo docs/search.json que el buscador descarga y parsea
+completo en la primera búsqueda, y crece con cada apunte. Aquí se escribe en
+docs/search/:
+  - core.json      páginas que no son apuntes (inicio, cursos, información…)
+  - titulos.json   todos los apuntes, solo título/enlace (sin texto)
+  - anio-N-sem-MM.json  texto completo de los apuntes de ese semestre
+  - indice.json    lista de shards
+con variantes .gz (y .br si está el paquete `brotli`). Los campos vacíos y
+objectID (== href) se omiten; search_shards.js los repone.
+
+search.json se deja tal cual (respaldo si el cargador no está).
+
+Uso (lo llama Quarto vía post-render, o a mano):
+  python3 scripts/partir_search_json.py [--out docs]
+"""
+
+from pathlib import Path
+import argparse, gzip, json, os, re
+
+from apuntes_lib.escritura import escribir_si_cambia
+
+try:
+    import brotli  # opcional
+except ImportError:
+    brotli = None
+
+RE_SEMESTRE = re.compile(r"^apuntes/(anio-\d+)/(sem-\d+)/")
+
+def compactar(doc: dict, solo_titulo: bool = False) -> dict:
+    d = {k: v for k, v in doc.items() if v not in ("", None, [])}
+    if d.get("objectID") == d.get("href"):
+        d.pop("objectID", None)
+    if "text" in d:
+        d["text"] = re.sub(r"\n{3,}", "\n\n", d["text"]).strip()
+    if solo_titulo:
+        d.pop("text", None); d.pop("section", None)
+    return d
+
+def escribir_shard(destino: Path, docs: list, cont: dict):
+    raw = json.dumps(docs, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    cont["bytes"] += len(raw)
+    cont["escritos"] += escribir_si_cambia(destino, raw)
+    # mtime=0 → mismo .gz si el JSON no cambió
+    cont["escritos"] += escribir_si_cambia(destino.with_name(destino.name + ".gz"), gzip.compress(raw, 9, mtime=0))
+    if brotli is not None:
+        cont["escritos"] += escribir_si_cambia(destino.with_name(destino.name + ".br"), brotli.compress(raw))
+
+def partir(out: Path) -> dict:
+    docs = json.loads((out / "search.json").read_text(encoding="utf-8"))
+    core, titulos, por_sem = [], {}, {}
+    for doc in docs:
+        m = RE_SEMESTRE.match(doc.get("href", ""))
+        if not m:
+            core.append(compactar(doc)); continue
+        por_sem.setdefault(f"{m.group(1)}-{m.group(2)}", []).append(compactar(doc))
+        pagina = doc["href"].split("#", 1)[0]
+        if pagina == doc["href"]:
+            titulos[pagina] = compactar(doc, solo_titulo=True)
+
+    carpeta = out / "search"
+    carpeta.mkdir(parents=True, exist_ok=True)
+    cont = {"escritos": 0, "bytes": 0}
+    escribir_shard(carpeta / "core.json", core, cont)
+    escribir_shard(carpeta / "titulos.json", list(titulos.values()), cont)
+    shards = []
+    for key in sorted(por_sem):
+        escribir_shard(carpeta / f"{key}.json", por_sem[key], cont)
+        shards.append({"key": key, "url": f"{key}.json", "docs": len(por_sem[key])})
+    vigentes = {"core.json", "titulos.json", "indice.json"} | {s["url"] for s in shards}
+    for viejo in carpeta.glob("*.json*"):
+        if viejo.name.split(".json")[0] + ".json" not in vigentes:
+            viejo.unlink()
+    escribir_si_cambia(carpeta / "indice.json",
+                       json.dumps({"shards": shards}, ensure_ascii=False, separators=(",", ":")))
+    return {"original": (out / "search.json").stat().st_size, "shards": len(shards), **cont}
+
+def main():
+    ap = argparse.ArgumentParser(description="Parte docs/search.json en shards por semestre.")
+    ap.add_argument("--out", default=os.environ.get("QUARTO_PROJECT_OUTPUT_DIR", "docs"),
+                    help="Carpeta de salida del sitio (por defecto la de Quarto o docs/).")
+    args = ap.parse_args()
+    out = Path(args.out)
+    if not (out / "search.json").exists():
+        print(f"No existe {out / 'search.json'} (¿search: false o sin render?)."); return
+    r = partir(out)
+    print(f"🔎 search.json ({r['original'] / 1024:.0f} KB) → core + títulos + {r['shards']} semestres "
+          f"| archivos escritos: {r['escritos']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Respaldos de los scripts de apuntes (.apuntes_respaldos/, fuera del sitio).
+
+  python3 scripts/respaldos.py listar
+  python3 scripts/respaldos.py mostrar <id>
+  python3 scripts/respaldos.py restaurar <id> [rutas...] [--dry-run]
+  python3 scripts/respaldos.py importar-bak [--dry-run]   # .bak / .bak.N antiguos → instantáneas
+"""
+
+from pathlib import Path
+import argparse, re
+
+from apuntes_lib import respaldos
+
+RE_BAK = re.compile(r"^(?P<orig>.+)\.bak(?:\.(?P<n>\d+))?$")
+
+def cmd_listar(args):
+    snaps = respaldos.listar()
+    if not snaps:
+        print("No hay instantáneas."); return
+    for s in snaps:
+        print(f"{s['id']}  {s['creado']}  {len(s['archivos'])} archivos")
+
+def cmd_mostrar(args):
+    s = respaldos.cargar(args.id)
+    print(f"{s['id']} ({s['comando']}, {s['creado']})")
+    for ruta, sha in sorted(s["archivos"].items()):
+        print(f"   {sha[:12]}  {ruta}")
+
+def cmd_restaurar(args):
+    s = respaldos.cargar(args.id)
+    res = respaldos.restaurar(s, args.rutas or None, aplicar=not args.dry_run)
+    for ruta, cambio in res:
+        if cambio:
+            print(("[dry-run] Restauraría " if args.dry_run else "↩ Restaurado: ") + ruta)
+        else:
+            print(f"=  Igual al respaldo: {ruta}")
+    print(f"\nListo. {sum(c for _, c in res)} / {len(res)} archivos {'a restaurar' if args.dry_run else 'restaurados'}.")
+
+def cmd_importar_bak(args):
+    """Cada generación (.bak, .bak.1, …) queda como una instantánea; los .bak se borran."""
+    por_gen = {}
+    for bak in sorted(Path(args.raiz).rglob("*.bak*")):
+        m = RE_BAK.match(bak.name)
+        if m and bak.is_file() and not any(p.startswith(".") for p in bak.parts):
+            por_gen.setdefault(int(m.group("n") or 0), []).append((bak, bak.with_name(m.group("orig"))))
+    if not por_gen:
+        print("No hay archivos .bak."); return
+    total = 0
+    for gen in sorted(por_gen):
+        if args.dry_run:
+            print(f"[dry-run] Importaría {len(por_gen[gen])} respaldos .bak{'.' + str(gen) if gen else ''}")
+            continue
+        snap = respaldos.Instantanea(f"importado-bak{gen}" if gen else "importado-bak")
+        for bak, orig in por_gen[gen]:
+            snap.agregar(orig, respaldos.guardar_objeto(bak))
+        snap.cerrar()
+        for bak, _ in por_gen[gen]:
+            bak.unlink()
+        total += len(por_gen[gen])
+        print(f"💾 {snap.id}: {len(por_gen[gen])} archivos")
+    if total:
+        print(f"\nListo. {total} archivos .bak importados y borrados.")
+
+def main():
+    ap = argparse.ArgumentParser(description="Lista y restaura respaldos (instantáneas) de los scripts de apuntes.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("listar", help="Instantáneas, de la más nueva a la más antigua.").set_defaults(fn=cmd_listar)
+    p = sub.add_parser("mostrar", help="Archivos de una instantánea.")
+    p.add_argument("id", help="Id o prefijo único."); p.set_defaults(fn=cmd_mostrar)
+    p = sub.add_parser("restaurar", help="Devuelve archivos al contenido de una instantánea.")
+    p.add_argument("id", help="Id o prefijo único.")
+    p.add_argument("rutas", nargs="*", help="Solo estas rutas (por defecto, todas).")
+    p.add_argument("--dry-run", action="store_true"); p.set_defaults(fn=cmd_restaurar)
+    p = sub.add_parser("importar-bak", help="Mueve los .bak/.bak.N antiguos a instantáneas.")
+    p.add_argument("--raiz", default="apuntes", help="Dónde buscar .bak (por defecto apuntes/).")
+    p.add_argument("--dry-run", action="store_true"); p.set_defaults(fn=cmd_importar_bak)
+    args = ap.parse_args()
+    try:
+        args.fn(args)
+    except KeyError as e:
+        print(f"⚠️ {e.args[0]}")
+
+if __name__ == "__main__":
+    main()
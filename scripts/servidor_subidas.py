@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Servidor local de aportes: recibe PDFs por HTTP y los pasa al generador.
+
+    python3 scripts/servidor_subidas.py [--puerto 8765] [--simultaneas 4] [--cola 32]
+    curl -T "Sociología Política_2024_Ficha Weber_Ortiz_Cahuil.pdf" \\
+         "http://127.0.0.1:8765/subir/Sociología%20Política_2024_Ficha%20Weber_Ortiz_Cahuil.pdf"
+
+En http://127.0.0.1:8765/ hay un formulario mínimo que hace lo mismo desde el
+navegador. Solo asyncio de la biblioteca estándar (HTTP/1.1 básico, una
+petición por conexión):
+
+  - PUT /subir/<nombre>   el nombre se valida con parse_filename (apuntes_lib/nombres.py)
+                          ANTES de leer el cuerpo: si no calza → 422 sin recibir
+                          el PDF (con `Expect: 100-continue` ni siquiera se envía)
+  - el cuerpo se copia a disco en trozos de TROZO bytes (memoria acotada:
+    TROZO × subidas simultáneas), a resources/pdfs/.subiendo/ y al terminar
+    se mueve a resources/pdfs/ con os.replace
+  - cada PDF completo entra a una cola acotada; un solo consumidor junta lo
+    que haya y corre ejecutar_lote() del generador (el mismo camino que main()
+    y --watch) en un hilo
+  - contrapresión: a lo más --simultaneas cuerpos se leen a la vez (el resto
+    espera sin leer el socket, TCP frena al cliente); si la cola de generación
+    está llena la respuesta espera; con más de --max-espera conexiones
+    esperando se responde 503 + Retry-After
+  - GET /estado           subidas en curso, en espera, en cola y procesadas
+"""
+
+from pathlib import Path
+from urllib.parse import unquote, urlsplit
+import argparse, asyncio, json, os, sys, time, uuid
+
+REPO = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO / "apuntes"))
+
+import genera_qmd_desde_pdfs as gen
+from apuntes_lib import nombres
+
+TROZO = 64 * 1024              # bytes por lectura/escritura
+MAX_MB = 100                   # tamaño máximo por PDF
+MAX_CABECERAS = 16 * 1024      # bytes de línea de petición + cabeceras
+TIMEOUT_S = 30                 # sin recibir nada en este tiempo → se corta
+SUBIENDO_DIR = gen.PDF_DIR / ".subiendo"
+
+FORMULARIO = """<!doctype html><meta charset="utf-8"><title>Subir apunte</title>
+<h1>Subir apunte (PDF)</h1>
+<p>Nombre: <code>Curso_AAAA_Tema_Apellido_Nombre.pdf</code> o <code>Curso_AAAA_Tema_Autor(es).pdf</code></p>
+<input type="file" id="f" accept="application/pdf" multiple> <button id="b">Subir</button>
+<pre id="o"></pre>
+<script>
+document.getElementById("b").onclick = async () => {
+  for (const f of document.getElementById("f").files) {
+    const r = await fetch("/subir/" + encodeURIComponent(f.name), {method: "PUT", body: f});
+    document.getElementById("o").textContent += f.name + " → " + r.status + " " + await r.text() + "\\n";
+  }
+};
+</script>"""
+
+class ErrorHTTP(Exception):
+    def __init__(self, codigo: int, mensaje: str, extra: dict | None = None):
+        super().__init__(mensaje)
+        self.codigo, self.mensaje, self.extra = codigo, mensaje, extra or {}
+
+RAZONES = {200: "OK", 202: "Accepted", 400: "Bad Request", 404: "Not Found", 408: "Request Timeout",
+           409: "Conflict", 411: "Length Required", 413: "Payload Too Large", 415: "Unsupported Media Type",
+           422: "Unprocessable Entity", 503: "Service Unavailable"}
+
+# ---------- HTTP mínimo ----------
+async def leer_peticion(reader: asyncio.StreamReader) -> tuple:
+    try:
+        crudo = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), TIMEOUT_S)
+    except asyncio.LimitOverrunError:
+        raise ErrorHTTP(400, "Cabeceras demasiado largas")
+    except (asyncio.IncompleteReadError, asyncio.TimeoutError):
+        raise ErrorHTTP(408, "Petición incompleta")
+    lineas = crudo.decode("latin-1").split("\r\n")
+    try:
+        metodo, destino, _ = lineas[0].split(" ", 2)
+    except ValueError:
+        raise ErrorHTTP(400, "Línea de petición inválida")
+    cabeceras = {}
+    for l in lineas[1:]:
+        if ":" in l:
+            k, v = l.split(":", 1)
+            cabeceras[k.strip().lower()] = v.strip()
+    return metodo.upper(), urlsplit(destino).path, cabeceras
+
+async def responder(writer, codigo: int, cuerpo, tipo: str = "application/json; charset=utf-8", extra: str = ""):
+    if not isinstance(cuerpo, (bytes, str)):
+        cuerpo = json.dumps(cuerpo, ensure_ascii=False)
+    datos = cuerpo.encode("utf-8") if isinstance(cuerpo, str) else cuerpo
+    writer.write((f"HTTP/1.1 {codigo} {RAZONES.get(codigo, '')}\r\nContent-Type: {tipo}\r\n"
+                  f"Content-Length: {len(datos)}\r\nConnection: close\r\n{extra}\r\n").encode("latin-1") + datos)
+    await writer.drain()
+
+# ---------- Servidor ----------
+class Servidor:
+    def __init__(self, args):
+        self.args = args
+        self.max_bytes = args.max_mb * 1024 * 1024
+        self.cupos = asyncio.Semaphore(args.simultaneas)   # cuerpos leyéndose a la vez
+        self.cola = asyncio.Queue(maxsize=args.cola)       # PDFs completos esperando al generador
+        self.esperando = self.subiendo = self.procesados = 0
+        self.en_disco = set()                              # nombres en resources/pdfs aún no procesados
+        self.args_gen = gen.parse_args(["--optimizar"] if args.optimizar else [])
+        self.jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+
+    def estado(self) -> dict:
+        return {"subiendo": self.subiendo, "esperando": self.esperando, "en_cola": self.cola.qsize(),
+                "procesados": self.procesados}
+
+    async def atender(self, reader, writer):
+        try:
+            metodo, ruta, cab = await leer_peticion(reader)
+            if metodo == "GET" and ruta == "/":
+                await responder(writer, 200, FORMULARIO, "text/html; charset=utf-8")
+            elif metodo == "GET" and ruta == "/estado":
+                await responder(writer, 200, self.estado())
+            elif metodo in ("PUT", "POST") and ruta.startswith("/subir/"):
+                await responder(writer, 202, await self.subir(unquote(ruta[len("/subir/"):]), cab, reader, writer))
+            else:
+                raise ErrorHTTP(404, "Usa PUT /subir/<nombre>.pdf")
+        except ErrorHTTP as e:
+            extra = "Retry-After: 30\r\n" if e.codigo == 503 else ""
+            try:
+                await responder(writer, e.codigo, {"error": e.mensaje, **e.extra}, extra=extra)
+            except ConnectionError:
+                pass
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    def validar_nombre(self, nombre: str) -> tuple:
+        """(nombre final, análisis). Todo antes de leer un solo byte del cuerpo."""
+        if not nombre or "/" in nombre or "\\" in nombre or nombre.startswith(".") or "\x00" in nombre:
+            raise ErrorHTTP(400, "Nombre de archivo inválido")
+        if nombre[-4:].lower() != ".pdf":
+            raise ErrorHTTP(415, "Solo se aceptan PDFs (.pdf)")
+        nombre = nombre[:-4] + ".pdf"
+        analisis = nombres.analizar(nombre)
+        if analisis["estado"] == "rechazado":
+            raise ErrorHTTP(422, analisis["error"], {"nombre": nombre})
+        if nombre in self.en_disco or (gen.PDF_DIR / nombre).exists():
+            raise ErrorHTTP(409, "Ya hay un PDF con ese nombre esperando ser procesado", {"nombre": nombre})
+        return nombre, analisis
+
+    async def subir(self, nombre: str, cab: dict, reader, writer) -> dict:
+        nombre, analisis = self.validar_nombre(nombre)
+        if "chunked" in cab.get("transfer-encoding", "").lower() or "content-length" not in cab:
+            raise ErrorHTTP(411, "Falta Content-Length")
+        try:
+            largo = int(cab["content-length"])
+        except ValueError:
+            raise ErrorHTTP(400, "Content-Length inválido")
+        if largo > self.max_bytes:
+            raise ErrorHTTP(413, f"Máximo {self.args.max_mb} MB")
+        if self.cupos.locked() and self.esperando >= self.args.max_espera:
+            raise ErrorHTTP(503, "Demasiadas subidas en espera; reintenta en un rato")
+
+        self.en_disco.add(nombre)
+        try:
+            self.esperando += 1
+            try:
+                await self.cupos.acquire()
+            finally:
+                self.esperando -= 1
+            try:
+                self.subiendo += 1
+                if cab.get("expect", "").lower() == "100-continue":
+                    writer.write(b"HTTP/1.1 100 Continue\r\n\r\n"); await writer.drain()
+                final = await self.recibir(nombre, largo, reader)
+            finally:
+                self.subiendo -= 1
+                self.cupos.release()
+            # cola llena → esta respuesta espera (el cliente no manda el siguiente)
+            await self.cola.put(final)
+        except BaseException:
+            self.en_disco.discard(nombre)
+            raise
+        print(f"⬆ Recibido: {nombre} ({largo / 1024:.0f} KB) — en cola: {self.cola.qsize()}")
+        return {"nombre": nombre, "estado": "en_cola", "patron": analisis["patron"], "avisos": analisis["avisos"],
+                "tema": analisis["meta"]["tema_hum"], "autores": analisis["meta"]["autores_raw"]}
+
+    async def recibir(self, nombre: str, largo: int, reader) -> Path:
+        """Copia el cuerpo a .subiendo/ por trozos y lo mueve a resources/pdfs/ al terminar."""
+        SUBIENDO_DIR.mkdir(parents=True, exist_ok=True)
+        parcial = SUBIENDO_DIR / f"{uuid.uuid4().hex}.part"
+        f = open(parcial, "wb")
+        try:
+            resto, primero = largo, True
+            while resto:
+                try:
+                    trozo = await asyncio.wait_for(reader.read(min(TROZO, resto)), TIMEOUT_S)
+                except asyncio.TimeoutError:
+                    raise ErrorHTTP(408, "La subida se detuvo")
+                if not trozo:
+                    raise ConnectionError("el cliente cortó la subida")
+                if primero and not trozo.startswith(b"%PDF-"):
+                    raise ErrorHTTP(415, "El archivo no es un PDF")
+                primero = False
+                await asyncio.to_thread(f.write, trozo)
+                resto -= len(trozo)
+            await asyncio.to_thread(os.fsync, f.fileno())
+            f.close()
+            final = gen.PDF_DIR / nombre
+            os.replace(parcial, final)
+            return final
+        finally:
+            f.close()
+            if parcial.exists():
+                parcial.unlink()
+
+    async def generar(self):
+        """Único consumidor: junta lo que haya en la cola y corre un lote del generador."""
+        while True:
+            lote = [await self.cola.get()]
+            while not self.cola.empty():
+                lote.append(self.cola.get_nowait())
+            t0 = time.perf_counter()
+            try:
+                await asyncio.to_thread(self.procesar_lote, lote)
+            except Exception as e:
+                print(f"⚠️ Falló el lote ({len(lote)} PDFs): {e}")
+            finally:
+                for p in lote:
+                    self.en_disco.discard(p.name)
+                    self.cola.task_done()
+            self.procesados += len(lote)
+            print(f"— Lote de {len(lote)} procesado en {time.perf_counter() - t0:.1f}s")
+
+    def procesar_lote(self, lote: list):
+        # mismo camino que main()/--watch del generador
+        course_index = gen.index_course_dirs(gen.APUNTES_BASE)
+        cont = gen.ejecutar_lote(lote, course_index, self.jobs, optimizar_pdfs=self.args_gen.optimizar)
+        gen.indexar_texto(self.jobs)
+        gen.publicar_afectadas(cont["cambiados"], self.args_gen)
+
+async def servir(args):
+    gen.PDF_DIR.mkdir(parents=True, exist_ok=True)
+    gen.READY_DIR.mkdir(parents=True, exist_ok=True)
+    srv = Servidor(args)
+    consumidor = asyncio.create_task(srv.generar())
+    server = await asyncio.start_server(srv.atender, args.host, args.puerto, limit=MAX_CABECERAS)
+    print(f"📥 Recibiendo aportes en http://{args.host}:{args.puerto}/ "
+          f"(máx. {args.simultaneas} a la vez, cola {args.cola}). Ctrl+C para salir.")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        consumidor.cancel()
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Servidor local de aportes: PUT de PDFs directo al generador.")
+    ap.add_argument("--host", default="127.0.0.1", help="Interfaz (por defecto solo local).")
+    ap.add_argument("--puerto", type=int, default=8765)
+    ap.add_argument("--simultaneas", type=int, default=4, help="Subidas leyéndose a la vez.")
+    ap.add_argument("--max-espera", type=int, default=64, help="Conexiones esperando cupo antes de responder 503.")
+    ap.add_argument("--cola", type=int, default=32, help="PDFs completos esperando al generador.")
+    ap.add_argument("--max-mb", type=int, default=MAX_MB, help="Tamaño máximo por PDF.")
+    ap.add_argument("-j", "--jobs", type=int, default=1, help="Procesos del generador por lote (0 = todos).")
+    ap.add_argument("--optimizar", action="store_true", help="Optimiza los PDFs nuevos (gs/qpdf).")
+    args = ap.parse_args(argv)
+    try:
+        asyncio.run(servir(args))
+    except KeyboardInterrupt:
+        print("\nServidor detenido.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Valida nombres de PDF contra la gramática de apuntes_lib/nombres.py sin mover
+ni abrir ningún archivo (sirve para revisar miles de envíos antes de procesarlos).
+
+  python3 scripts/validar_nombres.py                         # resources/pdfs
+  python3 scripts/validar_nombres.py carpeta/ otro.pdf --json reporte.json
+  ls envios/ | python3 scripts/validar_nombres.py -          # nombres por stdin
+
+Sale con código 1 si hay rechazados (con --estricto, también si hay ambiguos).
+"""
+
+from pathlib import Path
+import argparse, json, sys, time
+
+from apuntes_lib import nombres
+from apuntes_lib.escritura import escribir_si_cambia
+
+PDF_DIR = Path("resources/pdfs")
+
+def recolectar(rutas: list):
+    for r in rutas:
+        if r == "-":
+            yield from (l.strip() for l in sys.stdin if l.strip())
+        elif Path(r).is_dir():
+            yield from sorted(p.name for p in Path(r).glob("*.pdf"))
+        else:
+            yield Path(r).name
+
+def main():
+    ap = argparse.ArgumentParser(description="Valida nombres de PDF (patrones A y B) y reporta rechazados y ambiguos.")
+    ap.add_argument("rutas", nargs="*", default=[str(PDF_DIR)],
+                    help="Carpetas, archivos o '-' para leer nombres por stdin (por defecto resources/pdfs).")
+    ap.add_argument("--json", metavar="ARCHIVO", help="Guarda el reporte en JSON ('-' = stdout).")
+    ap.add_argument("--estricto", action="store_true", help="Los ambiguos también cuentan como error.")
+    args = ap.parse_args()
+
+    t0 = time.perf_counter()
+    rep = nombres.analizar_lote(recolectar(args.rutas))
+    seg = time.perf_counter() - t0
+
+    if args.json == "-":
+        json.dump(rep, sys.stdout, ensure_ascii=False, indent=1); print()
+    else:
+        for r in rep["rechazados"]:
+            print(f"✗ {r['nombre']}: {r['error']}")
+        for r in rep["ambiguos"]:
+            print(f"? {r['nombre']}: tema \"{r['tema']}\" | autores {r['autores']} — {'; '.join(r['avisos'])}")
+        print(f"\nNombres: {rep['total']} | OK: {rep['ok']} | Ambiguos: {len(rep['ambiguos'])} "
+              f"| Rechazados: {len(rep['rechazados'])}  ({seg:.3f}s)")
+        if args.json:
+            escribir_si_cambia(Path(args.json), json.dumps(rep, ensure_ascii=False, indent=1))
+            print(f"Reporte: {args.json}")
+
+    if rep["rechazados"] or (args.estricto and rep["ambiguos"]):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Genera variantes livianas (WebP/JPEG a 320/640/1280 px) de las imágenes
+de resources/imagenes/ (banners de cursos y fotos del equipo). Solo procesa
+las imágenes cuyo sha256 cambió desde la última vez.
+
+Después:
+  - crear_index_por_curso.py usa la variante de 640 px en `image:` (también en
+    los index.qmd que ya existían: solo cambia esa clave).
+  - Con --reescribir, las imágenes de las páginas indicadas (por defecto
+    index.qmd, fotos del equipo) pasan a apuntar a la variante de 320 px.
+
+Uso:
+  python3 scripts/variantes_imagenes.py [-j 4] [--reescribir index.qmd ...]
+"""
+
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+import argparse, os, re
+
+from apuntes_lib import imagenes
+from apuntes_lib.escritura import escribir_si_cambia
+
+PAGINAS_CON_FOTOS = ["index.qmd"]
+RE_IMG_MD = re.compile(r"(!\[[^\]]*\]\()(/?resources/imagenes/[^)\s]+)(\))")
+
+def _generar(par):
+    src, fmts = par
+    try:
+        return src, imagenes.generar(Path(src), fmts), None
+    except Exception as e:
+        return src, None, str(e)
+
+def originales() -> list:
+    return sorted(p for p in imagenes.IMAGENES_DIR.rglob("*")
+                  if p.suffix.lower() in imagenes.EXTENSIONES and imagenes.VARIANTES_DIR not in p.parents)
+
+def reescribir(pagina: Path, man: dict) -> int:
+    """Cambia ![](resources/imagenes/x.jpg) → variante; vuelve al original si ya no hay variante."""
+    texto = pagina.read_bytes().decode("utf-8")  # sin traducir CRLF: solo cambian las URLs
+    inverso = {p.lstrip("/"): src for src, r in man.items() for vs in r["variantes"].values() for p in vs.values()}
+
+    def cambio(m):
+        url = m.group(2)
+        src = inverso.get(url.lstrip("/"), url.lstrip("/"))
+        orig = ("/" if url.startswith("/") else "") + src
+        return m.group(1) + imagenes.url_variante(orig, imagenes.ANCHO_FOTO, man) + m.group(3)
+
+    nuevo, n = RE_IMG_MD.subn(cambio, texto)
+    return n if escribir_si_cambia(pagina, nuevo) else 0
+
+def main():
+    ap = argparse.ArgumentParser(description="Variantes WebP/JPEG de resources/imagenes (con caché por sha256).")
+    ap.add_argument("-j", "--jobs", type=int, default=1, help="Procesos en paralelo (0 = todos los núcleos).")
+    ap.add_argument("--reescribir", nargs="*", metavar="QMD", default=None,
+                    help=f"Páginas cuyas imágenes apuntan a la variante (sin valor: {', '.join(PAGINAS_CON_FOTOS)}).")
+    args = ap.parse_args()
+
+    fmts = imagenes.formatos_disponibles()
+    if not fmts:
+        print("⚠️ Falta Pillow (pip install pillow): no se generan variantes; el sitio sigue con los originales.")
+        return
+
+    man = imagenes.cargar_manifiesto()
+    srcs = originales()
+    shas = {p.as_posix(): imagenes.sha256(p) for p in srcs}
+    pendientes = [(s, fmts) for s in shas if not imagenes.al_dia(Path(s), man.get(s), shas[s], fmts)]
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    if jobs > 1 and len(pendientes) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as ex:
+            res = list(ex.map(_generar, pendientes))
+    else:
+        res = [_generar(p) for p in pendientes]
+
+    bytes_antes = bytes_despues = 0
+    for src, registro, err in res:
+        if err:
+            print(f"⚠️ {src}: {err}"); continue
+        # variantes que ya no se generan (p. ej. AVIF de antes)
+        for p in imagenes.rutas(man.get(src)) - imagenes.rutas(registro):
+            Path(p).unlink(missing_ok=True)
+        man[src] = registro
+        bytes_antes += Path(src).stat().st_size
+        chica = imagenes.url_variante(src, imagenes.ANCHO_TARJETA, man)
+        bytes_despues += Path(chica).stat().st_size
+        print(f"🖼  {src} → {sum(len(v) for v in registro['variantes'].values())} variantes")
+
+    # variantes de originales que ya no existen
+    for src in [s for s in man if s not in shas]:
+        for p in imagenes.rutas(man.pop(src)):
+            Path(p).unlink(missing_ok=True)
+    imagenes.guardar_manifiesto(man)
+
+    print(f"\nListo ✅  Procesadas: {len(pendientes)} | Al día (caché): {len(srcs) - len(pendientes)} | Formatos: {', '.join(fmts)}")
+    if bytes_antes:
+        print(f"   Tarjeta de {imagenes.ANCHO_TARJETA}px: {bytes_antes / 1024:.0f} KB → {bytes_despues / 1024:.0f} KB")
+
+    if args.reescribir is not None:
+        for pagina in [Path(p) for p in (args.reescribir or PAGINAS_CON_FOTOS)]:
+            if pagina.exists():
+                n = reescribir(pagina, man)
+                print(f"✎ {pagina}: {n} imágenes apuntan a variantes" if n else f"=  Sin cambios: {pagina}")
+
+if __name__ == "__main__":
+    main()